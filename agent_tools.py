@@ -5,48 +5,27 @@ Satisfies agentic AI requirement (reasoning + external tools) alongside RAG.
 
 from __future__ import annotations
 
-import re
-from functools import lru_cache
-from pathlib import Path
-from typing import Any, Dict, List, Union
+import time
+from typing import Any, Callable, Dict, List, Optional, Union
 
 from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
 from langchain_core.tools import tool
 from langchain_openai import ChatOpenAI
 
-BASE_DIR = Path(__file__).resolve().parent
-MOVIES_FILE = BASE_DIR / "movies.txt"
+from catalog import get_catalog
+from intent_router import ROUTE_COUNT, ROUTE_GENRE, ROUTE_NONE, router
 
 _MAX_AGENT_TURNS = 4
 
 
-@lru_cache(maxsize=1)
-def _title_genre_rows() -> List[tuple[str, str]]:
-    raw = MOVIES_FILE.read_text(encoding="utf-8")
-    blocks = [b.strip() for b in raw.split("\n---\n") if b.strip()]
-    rows: List[tuple[str, str]] = []
-    for block in blocks:
-        tm = re.search(r"^Title:\s*(.+)$", block, re.MULTILINE)
-        gm = re.search(r"^Genre:\s*(.+)$", block, re.MULTILINE)
-        title = tm.group(1).strip() if tm else "Unknown"
-        genre = gm.group(1).strip() if gm else "Unknown"
-        rows.append((title, genre))
-    return rows
-
-
 @tool
 def library_movie_count() -> str:
     """Return how many films are in the curated library and a few example genres."""
-    rows = _title_genre_rows()
-    genres: set[str] = set()
-    for _, g in rows:
-        for part in g.split(","):
-            part = part.strip()
-            if part:
-                genres.add(part)
-    sample = ", ".join(sorted(genres)[:12])
+    catalog = get_catalog()
+    counts = catalog.index().genre_counts()
+    sample = ", ".join(f"{g} ({counts.get(g, 0)})" for g in [g for g in catalog.genre_tags() if g][:12])
     return (
-        f"Total films in library: {len(rows)}. "
+        f"Total films in library: {len(catalog)}. "
         f"Some genres present: {sample}. "
         f"(Use find_movies_by_genre for a filtered list.)"
     )
@@ -58,15 +37,12 @@ def find_movies_by_genre(genre_substring: str) -> str:
     needle = (genre_substring or "").strip().lower()
     if not needle:
         return "Provide a non-empty genre substring (e.g. Sci-Fi, Comedy)."
-    matches: List[str] = []
-    for title, genre in _title_genre_rows():
-        if needle in genre.lower():
-            matches.append(title)
-        if len(matches) >= 12:
-            break
-    if not matches:
+    index = get_catalog().index()
+    ids = index.genre_ids(needle)
+    if not len(ids):
         return f"No library films matched genre containing '{genre_substring}'."
-    return "Matching titles: " + "; ".join(matches)
+    matches: List[str] = [index.title(int(mid)) for mid in ids[:12]]
+    return f"Matching titles ({len(ids)} in total): " + "; ".join(matches)
 
 
 _TOOLS = [library_movie_count, find_movies_by_genre]
@@ -95,17 +71,39 @@ def _tool_call_as_dict(tc: Union[dict, Any]) -> Dict[str, Any]:
     return {"name": name, "id": tid, "args": args or {}}
 
 
-def gather_tool_layer(api_key: str, user_question: str) -> str:
+def gather_tool_layer(
+    api_key: str,
+    user_question: str,
+    embed: Optional[Callable[[str], List[float]]] = None,
+    timeout_s: Optional[float] = None,
+    vector: Optional[List[float]] = None,
+) -> str:
     """
     Optional LLM+tools pass. Returns text to append to the RAG query, or "".
+    The local intent router answers clear cases (no tool, count, genre list)
+    without the remote call; ``embed`` lets it fall back to MiniLM centroids,
+    and ``vector`` (the question's embedding, if already computed) saves an encode.
+    ``timeout_s`` bounds the remote loop: each request times out after it,
+    without retries, and no new turn starts once it has passed.
     Never raises — returns "" on any failure.
     """
+    deadline = time.monotonic() + timeout_s if timeout_s else None
     try:
+        decision = router.route(user_question, embed, vector)
+        if decision.route == ROUTE_NONE:
+            return ""
+        if decision.route == ROUTE_COUNT:
+            return str(library_movie_count.invoke({}))
+        if decision.route == ROUTE_GENRE:
+            return str(find_movies_by_genre.invoke({"genre_substring": decision.genre}))
+
         llm = ChatOpenAI(
             model="gpt-4o-mini",
             temperature=0,
             max_tokens=256,
             openai_api_key=api_key,
+            timeout=timeout_s,
+            max_retries=0 if timeout_s else None,
         ).bind_tools(_TOOLS)
         messages: List[Any] = [
             SystemMessage(content=_AGENT_SYSTEM),
@@ -113,6 +111,8 @@ def gather_tool_layer(api_key: str, user_question: str) -> str:
         ]
         turns = 0
         while turns < _MAX_AGENT_TURNS:
+            if deadline is not None and time.monotonic() >= deadline:
+                return ""
             turns += 1
             ai: AIMessage = llm.invoke(messages)
             messages.append(ai)
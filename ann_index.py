@@ -0,0 +1,173 @@
+"""
+Approximate nearest-neighbour search for large catalogs: IVF with product
+quantization, implemented in NumPy with no external service.
+
+Build: k-means splits the vectors into ``nlist`` inverted lists; each vector's
+residual from its list centroid is cut into ``m`` sub-vectors and each
+sub-vector is replaced by the id of its nearest of 2**nbits sub-centroids.
+Query: score the centroids, open the ``nprobe`` best lists and score their
+codes with asymmetric distance tables (one lookup per sub-vector):
+
+    q.x  ~=  q.c_list  +  sum_j  q_j . codebook_j[code_j]
+
+Scores are inner products, matching the unit-norm vectors in NumpyVectorStore.
+Index memory is ``m * nbits / 8`` bytes per vector plus an int64 id.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from vector_codecs import top_k_indices
+
+_ASSIGN_BLOCK = 8_192
+
+
+@dataclass
+class IvfPqParams:
+    nlist: int = 1024
+    m: int = 32
+    nbits: int = 8
+    nprobe: int = 8
+    train_size: int = 50_000
+    kmeans_iters: int = 15
+    # Exact re-scoring of refine * fetch_k ANN hits (0 disables it).
+    refine: int = 20
+    # Below this many vectors the store keeps using exact search.
+    min_vectors: int = 10_000
+    seed: int = 0
+
+    @classmethod
+    def parse(cls, spec: str) -> "IvfPqParams":
+        """Build from ``"nlist=1024,m=16,nprobe=12"`` style settings."""
+        params = cls()
+        for item in filter(None, (p.strip() for p in spec.split(","))):
+            key, _, value = item.partition("=")
+            if not hasattr(params, key.strip()):
+                raise ValueError(f"Unknown ANN parameter {key!r}")
+            setattr(params, key.strip(), int(value))
+        return params
+
+
+def _assign(points: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Nearest centroid (L2) per row, in blocks to bound the distance matrix."""
+    c_sq = (centroids * centroids).sum(axis=1)
+    out = np.empty(points.shape[0], dtype=np.int64)
+    for start in range(0, points.shape[0], _ASSIGN_BLOCK):
+        block = points[start : start + _ASSIGN_BLOCK]
+        out[start : start + block.shape[0]] = np.argmin(c_sq - 2.0 * block @ centroids.T, axis=1)
+    return out
+
+
+def kmeans(points: np.ndarray, k: int, iters: int, rng: np.random.Generator) -> np.ndarray:
+    k = min(k, points.shape[0])
+    centroids = points[rng.choice(points.shape[0], k, replace=False)].copy()
+    for _ in range(iters):
+        labels = _assign(points, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, points)
+        counts = np.bincount(labels, minlength=k)
+        empty = counts == 0
+        centroids[~empty] = sums[~empty] / counts[~empty, None]
+        # Re-seed empty clusters from random points so nlist stays fully used.
+        if empty.any():
+            centroids[empty] = points[rng.choice(points.shape[0], int(empty.sum()))]
+    return centroids.astype(np.float32)
+
+
+class IvfPqIndex:
+    def __init__(self, params: Optional[IvfPqParams] = None) -> None:
+        self.params = params or IvfPqParams()
+        self.centroids: Optional[np.ndarray] = None  # (nlist, dim)
+        self.codebooks: Optional[np.ndarray] = None  # (m, 2**nbits, dim/m)
+        self._pending_codes: List[np.ndarray] = []
+        self._pending_lists: List[np.ndarray] = []
+        self._pending_ids: List[np.ndarray] = []
+        self._codes = np.zeros((0, self.params.m), dtype=np.uint8)
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._offsets = np.zeros(1, dtype=np.int64)
+        self._lists = np.zeros(0, dtype=np.int64)
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+
+    @property
+    def ntotal(self) -> int:
+        return len(self._ids) + sum(len(i) for i in self._pending_ids)
+
+    @property
+    def nbytes(self) -> int:
+        self._flush()
+        return self._codes.nbytes + self._ids.nbytes + self.centroids.nbytes + self.codebooks.nbytes
+
+    def _split(self, vectors: np.ndarray) -> np.ndarray:
+        n, dim = vectors.shape
+        return vectors.reshape(n, self.params.m, dim // self.params.m)
+
+    def train(self, vectors: np.ndarray) -> None:
+        p = self.params
+        if vectors.shape[1] % p.m:
+            raise ValueError(f"dimension {vectors.shape[1]} is not divisible by m={p.m}")
+        if p.nbits > 8:
+            raise ValueError("nbits must be <= 8 (codes are stored as uint8)")
+        rng = np.random.default_rng(p.seed)
+        if vectors.shape[0] > p.train_size:
+            vectors = vectors[rng.choice(vectors.shape[0], p.train_size, replace=False)]
+        vectors = np.asarray(vectors, dtype=np.float32)
+        self.centroids = kmeans(vectors, p.nlist, p.kmeans_iters, rng)
+        residuals = self._split(vectors - self.centroids[_assign(vectors, self.centroids)])
+        self.codebooks = np.stack(
+            [kmeans(residuals[:, j], 2**p.nbits, p.kmeans_iters, rng) for j in range(p.m)]
+        )
+
+    def add(self, vectors: np.ndarray, ids: np.ndarray) -> None:
+        if not self.is_trained:
+            raise RuntimeError("IvfPqIndex.add() before train()")
+        vectors = np.asarray(vectors, dtype=np.float32)
+        lists = _assign(vectors, self.centroids)
+        residuals = self._split(vectors - self.centroids[lists])
+        codes = np.empty((vectors.shape[0], self.params.m), dtype=np.uint8)
+        for j in range(self.params.m):
+            codes[:, j] = _assign(residuals[:, j], self.codebooks[j])
+        self._pending_codes.append(codes)
+        self._pending_lists.append(lists)
+        self._pending_ids.append(np.asarray(ids, dtype=np.int64))
+
+    def _flush(self) -> None:
+        """Merge pending adds into the list-sorted (CSR) layout used by search."""
+        if not self._pending_ids:
+            return
+        codes = np.concatenate([self._codes] + self._pending_codes)
+        ids = np.concatenate([self._ids] + self._pending_ids)
+        lists = np.concatenate([self._lists] + self._pending_lists)
+        order = np.argsort(lists, kind="stable")
+        self._codes, self._ids, self._lists = codes[order], ids[order], lists[order]
+        counts = np.bincount(self._lists, minlength=len(self.centroids))
+        self._offsets = np.concatenate([[0], np.cumsum(counts)])
+        self._pending_codes, self._pending_lists, self._pending_ids = [], [], []
+
+    def search(
+        self, query: np.ndarray, k: int, nprobe: Optional[int] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """(ids, approximate scores) of the k best hits, best first."""
+        self._flush()
+        nprobe = min(nprobe or self.params.nprobe, len(self.centroids))
+        coarse = self.centroids @ query
+        probe = top_k_indices(coarse, nprobe)
+        sub_q = query.reshape(self.params.m, -1)
+        # (m, 2**nbits) table of sub-query . sub-centroid
+        lut = np.einsum("jd,jcd->jc", sub_q, self.codebooks)
+        rows = np.concatenate(
+            [np.arange(self._offsets[c], self._offsets[c + 1]) for c in probe]
+        )
+        if not len(rows):
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        codes = self._codes[rows]
+        scores = lut[np.arange(self.params.m), codes].sum(axis=1)
+        scores += coarse[self._lists[rows]]
+        best = top_k_indices(scores, k)
+        return self._ids[rows[best]], scores[best]
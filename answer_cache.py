@@ -0,0 +1,291 @@
+"""
+Answer caches for ask_cinemind.
+
+SemanticAnswerCache is per process: entries are keyed by the MiniLM vector of
+the sanitized question. A lookup hits when a stored question has cosine
+similarity >= ``threshold``, was answered against the same catalog version
+and mentions the same library titles: "Alien" and "Aliens" questions embed
+almost identically, so the titles are part of the key. Eviction is LRU,
+bounded by ``max_entries``, and entries also expire after ``ttl_s`` seconds.
+
+SqliteAnswerCache is an exact-match cache on disk, shared across processes
+and redeploys.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import closing
+from dataclasses import dataclass, field
+from itertools import count
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+
+@dataclass
+class CachedAnswer:
+    question: str
+    vector: np.ndarray
+    answer: str
+    sources: list
+    catalog_version: str
+    titles: FrozenSet[str] = frozenset()
+    created: float = field(default_factory=time.monotonic)
+
+
+class SemanticAnswerCache:
+    def __init__(self, threshold: float = 0.95, max_entries: int = 512, ttl_s: float = 3600.0) -> None:
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[int, CachedAnswer]" = OrderedDict()
+        self._ids = count()
+        # Row-aligned snapshot of entry vectors; rebuilt lazily after any change.
+        self._matrix: Optional[np.ndarray] = None
+        self._matrix_keys: List[int] = []
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _unit(vector: Sequence[float]) -> np.ndarray:
+        v = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(v)
+        return v / norm if norm else v
+
+    def _expire(self, now: float) -> None:
+        stale = [k for k, e in self._entries.items() if now - e.created > self.ttl_s]
+        for key in stale:
+            del self._entries[key]
+        if stale:
+            self.evictions += len(stale)
+            self._matrix = None
+
+    def lookup(
+        self, vector: Sequence[float], catalog_version: str, titles: Iterable[str] = ()
+    ) -> Optional[Tuple[str, list]]:
+        """(answer, sources) of the closest cached question about ``titles``, or None."""
+        q = self._unit(vector)
+        titles = frozenset(titles)
+        with self._lock:
+            self._expire(time.monotonic())
+            if self._entries:
+                if self._matrix is None:
+                    self._matrix_keys = list(self._entries)
+                    self._matrix = np.stack([self._entries[k].vector for k in self._matrix_keys])
+                sims = self._matrix @ q
+                for row in np.argsort(-sims):
+                    if sims[row] < self.threshold:
+                        break
+                    key = self._matrix_keys[int(row)]
+                    entry = self._entries[key]
+                    if entry.catalog_version != catalog_version or entry.titles != titles:
+                        continue
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry.answer, entry.sources
+            self.misses += 1
+            return None
+
+    def store(
+        self,
+        vector: Sequence[float],
+        question: str,
+        answer: str,
+        sources: list,
+        catalog_version: str,
+        titles: Iterable[str] = (),
+    ) -> None:
+        entry = CachedAnswer(
+            question, self._unit(vector), answer, list(sources), catalog_version, frozenset(titles)
+        )
+        with self._lock:
+            self._entries[next(self._ids)] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            self._matrix = None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._matrix = None
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+def _doc_to_json(doc: Document) -> dict:
+    return {"id": doc.id, "page_content": doc.page_content, "metadata": doc.metadata}
+
+
+class SqliteAnswerCache:
+    """
+    Exact-match answer cache shared by every server process on the host.
+
+    The key hashes the normalized question, the retrieved chunk ids, the
+    prompt template and the model parameters, so a hit is an answer the LLM
+    was already given the identical inputs for. The database runs in WAL mode
+    so readers never wait on the writer. Writes go through a queue drained by
+    one background thread in batched transactions, which also evicts by TTL
+    and by size (least recently used first).
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS answers (
+            key TEXT PRIMARY KEY,
+            answer TEXT NOT NULL,
+            sources TEXT NOT NULL,
+            created REAL NOT NULL,
+            last_access REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS answers_last_access ON answers (last_access);
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        ttl_s: float = 7 * 24 * 3600,
+        max_entries: int = 50_000,
+        flush_interval_s: float = 0.5,
+        batch_size: int = 64,
+    ) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self.flush_interval_s = flush_interval_s
+        self.batch_size = batch_size
+        self._local = threading.local()
+        self._queue: "queue.Queue[tuple]" = queue.Queue()
+        self.hits = 0
+        self.misses = 0
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(self._SCHEMA)
+        self._writer = threading.Thread(target=self._drain, name="answer-cache-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=5.0)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    @staticmethod
+    def make_key(
+        normalized_question: str,
+        chunk_ids: Sequence[str],
+        prompt_hash: str,
+        model_params: Dict[str, object],
+        extra: str = "",
+    ) -> str:
+        payload = json.dumps(
+            [normalized_question, sorted(chunk_ids), prompt_hash, model_params, extra],
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[str, list]]:
+        """(answer, sources) for key, or None. Never blocks on the writer."""
+        try:
+            row = self._reader().execute(
+                "SELECT answer, sources, created FROM answers WHERE key = ?", (key,)
+            ).fetchone()
+        except sqlite3.Error:
+            row = None
+        now = time.time()
+        if row is None or now - row[2] > self.ttl_s:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._queue.put(("touch", key, now))
+        sources = [Document(**d) for d in json.loads(row[1])]
+        return row[0], sources
+
+    def put(self, key: str, answer: str, sources: list) -> None:
+        """Queue a write; returns immediately."""
+        payload = json.dumps([_doc_to_json(d) for d in sources], ensure_ascii=False)
+        self._queue.put(("put", key, answer, payload, time.time()))
+
+    def _drain(self) -> None:
+        conn = self._connect()
+        writes = 0
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval_s
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            try:
+                with conn:
+                    for op in batch:
+                        if op[0] == "put":
+                            _, key, answer, sources, now = op
+                            conn.execute(
+                                "INSERT OR REPLACE INTO answers VALUES (?, ?, ?, ?, ?)",
+                                (key, answer, sources, now, now),
+                            )
+                            writes += 1
+                        elif op[0] == "touch":
+                            conn.execute(
+                                "UPDATE answers SET last_access = ? WHERE key = ?", (op[2], op[1])
+                            )
+                    if writes >= self.batch_size:
+                        self._evict(conn)
+                        writes = 0
+            except sqlite3.Error:
+                pass  # a lost cache write only costs a future miss
+            for _ in batch:
+                self._queue.task_done()
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        conn.execute("DELETE FROM answers WHERE created < ?", (time.time() - self.ttl_s,))
+        (total,) = conn.execute("SELECT COUNT(*) FROM answers").fetchone()
+        if total > self.max_entries:
+            conn.execute(
+                "DELETE FROM answers WHERE key IN "
+                "(SELECT key FROM answers ORDER BY last_access LIMIT ?)",
+                (total - self.max_entries,),
+            )
+
+    def flush(self) -> None:
+        """Block until queued writes are committed (benchmarks and shutdown)."""
+        self._queue.join()
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "pending_writes": self._queue.qsize(),
+            "hit_rate": self.hits / total if total else 0.0,
+        }
@@ -1,26 +1,66 @@
 """
-CineMindAI — Streamlit UI (fast startup; RAG loads on demand).
+CineMindAI — Streamlit UI (fast startup; RAG warms up in the background).
+
+Only streamlit, the catalog and prompt_defense are imported up front. The
+first run of the script starts a background thread that imports rag_core and
+builds the shared retrieval engine, so the page renders at once and Launch
+is instant once warm-up is done (CINEMIND_WARMUP=0 waits for the first Launch
+instead). The tool layer (LangChain / OpenAI) and the answer caches (NumPy)
+are imported the first time a launched session needs them. Set
+CINEMIND_PROFILE_STARTUP=1 to log each run's render time and the modules it
+imported; benchmarks/bench_startup.py measures the cold cost.
 """
 
+import time
+
+_SCRIPT_START = time.perf_counter()
+
 import os
 import random
 import re
+import sys
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import TYPE_CHECKING, Iterator, List, Mapping, Optional
+
+PROFILE_STARTUP = os.getenv("CINEMIND_PROFILE_STARTUP") == "1"
+_MODULES_AT_START = frozenset(sys.modules) if PROFILE_STARTUP else frozenset()
 
 import streamlit as st
 from dotenv import load_dotenv
 
-from agent_tools import gather_tool_layer
-from prompt_defense import validate_chat_input
+from catalog import MOVIES_FILE, get_catalog
+from prompt_defense import normalize_user_text, validate_chat_input
+
+if TYPE_CHECKING:
+    from answer_cache import SemanticAnswerCache, SqliteAnswerCache
 
 load_dotenv()
 
 BASE_DIR = Path(__file__).resolve().parent
-MOVIES_FILE = BASE_DIR / "movies.txt"
 HERO_IMAGE = BASE_DIR / "assets" / "hero_banner.jpg"
 
+# Start building the retrieval engine when the server starts ("0" waits for Launch).
+WARMUP_ON_START = os.getenv("CINEMIND_WARMUP", "1") != "0"
+
+# Longest a chat answer waits on the tool layer once retrieval is done.
+TOOL_LAYER_TIMEOUT_S = float(os.getenv("CINEMIND_TOOL_TIMEOUT_S", "6"))
+
+# Semantic answer cache: cosine threshold (above 1 disables it), entry cap, lifetime.
+ANSWER_CACHE_THRESHOLD = float(os.getenv("CINEMIND_ANSWER_CACHE_THRESHOLD", "0.95"))
+ANSWER_CACHE_SIZE = int(os.getenv("CINEMIND_ANSWER_CACHE_SIZE", "512"))
+ANSWER_CACHE_TTL_S = float(os.getenv("CINEMIND_ANSWER_CACHE_TTL_S", "3600"))
+
+# Exact-match answer cache shared by all server processes on this host ("" disables it).
+ANSWER_DB = os.getenv(
+    "CINEMIND_ANSWER_DB",
+    str(Path(os.getenv("CINEMIND_CACHE_DIR", BASE_DIR / ".cache")) / "answers.sqlite3"),
+)
+ANSWER_DB_TTL_S = float(os.getenv("CINEMIND_ANSWER_DB_TTL_S", str(7 * 24 * 3600)))
+ANSWER_DB_MAX_ENTRIES = int(os.getenv("CINEMIND_ANSWER_DB_MAX_ENTRIES", "50000"))
+
 MOOD_ICONS = {
     "Action": "💥",
     "Sci-Fi": "🚀",
@@ -59,6 +99,25 @@ SAMPLE_QUESTIONS = [
     "Horror movie recommendations",
 ]
 
+# Per-title prompts behind the card, spotlight and dashboard buttons.
+TELL_ME_ABOUT_PROMPT = "Tell me about '{title}' and suggest 3 similar films from the database."
+DESCRIBE_PROMPT = "Describe '{title}' and recommend 3 similar films from the database."
+WHY_WATCH_PROMPT = "Why should I watch '{title}'?"
+TITLE_PROMPTS = (TELL_ME_ABOUT_PROMPT, DESCRIBE_PROMPT, WHY_WATCH_PROMPT)
+ANCHOR_SUFFIX = " Include films similar to '{title}'."
+
+# Prompts answered from the engine's movie neighbour graph instead of retrieval.
+_GRAPH_PROMPT_RES = tuple(
+    re.compile(re.escape(p).replace(re.escape("{title}"), "(?P<title>.+)"))
+    for p in (TELL_ME_ABOUT_PROMPT, DESCRIBE_PROMPT)
+)
+_ANCHOR_RE = re.compile(re.escape(ANCHOR_SUFFIX.strip()).replace(re.escape("{title}"), "(?P<title>.+)") + "$")
+# Graph neighbours of the "Similar to a film you like" anchor mixed into mood retrieval.
+ANCHOR_GRAPH_DOCS = 4
+
+# Titles whose fixed prompts get precomputed vectors and retrieval results.
+FIXED_PROMPT_TITLES = int(os.getenv("CINEMIND_FIXED_PROMPT_TITLES", "5000"))
+
 APP_UI_VERSION = "5.7"
 BLOCKED_MOODS = frozenset({"Marvel", "DC"})
 
@@ -105,23 +164,9 @@ def get_movie_titles() -> List[str]:
     return list(load_movie_catalog().keys())
 
 
-@st.cache_data
-def load_movie_catalog() -> Dict[str, dict]:
-    catalog: Dict[str, dict] = {}
-    raw = MOVIES_FILE.read_text(encoding="utf-8")
-    for block in [b.strip() for b in raw.split("\n---\n") if b.strip()]:
-        title_m = re.search(r"^Title:\s*(.+)$", block, re.MULTILINE)
-        genre_m = re.search(r"^Genre:\s*(.+)$", block, re.MULTILINE)
-        desc_m = re.search(r"^Description:\s*(.+)$", block, re.MULTILINE | re.DOTALL)
-        if not title_m:
-            continue
-        title = title_m.group(1).strip()
-        catalog[title] = {
-            "title": title,
-            "genre": genre_m.group(1).strip() if genre_m else "Unknown",
-            "description": desc_m.group(1).strip() if desc_m else "",
-        }
-    return catalog
+def load_movie_catalog() -> Mapping[str, dict]:
+    """Title -> movie info view over the shared catalog (re-parsed only when movies.txt changes)."""
+    return get_catalog().movies
 
 
 def get_movie_info(title: str) -> Optional[dict]:
@@ -129,11 +174,7 @@ def get_movie_info(title: str) -> Optional[dict]:
 
 
 def get_all_genres() -> List[str]:
-    tags = set()
-    for m in load_movie_catalog().values():
-        for g in m["genre"].split(","):
-            tags.add(g.strip())
-    return sorted(tags)
+    return get_catalog().genre_tags()
 
 
 def add_to_watchlist(title: str) -> None:
@@ -157,14 +198,101 @@ def ensure_rag_ready() -> bool:
     return bool(st.session_state.get("rag_ready") and st.session_state.get("qa_chain"))
 
 
+def shared_engine_ready() -> bool:
+    """True once any session in this server process has built the retrieval engine."""
+    # getattr: the warm-up thread may still be importing rag_core.
+    is_engine_ready = getattr(sys.modules.get("rag_core"), "is_engine_ready", None)
+    return bool(is_engine_ready and is_engine_ready())
+
+
+@st.cache_resource(show_spinner=False)
+def start_engine_warmup() -> threading.Thread:
+    """
+    Once per server process: import rag_core and start the shared engine build
+    on daemon threads, so neither the import nor the build blocks a render.
+    """
+
+    def warm() -> None:
+        import rag_core
+
+        rag_core.start_warmup()
+        rag_core.start_catalog_watcher()
+
+    thread = threading.Thread(target=warm, name="cinemind-import", daemon=True)
+    thread.start()
+    return thread
+
+
+def engine_build_progress():
+    """The shared engine build's progress, or None until rag_core has been imported."""
+    rag_core = sys.modules.get("rag_core")
+    build_progress = getattr(rag_core, "build_progress", None)
+    return build_progress() if build_progress is not None else None
+
+
+def describe_build(progress) -> str:
+    if progress is None or progress.stage == "idle":
+        return "Loading libraries…"
+    if progress.stage == "parsing":
+        return "Parsing movie documents…"
+    if progress.stage == "embedding":
+        return f"Embedding chunks {progress.embedded:,} / {progress.chunks:,}…"
+    if progress.stage == "indexing":
+        return f"Building the index over {progress.chunks:,} chunks…"
+    if progress.stage == "failed":
+        return f"Loading failed: {progress.error}"
+    return f"Library ready ({progress.documents:,} films, {progress.chunks:,} chunks)."
+
+
+def wait_for_engine(status) -> None:
+    """
+    Join the shared engine build (starting it if needed) and report its real
+    progress in ``status``. Sessions launching during warm-up all wait on the
+    same build; after warm-up this returns at once.
+    """
+    bar = st.progress(0.0, text="Loading libraries…")
+    import rag_core
+
+    build = rag_core.start_warmup()
+    reported = set()
+    while True:
+        build.join(timeout=0.25)
+        progress = rag_core.build_progress()
+        bar.progress(progress.fraction, text=describe_build(progress))
+        status.update(label=describe_build(progress))
+        # One line per finished stage; later stages imply the earlier ones.
+        done = {"parsing": 0, "embedding": 1, "indexing": 2, "ready": 3}.get(progress.stage, 0)
+        lines = [
+            f"Parsed {progress.documents:,} movie documents",
+            f"Embedded {progress.chunks:,} chunks",
+            "Built the retrieval index",
+        ]
+        for i in range(done):
+            if i not in reported:
+                st.write(lines[i])
+                reported.add(i)
+        if not build.is_alive():
+            break
+    if not rag_core.is_engine_ready():
+        raise RuntimeError(progress.error or "The movie library failed to load.")
+
+
 def start_rag(api_key: str) -> None:
     import rag_core
 
-    st.session_state.qa_chain = rag_core.build_rag_chain(api_key)
+    # The index is process-wide; only the LLM binding lives in this session.
+    chain = rag_core.build_rag_chain(api_key)
+    rag_core.start_catalog_watcher()
+    # An edit re-indexes in the background; give the swapped-in engine its prompts too.
+    pool = get_precompute_pool()
+    rag_core.on_engine_swap(lambda engine: pool.submit(precompute_fixed_prompts, engine))
+    warm_fixed_prompts(chain.engine.catalog_version, chain.engine)
+    st.session_state.qa_chain = chain
     st.session_state.rag_ready = True
 
 
 def reset_rag_state() -> None:
+    """Drop this session's chain; the shared index stays loaded for the next launch."""
     st.session_state.pop("qa_chain", None)
     st.session_state.rag_ready = False
 
@@ -172,7 +300,7 @@ def reset_rag_state() -> None:
 def enrich_question_for_retrieval(question: str) -> str:
     """Pull mentioned library titles into the query so compare/similar requests retrieve more than one film."""
     catalog = load_movie_catalog()
-    mentioned = [t for t in catalog if t.lower() in question.lower()]
+    mentioned = get_catalog().title_matcher().find(question)
     if not mentioned:
         return question
     hints = []
@@ -192,25 +320,262 @@ def enrich_question_for_retrieval(question: str) -> str:
     return f"{question}\n\nRelevant library films: {extra}"
 
 
-def ask_cinemind(
-    qa_chain, question: str, api_key: Optional[str] = None
-) -> tuple[str, list]:
-    safe, err = validate_chat_input(question)
-    if err:
-        return err, []
+@st.cache_resource
+def get_tool_pool() -> ThreadPoolExecutor:
+    """One pool per server process (app.py itself re-executes on every rerun)."""
+    return ThreadPoolExecutor(max_workers=8, thread_name_prefix="cinemind-tools")
+
+
+@st.cache_resource
+def get_precompute_pool() -> ThreadPoolExecutor:
+    """Fixed-prompt precompute runs here, so it never takes a chat request's tool worker."""
+    return ThreadPoolExecutor(max_workers=1, thread_name_prefix="cinemind-precompute")
+
+
+def wait_for_tool_layer(future: Optional[Future]) -> str:
+    """
+    Tool facts if the tool layer finished within the budget, else "". A late
+    call is cancelled if it has not started; a running one stops at its own
+    deadline (see gather_tool_layer), so it frees its worker soon after.
+    """
+    if future is None:
+        return ""
+    try:
+        return future.result(timeout=TOOL_LAYER_TIMEOUT_S)
+    except Exception:
+        future.cancel()
+        return ""
+
+
+def fixed_prompts() -> List[str]:
+    """Every question the UI can send verbatim: moods, sample chips and per-title buttons."""
+    prompts = [MOOD_PROMPTS[m] for m in get_mood_options()] + SAMPLE_QUESTIONS
+    for title in list(load_movie_catalog())[:FIXED_PROMPT_TITLES]:
+        prompts.extend(p.format(title=title) for p in TITLE_PROMPTS)
+    return prompts
+
+
+def precompute_fixed_prompts(engine) -> int:
+    """
+    Give the engine query vectors for the validated prompts (answer cache and
+    router) and MMR results for their enriched retrieval queries.
+    """
+    questions = [safe for safe, _ in map(validate_chat_input, fixed_prompts()) if safe]
+    engine.precompute_queries(questions, retrieve=False)
+    return engine.precompute_queries(
+        [enrich_question_for_retrieval(q) for q in questions if graph_prompt_title(q) is None]
+    )
+
+
+@st.cache_resource
+def warm_fixed_prompts(catalog_version: str, _engine) -> Future:
+    """Once per catalog version: precompute in the background so launch is not delayed."""
+    return get_precompute_pool().submit(precompute_fixed_prompts, _engine)
+
+
+@st.cache_resource
+def get_answer_cache() -> "SemanticAnswerCache":
+    from answer_cache import SemanticAnswerCache
+
+    return SemanticAnswerCache(
+        threshold=ANSWER_CACHE_THRESHOLD,
+        max_entries=ANSWER_CACHE_SIZE,
+        ttl_s=ANSWER_CACHE_TTL_S,
+    )
 
-    tool_layer = ""
+
+@st.cache_resource
+def get_answer_store() -> Optional["SqliteAnswerCache"]:
+    from answer_cache import SqliteAnswerCache
+
+    if not ANSWER_DB:
+        return None
+    try:
+        return SqliteAnswerCache(
+            Path(ANSWER_DB), ttl_s=ANSWER_DB_TTL_S, max_entries=ANSWER_DB_MAX_ENTRIES
+        )
+    except Exception:
+        return None
+
+
+def _chain_embed(qa_chain):
+    """The engine's query embedder (serves precomputed fixed prompts), or None."""
+    return getattr(getattr(qa_chain, "engine", None), "embed_query", None)
+
+
+def lookup_cached_answer(qa_chain, safe: str) -> tuple[Optional[tuple[str, list]], Optional[list]]:
+    """(cached (answer, sources) or None, question vector to store under on a miss)."""
+    embed = _chain_embed(qa_chain)
+    if embed is None or ANSWER_CACHE_THRESHOLD > 1:
+        return None, None
+    vector = embed(safe)
+    catalog = get_catalog()
+    titles = catalog.title_matcher().find(safe)
+    return get_answer_cache().lookup(vector, catalog.version, titles), vector
+
+
+def remember_answer(vector: Optional[list], safe: str, answer: str, sources: list) -> None:
+    if vector is not None and answer:
+        catalog = get_catalog()
+        titles = catalog.title_matcher().find(safe)
+        get_answer_cache().store(vector, safe, answer, sources, catalog.version, titles)
+
+
+def graph_prompt_title(safe: str) -> Optional[str]:
+    """The title in a Tell me about / Describe button prompt, else None."""
+    for pattern in _GRAPH_PROMPT_RES:
+        m = pattern.fullmatch(safe)
+        if m:
+            return m.group("title")
+    return None
+
+
+def similar_titles(title: str, k: int = 3) -> List[str]:
+    """Nearest films from the engine's neighbour graph; [] before launch."""
+    chain = st.session_state.get("qa_chain")
+    neighbours = getattr(getattr(chain, "engine", None), "neighbours", None)
+    if neighbours is None:
+        return []
+    return [t for t, _ in neighbours.similar(title, k)]
+
+
+def retrieve_sources(qa_chain, safe: str, query: str, vector: Optional[list] = None) -> list:
+    """
+    Similar-film button prompts read the precomputed neighbour graph (no
+    embedding, no index scan); other questions go through retrieval, with the
+    optional mood anchor's neighbours mixed in. ``vector`` is the embedding
+    of ``safe``, reused when the retrieval query is the question itself.
+    """
+    vector = vector if query == safe else None
+    engine = getattr(qa_chain, "engine", None)
+    neighbours = getattr(engine, "neighbours", None)
+    if neighbours is None:
+        return qa_chain.retrieve(query, vector)
+    title = graph_prompt_title(safe)
+    if title in neighbours:
+        return engine.similar_documents(title)
+    sources = qa_chain.retrieve(query, vector)
+    anchor = _ANCHOR_RE.search(safe)
+    if anchor and anchor.group("title") in neighbours:
+        graph = engine.similar_documents(anchor.group("title"), ANCHOR_GRAPH_DOCS)
+        seen = {d.id for d in graph}
+        sources = (graph + [d for d in sources if d.id not in seen])[: max(len(sources), len(graph))]
+    return sources
+
+
+def prepare_cinemind_answer(
+    qa_chain, safe: str, api_key: Optional[str] = None, vector: Optional[list] = None
+) -> tuple[str, list, Optional[str]]:
+    """
+    Run the tool layer and retrieval concurrently for a validated question.
+    ``vector`` is the question's embedding from the answer-cache lookup; the
+    router and retrieval reuse it instead of encoding the question again.
+    Returns (prompt question, retrieved docs, exact-match answer cache key).
+    """
+    tool_future = None
     if api_key:
-        tool_layer = gather_tool_layer(api_key, safe)
+        from agent_tools import gather_tool_layer
+
+        tool_future = get_tool_pool().submit(
+            gather_tool_layer,
+            api_key,
+            safe,
+            _chain_embed(qa_chain),
+            TOOL_LAYER_TIMEOUT_S,
+            vector,
+        )
     query = enrich_question_for_retrieval(safe)
+    sources = retrieve_sources(qa_chain, safe, query, vector)
+    tool_layer = wait_for_tool_layer(tool_future)
     if tool_layer:
         query = (
             f"{query}\n\n[Structured library facts from tools — use only if consistent "
             f"with retrieved context:]\n{tool_layer}"
         )
-    result = qa_chain.invoke({"query": query})
-    answer = result.get("result", "Sorry, I could not generate a response.").strip()
-    return answer, result.get("source_documents", [])
+    key = None
+    if hasattr(qa_chain, "model_params"):
+        from answer_cache import SqliteAnswerCache
+
+        key = SqliteAnswerCache.make_key(
+            normalize_user_text(safe).casefold(),
+            [d.id for d in sources if d.id],
+            qa_chain.prompt_hash,
+            qa_chain.model_params,
+            extra=tool_layer,
+        )
+    return query, sources, key
+
+
+def _stored_answer(key: Optional[str]) -> Optional[tuple[str, list]]:
+    store = get_answer_store()
+    return store.get(key) if store and key else None
+
+
+def _store_answer(key: Optional[str], answer: str, sources: list) -> None:
+    store = get_answer_store()
+    if store and key and answer:
+        store.put(key, answer, sources)
+
+
+def ask_cinemind(
+    qa_chain, question: str, api_key: Optional[str] = None
+) -> tuple[str, list]:
+    safe, err = validate_chat_input(question)
+    if err:
+        return err, []
+    cached, vector = lookup_cached_answer(qa_chain, safe)
+    if cached:
+        return cached
+    query, sources, key = prepare_cinemind_answer(qa_chain, safe, api_key, vector)
+    stored = _stored_answer(key)
+    if stored:
+        remember_answer(vector, safe, *stored)
+        return stored
+    answer = qa_chain.answer(query, sources).strip()
+    if not answer:
+        return "Sorry, I could not generate a response.", sources
+    remember_answer(vector, safe, answer, sources)
+    _store_answer(key, answer, sources)
+    return answer, sources
+
+
+def stream_cinemind(
+    qa_chain, question: str, api_key: Optional[str] = None
+) -> tuple[Iterator[str], list]:
+    """Like ask_cinemind, but returns once retrieval is done; the answer arrives as a token stream."""
+    safe, err = validate_chat_input(question)
+    if err:
+        return iter([err]), []
+    cached, vector = lookup_cached_answer(qa_chain, safe)
+    if cached:
+        answer, sources = cached
+        return iter([answer]), sources
+    query, sources, key = prepare_cinemind_answer(qa_chain, safe, api_key, vector)
+    stored = _stored_answer(key)
+    if stored:
+        remember_answer(vector, safe, *stored)
+        return iter([stored[0]]), stored[1]
+
+    def tokens() -> Iterator[str]:
+        parts: List[str] = []
+        for token in qa_chain.stream_answer(query, sources):
+            parts.append(token)
+            yield token
+        # Only a fully streamed answer is cached.
+        answer = "".join(parts).strip()
+        remember_answer(vector, safe, answer, sources)
+        _store_answer(key, answer, sources)
+
+    return tokens(), sources
+
+
+def source_titles(sources: list) -> List[str]:
+    titles: List[str] = []
+    for doc in sources:
+        t = doc.metadata.get("title")
+        if t and t not in titles:
+            titles.append(t)
+    return titles
 
 
 def get_mood_options() -> List[str]:
@@ -634,9 +999,8 @@ def shuffle_dashboard_featured() -> None:
 def run_launch(api_key: str, button_key: str = "launch_main") -> None:
     if st.button("Launch CineMind", type="primary", use_container_width=True, key=button_key):
         with st.status("Loading your movie library…", expanded=True) as status:
-            st.write("Preparing recommendations...")
-            st.write("Indexing films...")
             try:
+                wait_for_engine(status)
                 start_rag(api_key)
                 status.update(label="Ready!", state="complete")
                 st.balloons()
@@ -653,12 +1017,30 @@ def render_offline_welcome(api_key: str, movie_count: int) -> None:
     render_dashboard_hero(False)
     if HERO_IMAGE.exists():
         st.image(str(HERO_IMAGE), use_container_width=True)
+    render_warmup_status()
+    run_launch(api_key, "launch_dashboard")
+
+
+@st.fragment(run_every=1.0)
+def render_warmup_status() -> None:
+    """Readiness note for the Launch page, refreshed while the background build runs."""
+    progress = engine_build_progress()
+    building = progress is not None and progress.stage not in ("idle", "ready", "failed")
+    if shared_engine_ready():
+        note = "Your film library is already loaded — launch is instant. "
+    elif building or (progress is None and WARMUP_ON_START):
+        note = "Your film library is loading in the background — launch waits for it to finish. "
+    elif progress is not None and progress.stage == "failed":
+        note = "Loading the film library in the background failed — Launch will retry. "
+    else:
+        note = "First launch takes about 1–2 minutes to load your film library. "
     st.markdown(
-        '<p class="simple-note">First launch takes about 1–2 minutes to load your film library. '
+        f'<p class="simple-note">{note}'
         "Then Pick Cine, Compare, Chat, and Library unlock.</p>",
         unsafe_allow_html=True,
     )
-    run_launch(api_key, "launch_dashboard")
+    if building or (progress is None and WARMUP_ON_START):
+        st.progress(progress.fraction if progress else 0.0, text=describe_build(progress))
 
 
 def render_dashboard_hero(online: bool) -> None:
@@ -808,6 +1190,9 @@ def render_movie_card(movie: dict, key_prefix: str = "", return_page: Optional[s
         </div>""",
         unsafe_allow_html=True,
     )
+    similar = similar_titles(movie["title"])
+    if similar:
+        st.caption("Similar: " + " · ".join(similar))
     c1, c2 = st.columns(2)
     with c1:
         if st.button("Add to watchlist", key=f"{key_prefix}_wl_{movie['title']}", use_container_width=True):
@@ -815,9 +1200,7 @@ def render_movie_card(movie: dict, key_prefix: str = "", return_page: Optional[s
             st.toast(f"Added {movie['title']}")
     with c2:
         if st.button("Ask CineMind", key=f"{key_prefix}_ask_{movie['title']}", use_container_width=True):
-            st.session_state.pending_question = (
-                f"Tell me about '{movie['title']}' and suggest 3 similar films from the database."
-            )
+            st.session_state.pending_question = TELL_ME_ABOUT_PROMPT.format(title=movie["title"])
             if return_page:
                 st.session_state.return_after_chat = return_page
                 st.session_state.compare_context = None
@@ -827,24 +1210,20 @@ def render_movie_card(movie: dict, key_prefix: str = "", return_page: Optional[s
 
 def render_library_page() -> None:
     st.markdown("## Browse library")
-    catalog = load_movie_catalog()
+    catalog = get_catalog()
+    index = catalog.index()
     c1, c2 = st.columns([2, 1])
     with c1:
         query = st.text_input("Search by title", placeholder="e.g. Inception")
     with c2:
         genre_filter = st.selectbox("Genre", ["All"] + get_all_genres())
 
-    results = []
-    for m in catalog.values():
-        if query and query.lower() not in m["title"].lower():
-            continue
-        if genre_filter != "All" and genre_filter.lower() not in m["genre"].lower():
-            continue
-        results.append(m)
-    results.sort(key=lambda x: x["title"])
+    # Posting-list intersection; ids come back already in title order.
+    results = index.search(query, None if genre_filter == "All" else genre_filter)
     st.caption(f"{len(results)} films")
 
-    for m in results[:40]:
+    for mid in results[:40]:
+        m = catalog.info(int(index.rows[mid]))
         with st.expander(m["title"], expanded=False):
             render_movie_card(m, key_prefix="lib")
     if len(results) > 40:
@@ -962,9 +1341,7 @@ def render_dashboard_featured() -> None:
             st.session_state.page = "pick"
             st.rerun()
         if st.button("💬 Ask about this film", use_container_width=True, key="dash_ask_feat"):
-            st.session_state.pending_question = (
-                f"Tell me about '{featured['title']}' and suggest 3 similar films from the database."
-            )
+            st.session_state.pending_question = TELL_ME_ABOUT_PROMPT.format(title=featured["title"])
             st.session_state.return_after_chat = "dashboard"
             st.session_state.page = "chat"
             st.rerun()
@@ -1014,7 +1391,7 @@ def render_dashboard(movie_count: int, online: bool, api_key: str) -> None:
                         unsafe_allow_html=True,
                     )
                     if st.button("Ask CineMind", key=f"rec_{title}", use_container_width=True):
-                        st.session_state.pending_question = f"Why should I watch '{title}'?"
+                        st.session_state.pending_question = WHY_WATCH_PROMPT.format(title=title)
                         st.session_state.return_after_chat = "dashboard"
                         st.session_state.page = "chat"
                         st.rerun()
@@ -1066,7 +1443,7 @@ def render_reel_studio(titles: List[str]) -> None:
         if st.button("Pick Cine", type="primary", use_container_width=True):
             q = MOOD_PROMPTS[selected_mood]
             if anchor != "— none —":
-                q += f" Include films similar to '{anchor}'."
+                q += ANCHOR_SUFFIX.format(title=anchor)
             st.session_state.pending_question = q
             st.session_state.return_after_chat = "pick"
             st.session_state.compare_context = None
@@ -1075,9 +1452,7 @@ def render_reel_studio(titles: List[str]) -> None:
     with b2:
         if st.button("Random", use_container_width=True):
             pick = random.choice(titles)
-            st.session_state.pending_question = (
-                f"Describe '{pick}' and recommend 3 similar films from the database."
-            )
+            st.session_state.pending_question = DESCRIBE_PROMPT.format(title=pick)
             st.session_state.return_after_chat = "pick"
             st.session_state.compare_context = None
             st.session_state.page = "chat"
@@ -1125,13 +1500,11 @@ def render_chat_recommendation() -> None:
             st.toast(f"Added {title}")
     with c2:
         if st.button("Ask about this", key="chat_rec_ask", use_container_width=True):
-            st.session_state.pending_question = (
-                f"Tell me about '{title}' and suggest 3 similar films from the database."
-            )
+            st.session_state.pending_question = TELL_ME_ABOUT_PROMPT.format(title=title)
             st.rerun()
 
 
-def render_spotlight(title: Optional[str]) -> None:
+def render_spotlight(title: Optional[str], actions: bool = True) -> None:
     if not title:
         return
     info = get_movie_info(title)
@@ -1148,7 +1521,7 @@ def render_spotlight(title: Optional[str]) -> None:
     )
     if info and info.get("description"):
         st.caption(info["description"][:220] + ("..." if len(info["description"]) > 220 else ""))
-    if st.button("Add to watchlist", key=f"spot_wl_{title}"):
+    if actions and st.button("Add to watchlist", key=f"spot_wl_{title}"):
         add_to_watchlist(title)
         st.toast(f"Added {title}")
 
@@ -1180,16 +1553,22 @@ def render_chat(qa_chain) -> None:
 
     if user_text:
         st.session_state.messages.append({"role": "user", "content": user_text})
-        with st.spinner("Finding movies for you…"):
+        with st.chat_message("user", avatar="🍿"):
+            st.markdown(user_text)
+        with st.chat_message("assistant", avatar="🎬"):
             try:
-                answer, sources = ask_cinemind(
-                    qa_chain, user_text, get_openai_api_key()
-                )
-                src_titles = []
-                for doc in sources:
-                    t = doc.metadata.get("title")
-                    if t and t not in src_titles:
-                        src_titles.append(t)
+                with st.spinner("Finding movies for you…"):
+                    tokens, sources = stream_cinemind(
+                        qa_chain, user_text, get_openai_api_key()
+                    )
+                src_titles = source_titles(sources)
+                # Sources are known as soon as retrieval finishes; show them while the LLM writes.
+                if src_titles:
+                    render_spotlight(src_titles[0], actions=False)
+                answer = st.write_stream(tokens)
+                if not isinstance(answer, str):
+                    answer = "".join(str(part) for part in answer)
+                answer = answer.strip() or "Sorry, I could not generate a response."
                 if src_titles:
                     refs = " · ".join(src_titles[:5])
                     answer += f"\n\n*Films from your library in this reply:* {refs}"
@@ -1232,6 +1611,22 @@ def render_sidebar() -> None:
         wl_n = len(st.session_state.get("watchlist", []))
         if wl_n:
             st.caption(f"Watchlist · {wl_n}")
+        if ensure_rag_ready():
+            # Only once launched: the cache and router modules load lazily.
+            cache = get_answer_cache().stats()
+            if cache["hits"] + cache["misses"]:
+                st.caption(
+                    f"Answer cache · {cache['hits']} hits / {cache['misses']} misses "
+                    f"({cache['hit_rate']:.0%})"
+                )
+            from intent_router import router
+
+            routed = router.summary()
+            if routed["total"]:
+                st.caption(
+                    f"Tool router · {routed['remote_skipped']}/{routed['total']} remote calls "
+                    f"skipped ({routed['mean_latency_ms']:.1f} ms avg)"
+                )
         st.divider()
         st.markdown("##### Controls")
         if ensure_rag_ready() and st.button("Clear chat", use_container_width=True):
@@ -1245,6 +1640,8 @@ def render_sidebar() -> None:
 
 
 def run_app() -> None:
+    if WARMUP_ON_START:
+        start_engine_warmup()
     inject_styles()
     purge_legacy_session()
     init_session_state()
@@ -1307,6 +1704,21 @@ def run_app() -> None:
             render_chat(st.session_state.qa_chain)
 
 
+def report_startup() -> None:
+    """CINEMIND_PROFILE_STARTUP=1: log this run's render time and what it imported."""
+    import logging
+
+    elapsed_ms = 1000 * (time.perf_counter() - _SCRIPT_START)
+    new = sorted({m.split(".")[0] for m in set(sys.modules) - _MODULES_AT_START})
+    logging.getLogger("cinemind.startup").warning(
+        "script run rendered in %.0f ms; %d new top-level modules: %s",
+        elapsed_ms,
+        len(new),
+        ", ".join(new),
+    )
+    st.sidebar.caption(f"⏱ rendered in {elapsed_ms:.0f} ms")
+
+
 # =============================================================================
 # Main app flow
 # =============================================================================
@@ -1319,6 +1731,8 @@ st.set_page_config(
 
 try:
     run_app()
+    if PROFILE_STARTUP:
+        report_startup()
 except Exception as exc:
     st.error("CineMindAI failed to start")
     st.exception(exc)
@@ -0,0 +1,75 @@
+"""
+IVF-PQ recall versus latency, to pick CINEMIND_ANN_PARAMS.
+
+Builds one index per (nlist, m) setting over a synthetic clustered corpus,
+then sweeps nprobe and reports recall@k of the final top-k against exact
+search, median query latency and index size.
+
+    python -m benchmarks.bench_ann --n 200000 --nlist 512 1024 --nprobe 4 8 16 32
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+from langchain_core.documents import Document
+
+from ann_index import IvfPqParams
+from benchmarks.bench_recall import _synthetic
+from benchmarks.bench_vector_store import _PrecomputedEmbeddings
+from vector_codecs import top_k_indices
+from vector_store import NumpyVectorStore
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--n", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nlist", type=int, nargs="+", default=[256, 1024])
+    parser.add_argument("--m", type=int, nargs="+", default=[16, 32])
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[4, 8, 16, 32])
+    parser.add_argument("--refine", type=int, default=IvfPqParams.refine)
+    args = parser.parse_args()
+
+    vectors, queries = _synthetic(args.n, args.queries)
+    emb = _PrecomputedEmbeddings(vectors, queries)
+    docs = [Document(page_content=str(i)) for i in range(args.n)]
+    exact = [set(top_k_indices(vectors @ q, args.k).tolist()) for q in queries]
+
+    exact_store = NumpyVectorStore(emb)
+    exact_store.add_vectors(docs, vectors)
+    t0 = time.perf_counter()
+    for q in queries:
+        exact_store.similarity_search_by_vector(q, k=args.k)
+    exact_ms = 1000 * (time.perf_counter() - t0) / len(queries)
+    print(f"{args.n} vectors; exact search {exact_ms:.2f} ms/query, {exact_store.nbytes / 2**20:.0f} MiB")
+    print(f"{'nlist':>6} {'m':>3} {'nprobe':>6} {'build s':>8} {f'recall@{args.k}':>9} {'ms/query':>9} {'ANN MiB':>8}")
+
+    for nlist in args.nlist:
+        for m in args.m:
+            params = IvfPqParams(nlist=nlist, m=m, refine=args.refine, min_vectors=0)
+            store = NumpyVectorStore(emb, index="ivfpq", ann_params=params)
+            t0 = time.perf_counter()
+            store.add_vectors(docs, vectors)
+            build_s = time.perf_counter() - t0
+            ann_mib = store._ann.nbytes / 2**20
+            for nprobe in args.nprobe:
+                params.nprobe = nprobe
+                hits, times = 0, []
+                for q, truth in zip(queries, exact):
+                    t0 = time.perf_counter()
+                    found = store.similarity_search_with_score_by_vector(q, k=args.k)
+                    times.append(time.perf_counter() - t0)
+                    hits += len(truth.intersection(int(d.page_content) for d, _ in found))
+                recall = hits / (args.k * len(queries))
+                print(
+                    f"{nlist:>6} {m:>3} {nprobe:>6} {build_s:>8.1f} {recall:>9.3f} "
+                    f"{1000 * float(np.median(times)):>9.2f} {ann_mib:>8.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
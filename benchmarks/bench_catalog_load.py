@@ -0,0 +1,92 @@
+"""
+Catalog load: the streaming, memory-mapped loader versus read_text + split.
+
+Writes a synthetic library of n movies with long descriptions (one file, or
+``--shards`` files in a directory), then reports the load time and the
+tracemalloc peak of MovieCatalog.load next to the old whole-file approach.
+The catalog's own columns (titles, offsets, genre ids) still grow with n.
+The description text no longer does.
+
+    python -m benchmarks.bench_catalog_load --movies 10000 100000 --shards 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import shutil
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from catalog import MovieCatalog
+
+_GENRES = ["Action", "Comedy", "Drama", "Sci-Fi", "Horror", "Romance", "Thriller", "Family"]
+
+
+def _write_library(root: Path, n: int, shards: int, desc_words: int, rng: random.Random) -> Path:
+    words = ["".join(rng.choice("abcdefghij") for _ in range(6)) for _ in range(2_000)]
+    target = root / "movies" if shards > 1 else root / "movies.txt"
+    if shards > 1:
+        target.mkdir()
+    files = [target / f"part-{s:03d}.txt" for s in range(shards)] if shards > 1 else [target]
+    handles = [open(f, "w", encoding="utf-8") for f in files]
+    try:
+        for i in range(n):
+            desc = " ".join(rng.choice(words) for _ in range(desc_words))
+            genre = ", ".join(rng.sample(_GENRES, 2))
+            handles[i % shards].write(
+                f"Title: Movie {i}\nGenre: {genre}\nDescription: {desc}\n\n---\n\n"
+            )
+    finally:
+        for h in handles:
+            h.close()
+    return target
+
+
+def _measure(fn) -> tuple:
+    """Untraced wall time, then the tracemalloc peak of a second run (MB)."""
+    t0 = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - t0
+    tracemalloc.start()
+    result = fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return elapsed, peak / 2**20
+
+
+def _legacy(path: Path):
+    files = sorted(path.glob("*.txt")) if path.is_dir() else [path]
+    return [b for f in files for b in f.read_text(encoding="utf-8").split("\n---\n")]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--movies", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--shards", type=int, default=1)
+    parser.add_argument("--desc-words", type=int, default=120)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'movies':>9} {'file MB':>8} {'load s':>7} {'peak MB':>8} {'split s':>8} {'split peak MB':>14}")
+    for n in args.movies:
+        root = Path(tempfile.mkdtemp(prefix="cinemind-bench-"))
+        try:
+            path = _write_library(root, n, max(1, args.shards), args.desc_words, random.Random(args.seed))
+            files = sorted(path.glob("*.txt")) if path.is_dir() else [path]
+            size_mb = sum(f.stat().st_size for f in files) / 2**20
+            load_s, load_peak = _measure(lambda: MovieCatalog.load(path))
+            split_s, split_peak = _measure(lambda: _legacy(path))
+            print(
+                f"{n:>9,} {size_mb:>8.1f} {load_s:>7.2f} {load_peak:>8.1f} "
+                f"{split_s:>8.2f} {split_peak:>14.1f}"
+            )
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
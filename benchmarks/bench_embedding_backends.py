@@ -0,0 +1,87 @@
+"""
+Embedding backends: load time, encode throughput, query latency and memory.
+
+Each backend is measured in a fresh interpreter. That way its import and
+model-load time and its peak resident memory are not hidden by an earlier
+backend's runtime already being loaded.
+
+    python -m benchmarks.bench_embedding_backends --backends torch torch-int8 onnx onnx-int8
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+from rag_core import EMBED_MODEL_DIR
+
+
+def _worker(name: str, model_dir: str, docs: int, queries: int) -> dict:
+    t0 = time.perf_counter()
+    from catalog import get_catalog
+    from embedding_backends import make_backend
+    from rag_core import EMBED_MODEL_NAME
+
+    backend = make_backend(name, EMBED_MODEL_NAME, model_dir)
+    backend.encode(["warm up"])
+    load_s = time.perf_counter() - t0
+
+    catalog = get_catalog()
+    texts = [catalog.block(i % len(catalog)) for i in range(docs)]
+    t0 = time.perf_counter()
+    backend.encode(texts)
+    throughput = len(texts) / (time.perf_counter() - t0)
+
+    latencies = []
+    for i in range(queries):
+        t0 = time.perf_counter()
+        backend.encode([f"movies similar to {catalog.titles[i % len(catalog)]}"])
+        latencies.append(1000 * (time.perf_counter() - t0))
+    return {
+        "backend": backend.name,
+        "requested": name,
+        "load_s": load_s,
+        "docs_per_s": throughput,
+        "query_ms": statistics.median(latencies),
+        "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--backends", nargs="+", default=["torch", "torch-int8", "onnx", "onnx-int8"])
+    parser.add_argument("--docs", type=int, default=512)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--model-dir", default=str(EMBED_MODEL_DIR))
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(_worker(args.worker, args.model_dir, args.docs, args.queries)))
+        return
+
+    print(f"{'backend':>11} {'load s':>7} {'docs/s':>8} {'query ms':>9} {'max RSS MB':>11}")
+    for name in args.backends:
+        proc = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_embedding_backends", "--worker", name,
+             "--docs", str(args.docs), "--queries", str(args.queries), "--model-dir", args.model_dir],
+            capture_output=True, text=True,
+        )
+        if proc.returncode:
+            print(f"{name:>11}  failed: {proc.stderr.strip().splitlines()[-1:]}")
+            continue
+        r = json.loads(proc.stdout.strip().splitlines()[-1])
+        label = name if r["backend"] == name else f"{name}->{r['backend']}"
+        print(
+            f"{label:>11} {r['load_s']:>7.2f} {r['docs_per_s']:>8.0f} "
+            f"{r['query_ms']:>9.2f} {r['max_rss_mb']:>11.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+validate_chat_input throughput as the prompt-defense rule list grows.
+
+Compares the old scan (one ``in`` check per blocked phrase plus ``count``
+passes) with CompiledRules forced onto each strategy (the per-phrase
+str.count path and the single-pass Aho-Corasick automaton), on the same
+messages, for growing numbers of synthetic rules. Reports compile time,
+messages/s, the strategy CompiledRules picks by default, and the smallest
+measured rule count at which the automaton beats the direct path: the
+break-even that DIRECT_SCAN_MAX_RULES should sit near.
+
+    python -m benchmarks.bench_prompt_rules --rules 17 50 100 150 200 500 1000 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from typing import List
+
+from prompt_defense import (
+    _BLOCKED_SUBSTRINGS,
+    _DEFAULT_LIMITS,
+    DIRECT_SCAN_MAX_RULES,
+    CompiledRules,
+    PromptRules,
+)
+
+_WORDS = (
+    "recommend suggest movie film tonight similar compare thriller comedy drama "
+    "the a with and for best about why should watch plot ending director cast"
+).split()
+
+
+def _rules(n: int, rng: random.Random) -> PromptRules:
+    blocked = list(_BLOCKED_SUBSTRINGS)
+    alphabet = "abcdefghijklmnopqrstuvwxyz :-_"
+    while len(blocked) < n:
+        blocked.append("".join(rng.choice(alphabet) for _ in range(rng.randint(6, 24))).strip())
+    return PromptRules(blocked[:n], dict(_DEFAULT_LIMITS))
+
+
+def _messages(count: int, rng: random.Random) -> List[str]:
+    return [
+        " ".join(rng.choice(_WORDS) for _ in range(rng.randint(8, 60))).lower()
+        for _ in range(count)
+    ]
+
+
+def _old_violation(rules: PromptRules, lower: str) -> bool:
+    for bad in rules.blocked:
+        if bad in lower:
+            return True
+    return any(lower.count(p) > n for p, n in rules.limits.items())
+
+
+def _rate(fn, messages: List[str], repeat: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        for m in messages:
+            fn(m)
+    return repeat * len(messages) / (time.perf_counter() - t0)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--rules", type=int, nargs="+", default=[17, 50, 100, 150, 200, 500, 1_000, 5_000]
+    )
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(
+        f"{'rules':>6} {'compile ms':>11} {'old msg/s':>11} {'direct msg/s':>13} "
+        f"{'automaton msg/s':>16} {'default':>10}"
+    )
+    break_even = None
+    for n in sorted(args.rules):
+        rng = random.Random(args.seed)
+        rules = _rules(n, rng)
+        messages = _messages(args.messages, rng)
+        direct = CompiledRules(rules, direct_max=sys.maxsize)
+        t0 = time.perf_counter()
+        automaton = CompiledRules(rules, direct_max=0)
+        compile_ms = 1000 * (time.perf_counter() - t0)
+        for compiled in (direct, automaton):
+            assert all(
+                (compiled.violation(m) is not None) == _old_violation(rules, m) for m in messages
+            )
+        old = _rate(lambda m: _old_violation(rules, m), messages, args.repeat)
+        direct_rate = _rate(direct.violation, messages, args.repeat)
+        automaton_rate = _rate(automaton.violation, messages, args.repeat)
+        if break_even is None and automaton_rate > direct_rate:
+            break_even = n
+        default = "direct" if CompiledRules(rules).direct else "automaton"
+        print(
+            f"{n:>6} {compile_ms:>11.1f} {old:>11.0f} {direct_rate:>13.0f} "
+            f"{automaton_rate:>16.0f} {default:>10}"
+        )
+    if break_even is None:
+        print("automaton never faster at the measured sizes")
+    else:
+        print(
+            f"break-even: automaton faster from {break_even} rules "
+            f"(DIRECT_SCAN_MAX_RULES = {DIRECT_SCAN_MAX_RULES})"
+        )
+
+
+if __name__ == "__main__":
+    main()
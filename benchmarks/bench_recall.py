@@ -0,0 +1,77 @@
+"""
+Recall@k and memory of each vector storage mode against float32 search.
+
+By default uses a synthetic clustered corpus with MiniLM's 384 dimensions.
+--movies embeds the chunks of movies.txt with the real model (needs
+sentence-transformers) and queries with the app's fixed prompts.
+
+    python -m benchmarks.bench_recall --n 100000 --pca-dim 96
+"""
+
+from __future__ import annotations
+
+import argparse
+
+import numpy as np
+
+from vector_codecs import STORAGE_MODES, recall_report
+
+DIM = 384
+
+
+def _synthetic(n: int, n_queries: int, seed: int = 0):
+    """Gaussian clusters on the unit sphere: closer to sentence embeddings than iid noise."""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((max(8, n // 200), DIM)).astype(np.float32)
+    labels = rng.integers(0, len(centers), n + n_queries)
+    points = centers[labels] + 0.6 * rng.standard_normal((n + n_queries, DIM)).astype(np.float32)
+    points /= np.linalg.norm(points, axis=1, keepdims=True)
+    return points[:n], points[n:]
+
+
+def _movies():
+    import rag_core
+
+    engine = rag_core.RagEngine()
+    store = engine.vectorstore
+    vectors = store.decode(np.arange(len(store)))
+    questions = [
+        "Recommend action movies",
+        "Suggest sci-fi films",
+        "Movies similar to Interstellar",
+        "Best family movies",
+        "Horror movie recommendations",
+        "Romantic films for a date night",
+        "Crime and mystery films with gripping plots",
+        "Animated films for all ages",
+    ]
+    queries = np.asarray(engine.embeddings.embed_documents(questions), dtype=np.float32)
+    return vectors, queries
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--n", type=int, default=20_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--pca-dim", type=int, default=128)
+    parser.add_argument("--modes", nargs="+", default=list(STORAGE_MODES))
+    parser.add_argument("--movies", action="store_true")
+    args = parser.parse_args()
+
+    if args.movies:
+        vectors, queries = _movies()
+    else:
+        vectors, queries = _synthetic(args.n, args.queries)
+    rows = recall_report(vectors, queries, args.k, args.modes, args.pca_dim)
+    print(f"{len(vectors)} vectors, {len(queries)} queries, dim {vectors.shape[1]}")
+    print(f"{'mode':<8}  {'recall@' + str(args.k):>9}  {'bytes/vec':>9}  {'ratio':>6}")
+    for row in rows:
+        print(
+            f"{row['mode']:<8}  {row[f'recall@{args.k}']:>9.3f}  "
+            f"{row['bytes_per_vector']:>9.0f}  {row['compression']:>5.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
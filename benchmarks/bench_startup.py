@@ -0,0 +1,104 @@
+"""
+Cold-start cost of app.py: import time per top-level module and time to
+first render of the pre-launch page.
+
+Each run is a fresh interpreter started with ``-X importtime``, which renders
+app.py once through Streamlit's AppTest harness. Module times are cumulative
+import times of the top-level packages, summed per package. ``--budget-ms``
+(default 2500, 0 turns it off) makes the script a gate: it exits non-zero
+when the median first render is over budget. The background engine warm-up
+is off (CINEMIND_WARMUP=0) unless ``--warmup`` is given, since its imports
+would otherwise land in the numbers depending on how far the daemon thread
+got before exit.
+
+    python -m benchmarks.bench_startup --runs 3 --top 15 --budget-ms 2500
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Tuple
+
+APP = Path(__file__).resolve().parent.parent / "app.py"
+
+_DRIVER = """
+import json, time
+t0 = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+harness_s = time.perf_counter() - t0
+at = AppTest.from_file({app!r}, default_timeout=120)
+t1 = time.perf_counter()
+at.run()
+render_s = time.perf_counter() - t1
+assert not at.exception, [e.value for e in at.exception]
+print(json.dumps({{"harness_s": harness_s, "first_render_s": render_s}}))
+"""
+
+_LINE_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def _run_once(warmup: bool = False) -> Tuple[dict, Dict[str, float]]:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _DRIVER.format(app=str(APP))],
+        capture_output=True,
+        text=True,
+        cwd=APP.parent,
+        env={**os.environ, "CINEMIND_WARMUP": "1" if warmup else "0"},
+    )
+    if proc.returncode:
+        raise SystemExit(proc.stderr.strip().splitlines()[-1])
+    per_package: Dict[str, float] = defaultdict(float)
+    for line in proc.stderr.splitlines():
+        m = _LINE_RE.match(line)
+        if m and m.group(3) == " ":  # top-level entries only; nested ones are included
+            per_package[m.group(4).split(".")[0]] += int(m.group(2)) / 1000.0
+    return json.loads(proc.stdout.strip().splitlines()[-1]), per_package
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--budget-ms", type=float, default=2_500.0)
+    parser.add_argument("--json", action="store_true", help="print one JSON summary")
+    parser.add_argument("--warmup", action="store_true", help="leave the engine warm-up on")
+    args = parser.parse_args()
+
+    renders, totals = [], []
+    packages: Dict[str, list] = defaultdict(list)
+    for _ in range(args.runs):
+        timing, per_package = _run_once(args.warmup)
+        renders.append(1000 * timing["first_render_s"])
+        totals.append(sum(per_package.values()))
+        for name, ms in per_package.items():
+            packages[name].append(ms)
+
+    median_render = statistics.median(renders)
+    ranked = sorted(((statistics.median(v), k) for k, v in packages.items()), reverse=True)
+    summary = {
+        "first_render_ms": median_render,
+        "import_total_ms": statistics.median(totals),
+        "top_imports_ms": {k: round(ms, 1) for ms, k in ranked[: args.top]},
+    }
+    if args.json:
+        print(json.dumps(summary))
+    else:
+        print(f"first render (app.py, pre-launch page): {median_render:.0f} ms median of {args.runs}")
+        print(f"imports, whole process:                 {summary['import_total_ms']:.0f} ms")
+        for ms, name in ranked[: args.top]:
+            print(f"  {name:<32} {ms:>8.1f} ms")
+    if args.budget_ms and median_render > args.budget_ms:
+        print(f"over budget: {median_render:.0f} ms > {args.budget_ms:.0f} ms", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
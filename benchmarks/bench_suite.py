@@ -0,0 +1,324 @@
+"""
+Hot-path benchmark suite over synthetic catalogs, fully offline, as JSON.
+
+For each catalog size a library is generated (bench_catalog_load's
+generator) and measured in a fresh interpreter pointed at it, so module-level
+settings and caches start cold every time. The stages, in order:
+
+    catalog      MovieCatalog.load, app.load_movie_catalog, load_movie_documents
+    embedding    split_movie_documents and document embedding
+    engine       RagEngine build (vectors, movie vectors for the lazy similar-films graph, BM25)
+    retrieval    RagEngine.retrieve per question
+    enrich       app.enrich_question_for_retrieval per question
+    validate     app.validate_chat_input per question
+    ask          app.ask_cinemind end to end per question
+
+Embeddings are a deterministic stand-in (hashed character bigrams, unit
+norm, MiniLM's 384 dimensions) and the chat model returns a canned answer
+after ``--llm-ms``. The numbers measure this code, not a model or the
+OpenAI API. Both answer caches are off, so every ask runs the full path.
+Sizes above ``--engine-max`` (default 100k) skip the engine stages (its
+vectors and BM25 postings need a few KB of memory per movie). The default
+sizes stop at 100k. A 1M run is opt-in and needs several GB:
+
+    python -m benchmarks.bench_suite --out results.json
+    python -m benchmarks.bench_suite --movies 1000000 --engine-max 1000000 --out 1m.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, NamedTuple, Sequence
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from benchmarks.bench_catalog_load import _GENRES, _write_library
+
+ROOT = Path(__file__).resolve().parent.parent
+DIM = 384
+STAGES = ("catalog", "embedding", "engine", "retrieval", "enrich", "validate", "ask")
+_ENGINE_STAGES = {"embedding", "engine", "retrieval", "ask"}
+
+
+class HashEmbeddings(Embeddings):
+    """Deterministic, model-free embeddings: L2-normalized hashed character-bigram counts."""
+
+    def __init__(self, dim: int = DIM) -> None:
+        self.dim = dim
+
+    def _row(self, text: str, out: np.ndarray) -> None:
+        codes = np.frombuffer(text.lower().encode("utf-8"), dtype=np.uint8).astype(np.int64)
+        if len(codes) > 1:
+            buckets = ((codes[:-1] * 257 + codes[1:]) * 2654435761) % self.dim
+            out[:] = np.bincount(buckets, minlength=self.dim)
+        norm = np.linalg.norm(out)
+        if norm:
+            out /= norm
+
+    def embed_documents_array(self, texts: List[str]) -> np.ndarray:
+        rows = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for text, row in zip(texts, rows):
+            self._row(text, row)
+        return rows
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embed_documents_array(texts).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents_array([text])[0].tolist()
+
+
+class _Reply(NamedTuple):
+    content: str
+
+
+class FakeChatModel:
+    """Answers with the first retrieved title after a fixed delay; enough for CineMindChain."""
+
+    model_name = "fake-chat"
+    temperature = 0.0
+    max_tokens = 520
+
+    def __init__(self, latency_s: float = 0.0) -> None:
+        self.latency_s = latency_s
+
+    def _answer(self, prompt: str) -> str:
+        start = prompt.find("Title: ")
+        title = prompt[start + 7 : prompt.find("\n", start)] if start >= 0 else "nothing"
+        return f"Tonight I'd pick {title}. It fits what you asked for."
+
+    def invoke(self, prompt: str) -> _Reply:
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        return _Reply(self._answer(prompt))
+
+    def stream(self, prompt: str) -> Iterator[_Reply]:
+        for word in self.invoke(prompt).content.split(" "):
+            yield _Reply(word + " ")
+
+
+def _questions(n_movies: int, count: int, seed: int) -> List[str]:
+    """The question mix the chat sees: comparisons, similar-to, title buttons, genre moods."""
+    rng = random.Random(seed)
+    out = []
+    for i in range(count):
+        a, b = (f"Movie {rng.randrange(n_movies)}" for _ in range(2))
+        kind = i % 4
+        if kind == 0:
+            out.append(f"Compare {a} and {b}. Which one should I watch tonight?")
+        elif kind == 1:
+            out.append(f"Movies similar to {a}")
+        elif kind == 2:
+            out.append(f"Tell me about '{a}' and suggest 3 similar films from the database.")
+        else:
+            out.append(f"Recommend {rng.choice(_GENRES).lower()} movies with a clever twist")
+    return out
+
+
+def _latency(fn: Callable[[str], object], inputs: Sequence[str], repeat: int) -> Dict[str, float]:
+    """Per-call latency over ``repeat`` passes of ``inputs`` (after one untimed warm-up pass)."""
+    for text in inputs:
+        fn(text)
+    times = []
+    for _ in range(repeat):
+        for text in inputs:
+            t0 = time.perf_counter()
+            fn(text)
+            times.append(time.perf_counter() - t0)
+    times.sort()
+    return {
+        "calls": len(times),
+        "median_ms": 1000 * statistics.median(times),
+        "p95_ms": 1000 * times[min(len(times) - 1, int(0.95 * len(times)))],
+        "max_ms": 1000 * times[-1],
+    }
+
+
+def _wall(fn: Callable[[], object]) -> tuple:
+    t0 = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - t0
+
+
+def _measure(args: argparse.Namespace) -> dict:
+    """One catalog size, in this (fresh) interpreter; the environment points at the library."""
+    import logging
+
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+    from catalog import MOVIES_FILE, MovieCatalog
+
+    stages = [s for s in args.stages if s in STAGES]
+    engine_ok = args.movies <= args.engine_max
+    questions = _questions(args.movies, args.questions, args.seed)
+    results: Dict[str, dict] = {}
+
+    cat, parse_s = _wall(lambda: MovieCatalog.load(MOVIES_FILE))
+    import app  # bare mode: Streamlit calls are no-ops outside a script run
+    import rag_core
+
+    if "catalog" in stages:
+        # Importing app already rendered once, so the catalog is parsed: this is
+        # the per-rerun cost; parse_s above is the cold one.
+        mapping = app.load_movie_catalog()
+        docs, docs_s = _wall(rag_core.load_movie_documents)
+        titles = list(mapping)[:: max(1, len(mapping) // 1000)]
+        results["catalog"] = {
+            "movies": len(cat),
+            "parse_s": parse_s,
+            "load_movie_catalog": _latency(lambda _: app.load_movie_catalog(), titles[:100], args.repeat),
+            "load_movie_documents_s": docs_s,
+            "lookup": _latency(mapping.__getitem__, titles, args.repeat),
+        }
+        del docs
+
+    embeddings = HashEmbeddings()
+    engine = None
+    if engine_ok and "embedding" in stages:
+        chunks, split_s = _wall(
+            lambda: rag_core.split_movie_documents(rag_core.load_movie_documents())
+        )
+        texts = [c.page_content for c in chunks]
+        _, embed_s = _wall(lambda: embeddings.embed_documents_array(texts))
+        results["embedding"] = {
+            "chunks": len(texts),
+            "split_s": split_s,
+            "embed_s": embed_s,
+            "chunks_per_s": len(texts) / max(embed_s, 1e-9),
+        }
+        del chunks, texts
+    if engine_ok and {"engine", "retrieval", "ask"} & set(stages):
+        progress = rag_core.BuildProgress()
+        engine, build_s = _wall(lambda: rag_core.RagEngine(embeddings, progress=progress))
+        rag_core._ENGINE = engine
+        results["engine"] = {
+            "build_s": build_s,
+            "chunks": len(engine.chunks),
+            "vector_mb": engine.vectorstore.nbytes / 2**20,
+            "bm25_mb": engine.bm25.nbytes / 2**20 if engine.bm25 is not None else 0.0,
+            "graph_mb": engine.neighbours.nbytes / 2**20,
+        }
+    if engine is not None and "retrieval" in stages:
+        results["retrieval"] = _latency(engine.retrieve, questions, args.repeat)
+    if "enrich" in stages:
+        results["enrich"] = _latency(app.enrich_question_for_retrieval, questions, args.repeat)
+    if "validate" in stages:
+        results["validate"] = _latency(app.validate_chat_input, questions, args.repeat)
+    if engine is not None and "ask" in stages:
+        chain = rag_core.CineMindChain(engine, FakeChatModel(args.llm_ms / 1000))
+        results["ask"] = _latency(lambda q: app.ask_cinemind(chain, q), questions, args.repeat)
+    for stage in stages:
+        if stage not in results and stage in _ENGINE_STAGES:
+            results[stage] = {"skipped": f"more than --engine-max {args.engine_max:,} movies"}
+    return results
+
+
+def _run_size(n: int, args: argparse.Namespace) -> dict:
+    root = Path(tempfile.mkdtemp(prefix="cinemind-suite-"))
+    try:
+        t0 = time.perf_counter()
+        library = _write_library(root, n, 1, args.desc_words, random.Random(args.seed))
+        generate_s = time.perf_counter() - t0
+        env = {
+            **os.environ,
+            "CINEMIND_MOVIES": str(library),
+            "CINEMIND_CACHE_DIR": str(root / "cache"),
+            "CINEMIND_SNAPSHOT": str(root / "none.snapshot"),
+            "CINEMIND_EMBED_CACHE": "0",
+            "CINEMIND_WARMUP": "0",
+            "CINEMIND_WATCH_INTERVAL_S": "0",
+            # No answer caches: every ask pays for retrieval and the model.
+            "CINEMIND_ANSWER_CACHE_THRESHOLD": "2",
+            "CINEMIND_ANSWER_DB": "",
+            "STREAMLIT_LOGGER_LEVEL": "error",
+            "PYTHONPATH": os.pathsep.join(p for p in (str(ROOT), os.getenv("PYTHONPATH")) if p),
+        }
+        cmd = [
+            sys.executable, "-m", "benchmarks.bench_suite", "--worker",
+            "--movies", str(n),
+            "--stages", *args.stages,
+            "--questions", str(args.questions),
+            "--repeat", str(args.repeat),
+            "--engine-max", str(args.engine_max),
+            "--llm-ms", str(args.llm_ms),
+            "--seed", str(args.seed),
+        ]  # fmt: skip
+        proc = subprocess.run(cmd, cwd=ROOT, env=env, capture_output=True, text=True)
+        if proc.returncode != 0:
+            raise RuntimeError(f"{n:,} movies: worker failed\n{proc.stderr[-4000:]}")
+        return {
+            "movies": n,
+            "library_mb": library.stat().st_size / 2**20,
+            "generate_s": generate_s,
+            "stages": json.loads(proc.stdout.strip().splitlines()[-1]),
+        }
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def _summary(result: dict) -> str:
+    stages = result["stages"]
+    parts = [f"{result['movies']:>9,} movies"]
+    if "catalog" in stages:
+        parts.append(f"parse {stages['catalog']['parse_s']:.2f} s")
+    if "build_s" in stages.get("engine", {}):
+        parts.append(f"build {stages['engine']['build_s']:.1f} s")
+    for name in ("retrieval", "enrich", "validate", "ask"):
+        if "median_ms" in stages.get(name, {}):
+            parts.append(f"{name} {stages[name]['median_ms']:.2f} ms")
+    return "  ".join(parts)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--movies", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES))
+    parser.add_argument("--questions", type=int, default=40, help="distinct questions per stage")
+    parser.add_argument("--repeat", type=int, default=3, help="timed passes over the questions")
+    parser.add_argument("--engine-max", type=int, default=100_000, help="largest catalog to build an engine for")
+    parser.add_argument("--desc-words", type=int, default=40)
+    parser.add_argument("--llm-ms", type=float, default=0.0, help="fake chat model latency")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", type=Path, default=None, help="write the JSON here instead of stdout")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        args.movies = args.movies[0]
+        print(json.dumps(_measure(args)))
+        return
+
+    report = {
+        "suite": "cinemind-hot-paths",
+        "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "settings": {k: v for k, v in vars(args).items() if k not in ("out", "worker", "movies")},
+        "results": [],
+    }
+    for n in args.movies:
+        result = _run_size(n, args)
+        report["results"].append(result)
+        print(_summary(result), file=sys.stderr)
+    text = json.dumps(report, indent=2)
+    if args.out is not None:
+        args.out.write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Title-mention lookup: the per-title substring loop versus TitleMatcher.
+
+Generates a synthetic catalog of word titles (plus a few very short ones),
+then times the old ``[t for t in titles if t.lower() in q.lower()]`` loop
+and the Aho–Corasick matcher over the same questions. It also reports the
+build time and how often the substring loop matched inside a word.
+
+    python -m benchmarks.bench_title_match --titles 1000 20000 200000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import time
+from typing import List
+
+from title_matcher import TitleMatcher, tokens
+
+_SHORT = ["Up", "It", "Her", "Us", "Ran", "Elf", "Heat", "Cars"]
+
+
+def _catalog(n: int, rng: random.Random) -> List[str]:
+    words = [
+        "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(3, 9)))
+        for _ in range(max(50, n // 4))
+    ]
+    titles = {" ".join(rng.choice(words) for _ in range(rng.randint(1, 4))).title() for _ in range(n)}
+    return sorted(titles | set(_SHORT))
+
+
+def _questions(titles: List[str], count: int, rng: random.Random) -> List[str]:
+    out = []
+    for _ in range(count):
+        a, b = rng.sample(titles, 2)
+        out.append(
+            f"Compare '{a}' and '{b}' using only information from the database. "
+            "Which one is the other pick for tonight, and is there a sequel?"
+        )
+    return out
+
+
+def _loop(titles: List[str], question: str) -> List[str]:
+    return [t for t in titles if t.lower() in question.lower()]
+
+
+def _median_ms(fn, items) -> float:
+    times = []
+    for item in items:
+        t0 = time.perf_counter()
+        fn(item)
+        times.append(1000 * (time.perf_counter() - t0))
+    return statistics.median(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--titles", type=int, nargs="+", default=[1_000, 20_000, 200_000])
+    parser.add_argument("--questions", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'titles':>8} {'build s':>8} {'loop ms':>9} {'matcher ms':>11} {'speedup':>8} {'loop in-word':>13}")
+    for n in args.titles:
+        rng = random.Random(args.seed)
+        titles = _catalog(n, rng)
+        questions = _questions(titles, args.questions, rng)
+
+        t0 = time.perf_counter()
+        matcher = TitleMatcher(titles)
+        build_s = time.perf_counter() - t0
+
+        loop_ms = _median_ms(lambda q: _loop(titles, q), questions)
+        matcher_ms = _median_ms(matcher.find, questions)
+
+        # Loop hits that are not whole-token mentions ("Her" inside "other").
+        in_word = 0
+        for q in questions:
+            q_tokens = f" {' '.join(tokens(q))} "
+            in_word += sum(1 for t in _loop(titles, q) if f" {' '.join(tokens(t))} " not in q_tokens)
+        print(
+            f"{len(titles):>8} {build_s:>8.2f} {loop_ms:>9.3f} {matcher_ms:>11.3f} "
+            f"{loop_ms / max(matcher_ms, 1e-9):>7.0f}x {in_word / len(questions):>13.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
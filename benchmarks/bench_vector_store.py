@@ -0,0 +1,93 @@
+"""
+Retrieval latency: NumpyVectorStore vs LangChain's InMemoryVectorStore.
+
+Runs the same MMR query (k=10, fetch_k=24, as in build_rag_chain) over random
+unit vectors with MiniLM's 384 dimensions, so only search cost is measured.
+
+    python -m benchmarks.bench_vector_store --sizes 1000 10000 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import List
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import InMemoryVectorStore
+
+from vector_store import NumpyVectorStore
+
+DIM = 384
+
+
+class _PrecomputedEmbeddings(Embeddings):
+    """Looks vectors up by integer text so the benchmark never runs a model."""
+
+    def __init__(self, docs: np.ndarray, queries: np.ndarray) -> None:
+        self.docs = docs
+        self.queries = queries
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.docs[[int(t) for t in texts]].tolist()
+
+    def embed_documents_array(self, texts: List[str]) -> np.ndarray:
+        return self.docs[[int(t) for t in texts]]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.queries[int(text)].tolist()
+
+
+def _unit(rng: np.random.Generator, n: int) -> np.ndarray:
+    m = rng.standard_normal((n, DIM)).astype(np.float32)
+    return m / np.linalg.norm(m, axis=1, keepdims=True)
+
+
+def _time_queries(store, query_vectors: np.ndarray, repeat: int) -> float:
+    """Median milliseconds per MMR query."""
+    times = []
+    for i in range(repeat):
+        q = query_vectors[i % len(query_vectors)].tolist()
+        t0 = time.perf_counter()
+        store.max_marginal_relevance_search_by_vector(q, k=10, fetch_k=24)
+        times.append(time.perf_counter() - t0)
+    return 1000 * float(np.median(times))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument(
+        "--baseline-max",
+        type=int,
+        default=100_000,
+        help="skip InMemoryVectorStore above this size (it stores Python float lists)",
+    )
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    queries = _unit(rng, 64)
+    print(f"{'chunks':>8}  {'numpy ms':>9}  {'in-memory ms':>12}  {'speedup':>7}")
+    for n in args.sizes:
+        vectors = _unit(rng, n)
+        emb = _PrecomputedEmbeddings(vectors, queries)
+        docs = [Document(page_content=str(i)) for i in range(n)]
+
+        fast = NumpyVectorStore(emb)
+        fast.add_documents(docs)
+        fast_ms = _time_queries(fast, queries, args.repeat)
+
+        if n <= args.baseline_max:
+            slow = InMemoryVectorStore(emb)
+            slow.add_documents(docs)
+            slow_ms = _time_queries(slow, queries, max(5, args.repeat // 10))
+            print(f"{n:>8}  {fast_ms:>9.3f}  {slow_ms:>12.3f}  {slow_ms / fast_ms:>6.0f}x")
+        else:
+            print(f"{n:>8}  {fast_ms:>9.3f}  {'skipped':>12}  {'-':>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Cosine parity of each embedding backend against the PyTorch reference.
+
+Encodes catalog blocks and sample questions with torch and with every
+requested backend. It reports row-wise cosine similarity to torch and the
+top-10 retrieval overlap for the questions. Exits non-zero when a backend
+falls below its floor: mean cosine 0.9999 for fp32 backends and 0.99 for
+int8 ones.
+
+    python -m benchmarks.check_embedding_parity --backends onnx onnx-int8 torch-int8
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+
+import numpy as np
+
+from catalog import get_catalog
+from embedding_backends import BACKENDS, make_backend
+from rag_core import EMBED_MODEL_DIR, EMBED_MODEL_NAME
+from vector_codecs import top_k_indices
+
+_QUESTIONS = [
+    "Recommend action movies",
+    "Movies similar to Interstellar",
+    "Compare 'Inception' and 'The Matrix' for tonight",
+    "A heist film with a clever twist",
+    "Something funny and feel-good for the family",
+    "Which war movie has the most realistic battle scenes?",
+]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--backends", nargs="+", default=["onnx", "onnx-int8", "torch-int8"],
+        choices=[b for b in BACKENDS if b not in ("auto", "torch")],
+    )
+    parser.add_argument("--docs", type=int, default=256)
+    parser.add_argument("--model-dir", default=str(EMBED_MODEL_DIR))
+    args = parser.parse_args()
+
+    catalog = get_catalog()
+    docs = [catalog.block(i) for i in range(min(args.docs, len(catalog)))]
+    reference = make_backend("torch", EMBED_MODEL_NAME)
+    ref_docs = reference.encode(docs)
+    ref_questions = reference.encode(_QUESTIONS)
+    ref_top = [set(top_k_indices(ref_docs @ q, 10).tolist()) for q in ref_questions]
+
+    failed = False
+    print(f"{'backend':>11} {'mean cos':>9} {'min cos':>8} {'top-10 overlap':>15}  verdict")
+    for name in args.backends:
+        backend = make_backend(name, EMBED_MODEL_NAME, args.model_dir)
+        if backend.name != name:
+            print(f"{name:>11}  unavailable (fell back to {backend.name})")
+            failed = True
+            continue
+        vecs = backend.encode(docs)
+        questions = backend.encode(_QUESTIONS)
+        cos = np.concatenate([(vecs * ref_docs).sum(axis=1), (questions * ref_questions).sum(axis=1)])
+        overlap = np.mean(
+            [len(t & set(top_k_indices(vecs @ q, 10).tolist())) / 10 for t, q in zip(ref_top, questions)]
+        )
+        floor = 0.99 if name.endswith("int8") else 0.9999
+        ok = cos.mean() >= floor
+        failed |= not ok
+        print(
+            f"{name:>11} {cos.mean():>9.5f} {cos.min():>8.5f} {overlap:>15.2f}  "
+            f"{'ok' if ok else f'FAIL (< {floor})'}"
+        )
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
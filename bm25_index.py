@@ -0,0 +1,122 @@
+"""
+Local BM25 index over the RAG chunks, and reciprocal-rank fusion with the
+dense ranking.
+
+Postings are stored term-major (CSR): for each term, the chunk ids that
+contain it and a precomputed BM25 weight per posting,
+
+    idf(t) * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len / avg_len))
+
+so scoring a query is one vectorized scatter-add per distinct query term.
+Tokens are the same case-folded word runs the title matcher uses.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from typing import Dict, List, Mapping, Sequence, Tuple
+
+import numpy as np
+
+from title_matcher import tokens
+from vector_codecs import top_k_indices
+
+
+class Bm25Index:
+    def __init__(self, texts: Sequence[str], k1: float = 1.2, b: float = 0.75) -> None:
+        self.k1 = k1
+        self.b = b
+        n = len(texts)
+        vocab: Dict[str, int] = {}
+        doc_col: List[int] = []
+        term_col: List[int] = []
+        tf_col: List[int] = []
+        lengths = np.zeros(n, dtype=np.float32)
+        for doc, text in enumerate(texts):
+            counts = Counter(tokens(text))
+            lengths[doc] = sum(counts.values())
+            for term, tf in counts.items():
+                term_col.append(vocab.setdefault(term, len(vocab)))
+                doc_col.append(doc)
+                tf_col.append(tf)
+
+        terms = np.asarray(term_col, dtype=np.int64)
+        order = np.argsort(terms, kind="stable")
+        self._docs = np.asarray(doc_col, dtype=np.int32)[order]
+        tf = np.asarray(tf_col, dtype=np.float32)[order]
+        df = np.bincount(terms, minlength=len(vocab))
+        self._offsets = np.concatenate([[0], np.cumsum(df)])
+
+        avg_len = float(lengths.mean()) if n else 0.0
+        norm = k1 * (1.0 - b + b * lengths[self._docs] / (avg_len or 1.0))
+        idf = np.log1p((n - df + 0.5) / (df + 0.5)).astype(np.float32)
+        self._weights = (np.repeat(idf, df) * tf * (k1 + 1.0) / (tf + norm)).astype(np.float32)
+        self._vocab = vocab
+        self._n = n
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """The postings as flat arrays (for snapshot files); see from_arrays()."""
+        return {
+            "docs": self._docs,
+            "weights": self._weights,
+            "offsets": self._offsets.astype(np.int64, copy=False),
+            # Terms in id order; tokens never contain a newline.
+            "vocab": np.frombuffer("\n".join(self._vocab).encode("utf-8"), dtype=np.uint8),
+            "params": np.asarray([self._n, self.k1, self.b], dtype=np.float64),
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays: Mapping[str, np.ndarray]) -> "Bm25Index":
+        """Index over postings from arrays(); they are used as given (e.g. memory-mapped)."""
+        index = cls.__new__(cls)
+        n, index.k1, index.b = arrays["params"].tolist()
+        index._n = int(n)
+        index._docs = arrays["docs"]
+        index._weights = arrays["weights"]
+        index._offsets = arrays["offsets"]
+        text = arrays["vocab"].tobytes().decode("utf-8")
+        index._vocab = {term: i for i, term in enumerate(text.split("\n") if text else [])}
+        return index
+
+    def __len__(self) -> int:
+        return self._n
+
+    @property
+    def nbytes(self) -> int:
+        return self._docs.nbytes + self._weights.nbytes + self._offsets.nbytes
+
+    def scores(self, query: str) -> np.ndarray:
+        out = np.zeros(self._n, dtype=np.float32)
+        for term in dict.fromkeys(tokens(query)):
+            tid = self._vocab.get(term)
+            if tid is None:
+                continue
+            lo, hi = self._offsets[tid], self._offsets[tid + 1]
+            out[self._docs[lo:hi]] += self._weights[lo:hi]
+        return out
+
+    def top(self, query: str, n: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Chunk ids and scores of the n best matches with a non-zero score, best first."""
+        scores = self.scores(query)
+        idx = top_k_indices(scores, n)
+        keep = scores[idx] > 0
+        return idx[keep], scores[idx][keep]
+
+
+def rrf_fuse(
+    rankings: Sequence[np.ndarray],
+    weights: Sequence[float],
+    k: int,
+    c: float = 60.0,
+) -> List[int]:
+    """
+    Weighted reciprocal-rank fusion: score(d) = sum_i w_i / (c + rank_i(d)),
+    ranks starting at 1. Returns the k best ids; ties keep first-seen order.
+    """
+    fused: Dict[int, float] = {}
+    for ranking, weight in zip(rankings, weights):
+        if weight <= 0:
+            continue
+        for rank, doc in enumerate(ranking.tolist(), start=1):
+            fused[doc] = fused.get(doc, 0.0) + weight / (c + rank)
+    return sorted(fused, key=fused.__getitem__, reverse=True)[:k]
@@ -0,0 +1,244 @@
+"""
+Offline, multi-process embedding of the catalog's RAG chunks.
+
+    python -m bulk_embed --workers 4 --batch 256
+
+Chunks are split exactly as RagEngine splits them and streamed in batches to
+a pool of worker processes, each with its own copy of the encoder (threads
+split evenly between them). Workers write their rows straight into a
+preallocated ``vectors.npy`` in the output directory and report back. The
+parent records finished batches in ``manifest.json`` (atomically replaced),
+so an interrupted run picks up where it stopped when started again with the
+same catalog, model and batch size.
+
+When all batches are done the vectors are published to the embedding cache,
+so the next engine build (app launch or warm-up) maps them instead of
+encoding anything. A per-worker throughput report closes the run.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from embedding_backends import BACKENDS, make_backend
+
+MANIFEST = "manifest.json"
+VECTORS = "vectors.npy"
+
+# Seconds between checkpoint writes while batches complete.
+_CHECKPOINT_EVERY_S = 2.0
+
+# Per worker process: the encoder and the shared output array.
+_backend = None
+_vectors: Optional[np.ndarray] = None
+_vectors_path: Optional[Path] = None
+
+
+def _init_worker(backend: str, model_name: str, model_dir: Path, threads: int, out: Path) -> None:
+    global _backend, _vectors_path
+    _backend = make_backend(backend, model_name, model_dir, threads=threads)
+    # Load the model now so batch timings measure encoding only.
+    _backend.encode(["warm-up"])
+    _vectors_path = out / VECTORS
+
+
+def _probe_dim() -> int:
+    return int(_backend.encode(["dimension probe"]).shape[1])
+
+
+def _embed_batch(batch_no: int, start: int, texts: List[str]) -> Tuple[int, int, int, float]:
+    """Encode one batch into rows start.. of the output array; flushed before returning."""
+    global _vectors
+    if _vectors is None:
+        _vectors = np.load(_vectors_path, mmap_mode="r+")
+    t0 = time.perf_counter()
+    rows = _backend.encode(texts)
+    _vectors[start : start + len(texts)] = rows
+    _vectors.flush()
+    return batch_no, os.getpid(), len(texts), time.perf_counter() - t0
+
+
+@dataclass
+class BulkReport:
+    chunks: int
+    batches: int
+    skipped_batches: int
+    wall_s: float
+    # pid -> [chunks, busy seconds]
+    workers: Dict[int, List[float]] = field(default_factory=dict)
+
+    def lines(self) -> List[str]:
+        done = sum(c for c, _ in self.workers.values())
+        out = [
+            f"{self.chunks:,} chunks in {self.batches:,} batches "
+            f"({self.skipped_batches:,} already done); {done:,} embedded in {self.wall_s:.1f} s "
+            f"= {done / max(self.wall_s, 1e-9):,.0f} chunks/s overall"
+        ]
+        for pid, (count, busy) in sorted(self.workers.items()):
+            out.append(
+                f"  worker {pid:>7}: {int(count):>9,} chunks  {busy:>8.1f} s busy  "
+                f"{count / max(busy, 1e-9):>8,.0f} chunks/s"
+            )
+        return out
+
+
+def _write_manifest(out: Path, manifest: dict) -> None:
+    tmp = out / f".{MANIFEST}.tmp"
+    tmp.write_text(json.dumps(manifest), encoding="utf-8")
+    os.replace(tmp, out / MANIFEST)
+
+
+def _load_manifest(out: Path, identity: dict) -> Optional[dict]:
+    """The checkpoint in ``out`` if it belongs to this exact build, else None."""
+    try:
+        manifest = json.loads((out / MANIFEST).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if any(manifest.get(k) != v for k, v in identity.items()):
+        return None
+    if not (out / VECTORS).is_file():
+        return None
+    return manifest
+
+
+def run(
+    out: Path,
+    workers: int,
+    batch: int,
+    backend: Optional[str] = None,
+    threads: Optional[int] = None,
+    publish: bool = True,
+) -> BulkReport:
+    import rag_core
+
+    out = Path(out)
+    out.mkdir(parents=True, exist_ok=True)
+    backend = backend or rag_core.EMBED_BACKEND
+    threads = threads or max(1, (os.cpu_count() or 1) // workers)
+    # Resolve fallbacks once, so the cache namespace matches what workers load.
+    cache_tag = make_backend(backend, rag_core.EMBED_MODEL_NAME, rag_core.EMBED_MODEL_DIR).cache_tag
+
+    chunks = rag_core.split_movie_documents(rag_core.load_movie_documents())
+    texts = [c.page_content for c in chunks]
+    n_batches = (len(texts) + batch - 1) // batch
+    identity = {
+        "catalog_version": rag_core.get_catalog().version,
+        "model": rag_core.EMBED_MODEL_NAME + cache_tag,
+        "chunks": len(texts),
+        "batch": batch,
+        "ids_sha": hashlib.sha256("\n".join(c.id for c in chunks).encode("utf-8")).hexdigest(),
+    }
+    manifest = _load_manifest(out, identity)
+    done = set(manifest["done"]) if manifest else set()
+    skipped = len(done)
+
+    stats: Dict[int, List[float]] = defaultdict(lambda: [0, 0.0])
+    t0 = time.perf_counter()
+    pool = ProcessPoolExecutor(
+        max_workers=workers,
+        # Fresh interpreters: forking a process that already loaded torch is unsafe.
+        mp_context=get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(backend, rag_core.EMBED_MODEL_NAME, rag_core.EMBED_MODEL_DIR, threads, out),
+    )
+    with pool:
+        if manifest is None:
+            dim = pool.submit(_probe_dim).result()
+            np.lib.format.open_memmap(out / VECTORS, "w+", np.float32, (len(texts), dim)).flush()
+            manifest = {**identity, "dim": dim, "done": []}
+            _write_manifest(out, manifest)
+
+        todo = iter([b for b in range(n_batches) if b not in done])
+        in_flight = set()
+        last_checkpoint = time.monotonic()
+        while True:
+            # Bounded window: only a few batches of text are ever pickled ahead.
+            while len(in_flight) < 2 * workers:
+                b = next(todo, None)
+                if b is None:
+                    break
+                start = b * batch
+                in_flight.add(pool.submit(_embed_batch, b, start, texts[start : start + batch]))
+            if not in_flight:
+                break
+            finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                b, pid, count, secs = future.result()
+                done.add(b)
+                stats[pid][0] += count
+                stats[pid][1] += secs
+            if time.monotonic() - last_checkpoint >= _CHECKPOINT_EVERY_S:
+                _write_manifest(out, {**manifest, "done": sorted(done)})
+                last_checkpoint = time.monotonic()
+        _write_manifest(out, {**manifest, "done": sorted(done)})
+
+    report = BulkReport(len(texts), n_batches, skipped, time.perf_counter() - t0, dict(stats))
+    if publish:
+        publish_to_cache(out, texts, identity["model"])
+    return report
+
+
+def publish_to_cache(out: Path, texts: List[str], model: str) -> None:
+    """Hand the finished vectors to the embedding cache the engine reads."""
+    import rag_core
+    from embedding_cache import EmbeddingCache
+
+    vectors = np.load(Path(out) / VECTORS, mmap_mode="r")
+    row_of: Dict[str, int] = {}
+    for row, text in enumerate(texts):
+        row_of.setdefault(text, row)
+    cache = EmbeddingCache(rag_core.EMBED_CACHE_DIR, model)
+    cache.get_or_compute(texts, lambda missing: vectors[[row_of[t] for t in missing]])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Embed the catalog's chunks across worker processes.")
+    parser.add_argument("--out", type=Path, default=None, help="default: <cache dir>/bulk-embed")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    parser.add_argument("--batch", type=int, default=256, help="chunks per task")
+    parser.add_argument("--backend", choices=BACKENDS, default=None)
+    parser.add_argument("--threads", type=int, default=None, help="intra-op threads per worker")
+    parser.add_argument("--no-publish", action="store_true", help="leave the embedding cache alone")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    if args.out is None:
+        import rag_core
+
+        args.out = rag_core.CACHE_DIR / "bulk-embed"
+    report = run(
+        args.out, args.workers, args.batch, args.backend, args.threads, publish=not args.no_publish
+    )
+    if args.json:
+        print(
+            json.dumps(
+                {
+                    "chunks": report.chunks,
+                    "batches": report.batches,
+                    "skipped_batches": report.skipped_batches,
+                    "wall_s": report.wall_s,
+                    "workers": {
+                        str(pid): {"chunks": int(c), "busy_s": s, "chunks_per_s": c / max(s, 1e-9)}
+                        for pid, (c, s) in report.workers.items()
+                    },
+                }
+            )
+        )
+    else:
+        print("\n".join(report.lines()))
+
+
+if __name__ == "__main__":
+    main()
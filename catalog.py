@@ -0,0 +1,373 @@
+"""
+Single compiled index over the movie library, shared by rag_core, agent_tools and app.
+
+The library is movies.txt, or the file or directory of ``*.txt`` shards named
+by CINEMIND_MOVIES. iter_records() streams it through a read-only memory map,
+one ``---``-separated block at a time, and yields each movie's title, genre
+and byte offsets. The catalog keeps only those columns (a title list, block
+offsets, interned genre ids). Blocks and descriptions are read back by
+offset when asked for, so memory does not grow with the size of the
+descriptions, and nothing holds the file open between reads. Every consumer
+asks get_catalog() for the current instance, which re-parses only when the
+library's stamp changes, so all caches invalidate together.
+
+When a compiled snapshot (see snapshot.py) matches the library, or there
+is no library at all, get_catalog() opens the snapshot instead of parsing.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import mmap
+import os
+import re
+import threading
+from array import array
+from collections.abc import Mapping
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from title_matcher import TitleMatcher
+
+if TYPE_CHECKING:
+    from catalog_index import CatalogIndex
+
+BASE_DIR = Path(__file__).resolve().parent
+# A file, or a directory whose *.txt shards are read in name order.
+MOVIES_FILE = Path(os.getenv("CINEMIND_MOVIES", BASE_DIR / "movies.txt"))
+# Built by ``python -m snapshot build``; used in place of MOVIES_FILE when it matches.
+SNAPSHOT_FILE = Path(
+    os.getenv(
+        "CINEMIND_SNAPSHOT",
+        Path(os.getenv("CINEMIND_CACHE_DIR", BASE_DIR / ".cache")) / "catalog.snapshot",
+    )
+)
+
+# Blocks are separated by a "---" line (LF or CRLF line endings).
+_SEPARATOR = b"\n---"
+_ASCII_SPACE = b" \t\n\r\x0b\x0c"
+UNKNOWN = "Unknown"
+
+_TITLE_RE = re.compile(r"^Title:\s*(.+)$", re.MULTILINE)
+_GENRE_RE = re.compile(r"^Genre:\s*(.+)$", re.MULTILINE)
+_DESC_RE = re.compile(r"^Description:\s*(.+)$", re.MULTILINE | re.DOTALL)
+
+_lock = threading.Lock()
+_current: Optional["MovieCatalog"] = None
+
+
+def shard_paths(path: Path) -> List[Path]:
+    if path.is_dir():
+        return sorted(p for p in path.glob("*.txt") if p.is_file())
+    return [path]
+
+
+def _stat_stamp(st: os.stat_result) -> str:
+    return f"{st.st_mtime_ns}-{st.st_size}"
+
+
+def file_stamp(path: Path) -> str:
+    """Version of a library file, or of a shard directory (its names and file stamps)."""
+    if not path.is_dir():
+        return _stat_stamp(path.stat())
+    h = hashlib.sha256()
+    for shard in shard_paths(path):
+        h.update(f"{shard.name}\0{_stat_stamp(shard.stat())}\n".encode("utf-8"))
+    return h.hexdigest()[:24]
+
+
+def source_stamp(path: Path = MOVIES_FILE) -> str:
+    """
+    Stamp of everything get_catalog() reads for ``path``: the library and, for
+    the default library, the snapshot file.
+    """
+    library = file_stamp(path) if path.exists() else "missing"
+    if path != MOVIES_FILE:
+        return library
+    snap = _stat_stamp(SNAPSHOT_FILE.stat()) if SNAPSHOT_FILE.is_file() else "none"
+    return f"{library}|{snap}"
+
+
+def library_digest(path: Path) -> str:
+    """SHA-256 of the library's content (shard names and bytes), independent of mtimes."""
+    h = hashlib.sha256()
+    for shard in shard_paths(path):
+        h.update(f"{shard.name}\0".encode("utf-8"))
+        with open(shard, "rb") as f:
+            for piece in iter(lambda: f.read(1 << 20), b""):
+                h.update(piece)
+    return h.hexdigest()
+
+
+def _next_separator(mm: mmap.mmap, pos: int, size: int) -> Tuple[int, int]:
+    """(end of the current block, start of the next) from ``pos``."""
+    while True:
+        hit = mm.find(_SEPARATOR, pos)
+        if hit < 0:
+            return size, size + 1
+        after = hit + len(_SEPARATOR)
+        if mm[after : after + 1] == b"\n":
+            return hit, after + 1
+        if mm[after : after + 2] == b"\r\n":
+            return hit, after + 2
+        pos = hit + 1
+
+
+def _decode_block(raw: bytes) -> str:
+    return raw.decode("utf-8").replace("\r\n", "\n").strip()
+
+
+class MovieRecord(NamedTuple):
+    shard: int
+    title: Optional[str]
+    genre: str
+    # Byte offsets of the block in its shard.
+    start: int
+    end: int
+    # Character offsets of the description in the decoded block.
+    desc_start: int
+    desc_end: int
+
+
+def _parse_block(shard: int, start: int, end: int, block: str) -> MovieRecord:
+    tm = _TITLE_RE.search(block)
+    gm = _GENRE_RE.search(block)
+    dm = _DESC_RE.search(block)
+    desc_start = desc_end = 0
+    if dm:
+        desc = dm.group(1)
+        desc_start = dm.start(1) + (len(desc) - len(desc.lstrip()))
+        desc_end = dm.start(1) + len(desc.rstrip())
+        desc_end = max(desc_start, desc_end)
+    return MovieRecord(
+        shard,
+        tm.group(1).strip() if tm else None,
+        gm.group(1).strip() if gm else UNKNOWN,
+        start,
+        end,
+        desc_start,
+        desc_end,
+    )
+
+
+def iter_records(shards: Sequence[Path]) -> Iterator[MovieRecord]:
+    """
+    Movie records of every shard in order, parsed one block at a time from a
+    read-only memory map: only the current block is ever copied out.
+    """
+    for shard, path in enumerate(shards):
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if not size:
+                continue
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                pos = 0
+                while pos <= size:
+                    start = pos
+                    end, nxt = _next_separator(mm, pos, size)
+                    while start < end and mm[start] in _ASCII_SPACE:
+                        start += 1
+                    while end > start and mm[end - 1] in _ASCII_SPACE:
+                        end -= 1
+                    pos = nxt
+                    if start == end:
+                        continue
+                    block = _decode_block(mm[start:end])
+                    if block:
+                        yield _parse_block(shard, start, end, block)
+
+
+class MovieCatalog:
+    """Columnar, read-only view of one version of the movie library."""
+
+    def __init__(
+        self,
+        records: Iterator[MovieRecord],
+        version: str,
+        path: Optional[Path] = None,
+        shards: Sequence[Path] = (),
+        shard_stamps: Sequence[str] = (),
+        mtime: float = 0.0,
+    ) -> None:
+        self.version = version
+        # What get_catalog() compared to decide this instance is current.
+        self.stamp = version
+        self.path = path
+        self.mtime = mtime
+        self.shards = list(shards)
+        self._shard_stamps = list(shard_stamps)
+        self.titles: List[str] = []
+        self.has_title = array("b")
+        self.shard_ids = array("i")
+        self.block_spans = array("q")
+        self.desc_spans = array("i")
+        self.genre_ids = array("i")
+        self.genres: List[str] = []
+        genre_lookup: Dict[str, int] = {}
+
+        for rec in records:
+            self.titles.append(rec.title if rec.title is not None else UNKNOWN)
+            self.has_title.append(1 if rec.title is not None else 0)
+            self.shard_ids.append(rec.shard)
+            self.block_spans.extend((rec.start, rec.end))
+            self.desc_spans.extend((rec.desc_start, rec.desc_end))
+            gid = genre_lookup.get(rec.genre)
+            if gid is None:
+                gid = genre_lookup[rec.genre] = len(self.genres)
+                self.genres.append(rec.genre)
+            self.genre_ids.append(gid)
+
+        # Later duplicates win, but keep the position of the first occurrence.
+        self._by_title: Dict[str, int] = {}
+        for i, title in enumerate(self.titles):
+            if self.has_title[i]:
+                self._by_title[title] = i
+        self.movies = CatalogMapping(self)
+        self._genre_tags: Optional[List[str]] = None
+        self._title_matcher: Optional[TitleMatcher] = None
+        self._index: Optional[CatalogIndex] = None
+        self._matcher_lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: Path = MOVIES_FILE) -> "MovieCatalog":
+        version = file_stamp(path)
+        shards = shard_paths(path)
+        stats = [p.stat() for p in shards]
+        return cls(
+            iter_records(shards),
+            version,
+            path,
+            shards,
+            [_stat_stamp(st) for st in stats],
+            max((st.st_mtime for st in stats), default=0.0),
+        )
+
+    def __len__(self) -> int:
+        return len(self.titles)
+
+    def index_of(self, title: str) -> Optional[int]:
+        return self._by_title.get(title)
+
+    def genre(self, i: int) -> str:
+        return self.genres[self.genre_ids[i]]
+
+    def _current_copy(self, i: int) -> Optional[Tuple["MovieCatalog", int]]:
+        """The same movie in the library's newest version, when this one is stale."""
+        if not self.has_title[i] or self.path != MOVIES_FILE:
+            return None
+        current = get_catalog()
+        j = current.index_of(self.titles[i]) if current is not self else None
+        return (current, j) if j is not None else None
+
+    def block(self, i: int) -> str:
+        shard = self.shard_ids[i]
+        start, end = self.block_spans[2 * i], self.block_spans[2 * i + 1]
+        with open(self.shards[shard], "rb") as f:
+            stale = _stat_stamp(os.fstat(f.fileno())) != self._shard_stamps[shard]
+            if not stale:
+                f.seek(start)
+                return _decode_block(f.read(end - start))
+        # Rewritten in place since this version was parsed: offsets are void.
+        newer = self._current_copy(i)
+        return newer[0].block(newer[1]) if newer else ""
+
+    def iter_blocks(self) -> Iterator[str]:
+        """Every block in order, one memory map per shard (for bulk readers)."""
+        i = 0
+        for shard, path in enumerate(self.shards):
+            with open(path, "rb") as f:
+                if _stat_stamp(os.fstat(f.fileno())) != self._shard_stamps[shard]:
+                    raise RuntimeError(f"{path} changed while being read; reload the catalog.")
+                size = os.fstat(f.fileno()).st_size
+                if not size:
+                    continue
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    while i < len(self) and self.shard_ids[i] == shard:
+                        yield _decode_block(mm[self.block_spans[2 * i] : self.block_spans[2 * i + 1]])
+                        i += 1
+
+    def description(self, i: int) -> str:
+        return self.block(i)[self.desc_spans[2 * i] : self.desc_spans[2 * i + 1]]
+
+    def info(self, i: int) -> dict:
+        block = self.block(i)
+        return {
+            "title": self.titles[i],
+            "genre": self.genre(i),
+            "description": block[self.desc_spans[2 * i] : self.desc_spans[2 * i + 1]],
+        }
+
+    def genre_tags(self) -> List[str]:
+        """Sorted distinct comma-separated genre tags, computed once per version."""
+        if self._genre_tags is None:
+            tags = set()
+            for genre in self.genres:
+                for part in genre.split(","):
+                    tags.add(part.strip())
+            self._genre_tags = sorted(tags)
+        return self._genre_tags
+
+    def title_matcher(self) -> TitleMatcher:
+        """Aho–Corasick matcher over this version's titles, built on first use."""
+        if self._title_matcher is None:
+            with self._matcher_lock:
+                if self._title_matcher is None:
+                    self._title_matcher = TitleMatcher(self._by_title)
+        return self._title_matcher
+
+    def index(self) -> CatalogIndex:
+        """Genre and title-word posting lists for this version, built on first use."""
+        if self._index is None:
+            from catalog_index import CatalogIndex  # NumPy; not needed before launch
+
+            with self._matcher_lock:
+                if self._index is None:
+                    self._index = CatalogIndex(self)
+        return self._index
+
+
+class CatalogMapping(Mapping):
+    """title -> {"title", "genre", "description"}, materialized per lookup."""
+
+    def __init__(self, catalog: MovieCatalog) -> None:
+        self._catalog = catalog
+
+    def __getitem__(self, title: str) -> dict:
+        i = self._catalog.index_of(title)
+        if i is None:
+            raise KeyError(title)
+        return self._catalog.info(i)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._catalog._by_title)
+
+    def __len__(self) -> int:
+        return len(self._catalog._by_title)
+
+    def __contains__(self, title: object) -> bool:
+        return title in self._catalog._by_title
+
+
+def _open(path: Path, stamp: str) -> MovieCatalog:
+    cat = None
+    if path == MOVIES_FILE and SNAPSHOT_FILE.is_file():
+        from snapshot import open_catalog  # imports this module
+
+        cat = open_catalog(SNAPSHOT_FILE, path)
+    if cat is None:
+        cat = MovieCatalog.load(path)
+    cat.stamp = stamp
+    return cat
+
+
+def get_catalog(path: Path = MOVIES_FILE) -> MovieCatalog:
+    """Return the catalog for the file's current version, re-parsing only after it changes."""
+    global _current
+    stamp = source_stamp(path)
+    cat = _current
+    if cat is not None and cat.stamp == stamp:
+        return cat
+    with _lock:
+        if _current is None or _current.stamp != stamp:
+            _current = _open(path, stamp)
+        return _current
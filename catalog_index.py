@@ -0,0 +1,96 @@
+"""
+Inverted indexes over one MovieCatalog version, for the Library page and the
+genre tools.
+
+Movie ids are ranks in title order. That makes every posting list, and every
+intersection of them, already sorted by title, so nothing is re-sorted per
+query:
+
+    tag_postings   genre tag -> sorted movie ids
+    words          sorted distinct title words, each with a posting list
+
+A title search matches each query word as a prefix of some title word
+(bisect into ``words``), and the genre filter is one more intersection.
+Counts are posting-list lengths.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+import numpy as np
+
+from title_matcher import tokens
+
+if TYPE_CHECKING:
+    from catalog import MovieCatalog
+
+
+def _tags(genre: str) -> List[str]:
+    return [t for t in (p.strip() for p in genre.split(",")) if t]
+
+
+class CatalogIndex:
+    def __init__(self, catalog: "MovieCatalog") -> None:
+        titles = sorted(catalog.movies)
+        # movie id -> catalog row
+        self.rows = np.fromiter((catalog.index_of(t) for t in titles), np.int64, len(titles))
+        self.titles = titles
+
+        by_tag: Dict[str, List[int]] = {}
+        by_word: Dict[str, List[int]] = {}
+        for mid, (title, row) in enumerate(zip(titles, self.rows)):
+            for tag in _tags(catalog.genre(int(row))):
+                by_tag.setdefault(tag, []).append(mid)
+            for word in dict.fromkeys(tokens(title)):
+                by_word.setdefault(word, []).append(mid)
+        self.tag_postings: Dict[str, np.ndarray] = {
+            tag: np.asarray(ids, dtype=np.int32) for tag, ids in by_tag.items()
+        }
+        self.words: List[str] = sorted(by_word)
+        self._word_postings: List[np.ndarray] = [
+            np.asarray(by_word[w], dtype=np.int32) for w in self.words
+        ]
+        self._all = np.arange(len(titles), dtype=np.int32)
+
+    def __len__(self) -> int:
+        return len(self.titles)
+
+    def genre_count(self, tag: str) -> int:
+        return len(self.tag_postings.get(tag, ()))
+
+    def genre_counts(self) -> Dict[str, int]:
+        return {tag: len(ids) for tag, ids in self.tag_postings.items()}
+
+    def genre_ids(self, needle: str) -> np.ndarray:
+        """Movie ids with a genre tag containing ``needle`` (case-insensitive)."""
+        needle = needle.strip().lower()
+        lists = [ids for tag, ids in self.tag_postings.items() if needle in tag.lower()]
+        if not lists:
+            return self._all[:0]
+        return lists[0] if len(lists) == 1 else np.unique(np.concatenate(lists))
+
+    def prefix_ids(self, prefix: str) -> np.ndarray:
+        """Movie ids with a title word starting with ``prefix`` (already normalized)."""
+        lo = bisect_left(self.words, prefix)
+        hi = lo
+        while hi < len(self.words) and self.words[hi].startswith(prefix):
+            hi += 1
+        if hi - lo == 1:
+            return self._word_postings[lo]
+        if hi == lo:
+            return self._all[:0]
+        return np.unique(np.concatenate(self._word_postings[lo:hi]))
+
+    def search(self, query: str = "", tag: Optional[str] = None) -> np.ndarray:
+        """Sorted movie ids whose title words match every query word and that carry ``tag``."""
+        ids = self._all if tag is None else self.tag_postings.get(tag, self._all[:0])
+        for word in dict.fromkeys(tokens(query)):
+            if not len(ids):
+                break
+            ids = np.intersect1d(ids, self.prefix_ids(word), assume_unique=True)
+        return ids
+
+    def title(self, mid: int) -> str:
+        return self.titles[mid]
@@ -0,0 +1,246 @@
+"""
+CPU inference backends for the MiniLM sentence encoder.
+
+    torch       sentence-transformers on PyTorch (the reference)
+    torch-int8  the same model with its Linear layers dynamically quantized to int8
+    onnx        ONNX Runtime over an exported model directory; never imports torch
+    onnx-int8   the exported model with int8 weights (onnxruntime dynamic quantization)
+    auto        onnx when onnxruntime and an exported model are present, else torch
+
+Every backend returns L2-normalized float32 rows of mean-pooled token
+embeddings, i.e. SentenceTransformer.encode(normalize_embeddings=True).
+Models load on first encode. Export the directory the onnx backends read with
+
+    python -m embedding_backends export --out .cache/minilm-onnx
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import logging
+import threading
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+
+log = logging.getLogger("cinemind.embeddings")
+
+BACKENDS = ("auto", "torch", "torch-int8", "onnx", "onnx-int8")
+
+MAX_SEQ_LENGTH = 256  # all-MiniLM-L6-v2's max_seq_length
+_BATCH = 64
+
+ONNX_MODEL = "model.onnx"
+ONNX_INT8_MODEL = "model_int8.onnx"
+TOKENIZER_FILE = "tokenizer.json"
+
+
+def _normalize(rows: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(rows, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (rows / norms).astype(np.float32, copy=False)
+
+
+def _quiet_transformers() -> None:
+    """Silence transformers' load-time warnings once, when the model loads."""
+    try:
+        from transformers.utils import logging as hf_logging
+
+        hf_logging.set_verbosity_error()
+        hf_logging.disable_progress_bar()
+    except Exception:
+        pass
+
+
+class TorchBackend:
+    name = "torch"
+    # Appended to the embedding-cache model name; "" shares vectors with torch.
+    cache_tag = ""
+
+    def __init__(self, model_name: str, threads: Optional[int] = None) -> None:
+        self.model_name = model_name
+        # Intra-op threads; None keeps the runtime default (all cores).
+        self.threads = threads
+        self._model = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        from sentence_transformers import SentenceTransformer
+
+        _quiet_transformers()
+        if self.threads:
+            import torch
+
+            torch.set_num_threads(self.threads)
+        return SentenceTransformer(self.model_name, device="cpu")
+
+    @property
+    def model(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    self._model = self._load()
+        return self._model
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        vectors = self.model.encode(
+            texts, batch_size=_BATCH, normalize_embeddings=True, show_progress_bar=False
+        )
+        return np.asarray(vectors, dtype=np.float32)
+
+
+class TorchInt8Backend(TorchBackend):
+    name = "torch-int8"
+    cache_tag = "+torch-int8"
+
+    def _load(self):
+        import torch
+
+        model = super()._load()
+        return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+class OnnxBackend:
+    name = "onnx"
+    cache_tag = ""
+    model_file = ONNX_MODEL
+
+    def __init__(self, model_dir: Path, threads: Optional[int] = None) -> None:
+        self.model_dir = Path(model_dir)
+        self.threads = threads
+        self._session = None
+        self._tokenizer = None
+        self._inputs: List[str] = []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def available(cls, model_dir: Path) -> bool:
+        return (
+            importlib.util.find_spec("onnxruntime") is not None
+            and importlib.util.find_spec("tokenizers") is not None
+            and (Path(model_dir) / cls.model_file).is_file()
+            and (Path(model_dir) / TOKENIZER_FILE).is_file()
+        )
+
+    def _load(self) -> None:
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        tokenizer = Tokenizer.from_file(str(self.model_dir / TOKENIZER_FILE))
+        tokenizer.enable_truncation(MAX_SEQ_LENGTH)
+        tokenizer.enable_padding()
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.log_severity_level = 3  # errors only; no per-run warnings on stderr
+        if self.threads:
+            options.intra_op_num_threads = self.threads
+        session = ort.InferenceSession(
+            str(self.model_dir / self.model_file), options, providers=["CPUExecutionProvider"]
+        )
+        self._inputs = [i.name for i in session.get_inputs()]
+        self._tokenizer = tokenizer
+        self._session = session
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    self._load()
+        out = []
+        for start in range(0, len(texts), _BATCH):
+            batch = self._tokenizer.encode_batch(texts[start : start + _BATCH])
+            mask = np.asarray([e.attention_mask for e in batch], dtype=np.int64)
+            feeds = {
+                "input_ids": np.asarray([e.ids for e in batch], dtype=np.int64),
+                "attention_mask": mask,
+                "token_type_ids": np.asarray([e.type_ids for e in batch], dtype=np.int64),
+            }
+            hidden = self._session.run(None, {k: feeds[k] for k in self._inputs})[0]
+            # Mean pooling over real tokens, as in the sentence-transformers Pooling layer.
+            weights = mask[..., None].astype(np.float32)
+            pooled = (hidden * weights).sum(axis=1) / np.clip(weights.sum(axis=1), 1e-9, None)
+            out.append(_normalize(pooled))
+        if not out:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.vstack(out)
+
+
+class OnnxInt8Backend(OnnxBackend):
+    name = "onnx-int8"
+    cache_tag = "+onnx-int8"
+    model_file = ONNX_INT8_MODEL
+
+
+def make_backend(
+    name: str, model_name: str, model_dir: Optional[Path] = None, threads: Optional[int] = None
+):
+    """
+    Build the named backend. ``auto`` and the onnx backends fall back to torch
+    (with a warning for explicit requests) when onnxruntime, tokenizers or the
+    exported model is missing. ``threads`` caps intra-op parallelism, for
+    running several encoders side by side.
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown embedding backend {name!r}; expected one of {BACKENDS}.")
+    if name == "torch":
+        return TorchBackend(model_name, threads)
+    if name == "torch-int8":
+        return TorchInt8Backend(model_name, threads)
+    onnx_cls = OnnxInt8Backend if name == "onnx-int8" else OnnxBackend
+    if model_dir is not None and onnx_cls.available(model_dir):
+        return onnx_cls(model_dir, threads)
+    if name != "auto":
+        log.warning("%s backend unavailable (model dir %s); using torch", name, model_dir)
+    return TorchBackend(model_name, threads)
+
+
+def export_onnx(model_name: str, out_dir: Path, quantize: bool = True) -> Path:
+    """Export the transformer to ONNX (+ an int8 copy) with its fast tokenizer."""
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModel.from_pretrained(model_name).eval()
+    tokenizer.save_pretrained(out_dir)
+
+    sample = tokenizer(["a movie about dreams", "space"], padding=True, return_tensors="pt")
+    names = ["input_ids", "attention_mask", "token_type_ids"]
+    axes = {n: {0: "batch", 1: "sequence"} for n in names + ["last_hidden_state"]}
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(sample[n] for n in names),
+            str(out_dir / ONNX_MODEL),
+            input_names=names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=axes,
+            opset_version=14,
+        )
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        quantize_dynamic(
+            str(out_dir / ONNX_MODEL), str(out_dir / ONNX_INT8_MODEL), weight_type=QuantType.QInt8
+        )
+    return out_dir
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Embedding backend utilities.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    export = sub.add_parser("export", help="export the model for the onnx backends")
+    export.add_argument("--model", default="sentence-transformers/all-MiniLM-L6-v2")
+    export.add_argument("--out", type=Path, required=True)
+    export.add_argument("--no-quantize", action="store_true")
+    args = parser.parse_args()
+    if args.command == "export":
+        path = export_onnx(args.model, args.out, quantize=not args.no_quantize)
+        print(f"exported {args.model} to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Content-addressed on-disk cache for document embeddings.
+
+Each entry is keyed by sha256(model name + chunk text). Vectors live in
+append-only segment pairs (``<id>.keys.npy`` / ``<id>.vecs.npy``) that are
+opened with ``mmap_mode="r"``, so a relaunch maps cached vectors straight from
+the page cache instead of re-encoding or parsing them. Segments are written to
+a temp name and renamed into place, which keeps concurrent processes from
+seeing half-written files.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import uuid
+from pathlib import Path
+from typing import Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+_KEY_BYTES = 32
+_MAX_SEGMENTS = 16
+
+
+def content_key(model_name: str, text: str) -> bytes:
+    h = hashlib.sha256()
+    h.update(model_name.encode("utf-8"))
+    h.update(b"\x00")
+    h.update(text.encode("utf-8"))
+    return h.digest()
+
+
+class EmbeddingCache:
+    def __init__(self, directory: Path, model_name: str) -> None:
+        self.model_name = model_name
+        slug = hashlib.sha256(model_name.encode("utf-8")).hexdigest()[:16]
+        self.directory = Path(directory) / slug
+        self._lock = threading.Lock()
+        self._segments: List[np.ndarray] = []
+        self._index: Dict[bytes, Tuple[int, int]] = {}
+        self._loaded: set[str] = set()
+
+    def _refresh(self) -> None:
+        """Map any segment files written since the last call (ours or another process's)."""
+        if not self.directory.is_dir():
+            return
+        for keys_path in sorted(self.directory.glob("*.keys.npy")):
+            seg_id = keys_path.name[: -len(".keys.npy")]
+            if seg_id in self._loaded:
+                continue
+            vecs_path = self.directory / f"{seg_id}.vecs.npy"
+            try:
+                keys = np.load(keys_path, mmap_mode="r")
+                vecs = np.load(vecs_path, mmap_mode="r")
+            except (OSError, ValueError):
+                continue
+            if len(keys) != len(vecs):
+                continue
+            seg_no = len(self._segments)
+            self._segments.append(vecs)
+            raw = keys.tobytes()
+            for row in range(len(keys)):
+                key = raw[row * _KEY_BYTES : (row + 1) * _KEY_BYTES]
+                self._index.setdefault(key, (seg_no, row))
+            self._loaded.add(seg_id)
+
+    def _write_segment(self, keys: Sequence[bytes], vectors: np.ndarray) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        seg_id = uuid.uuid4().hex
+        tmp = f".{seg_id}.tmp.npy"
+        vec_tmp = self.directory / f"vecs{tmp}"
+        key_tmp = self.directory / f"keys{tmp}"
+        np.save(vec_tmp, np.ascontiguousarray(vectors, dtype=np.float32))
+        # Raw uint8 rows, not an "S32" array: numpy strips trailing NULs from S dtypes.
+        np.save(key_tmp, np.frombuffer(b"".join(keys), dtype=np.uint8).reshape(-1, _KEY_BYTES))
+        # The keys file marks the segment as complete, so it is renamed last.
+        os.replace(vec_tmp, self.directory / f"{seg_id}.vecs.npy")
+        os.replace(key_tmp, self.directory / f"{seg_id}.keys.npy")
+
+    def _compact(self) -> None:
+        """Fold many small segments into one so startup maps a handful of files."""
+        if len(self._segments) <= _MAX_SEGMENTS:
+            return
+        old = [self.directory / f"{s}.keys.npy" for s in self._loaded]
+        keys = list(self._index)
+        vectors = np.stack([self._segments[s][r] for s, r in self._index.values()])
+        self._write_segment(keys, vectors)
+        for keys_path in old:
+            vecs_path = Path(str(keys_path)[: -len(".keys.npy")] + ".vecs.npy")
+            for path in (keys_path, vecs_path):
+                try:
+                    path.unlink(missing_ok=True)
+                except OSError:
+                    pass  # still mapped elsewhere (Windows); picked up as a duplicate later
+        self._segments, self._index, self._loaded = [], {}, set()
+        self._refresh()
+
+    def get_or_compute(
+        self, texts: Sequence[str], encode: Callable[[List[str]], np.ndarray]
+    ) -> np.ndarray:
+        """
+        Return a (len(texts), dim) float32 matrix, encoding only texts that are
+        not already cached and persisting them as a new segment.
+        """
+        keys = [content_key(self.model_name, t) for t in texts]
+        with self._lock:
+            self._refresh()
+            missing: Dict[bytes, str] = {}
+            for key, text in zip(keys, texts):
+                if key not in self._index:
+                    missing.setdefault(key, text)
+            if missing:
+                new_keys = list(missing)
+                new_vecs = np.asarray(encode(list(missing.values())), dtype=np.float32)
+                self._write_segment(new_keys, new_vecs)
+                self._refresh()
+                self._compact()
+            if not keys:
+                return np.zeros((0, 0), dtype=np.float32)
+            locs = [self._index[k] for k in keys]
+            first_seg = locs[0][0]
+            # Common relaunch case: one segment, rows in order -> zero-copy view.
+            if all(s == first_seg for s, _ in locs):
+                rows = np.fromiter((r for _, r in locs), dtype=np.int64, count=len(locs))
+                seg = self._segments[first_seg]
+                if rows[0] == 0 and len(rows) == len(seg) and np.all(np.diff(rows) == 1):
+                    return seg
+                return seg[rows]
+            return np.stack([self._segments[s][r] for s, r in locs])
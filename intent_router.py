@@ -0,0 +1,244 @@
+"""
+Offline intent router for the tool layer.
+
+Decides, without a network call, whether a chat message needs
+library_movie_count, find_movies_by_genre, or no tool at all:
+
+1. Keyword rules catch the clear cases (counts, "recommend <genre> movies",
+   comparisons, plot and similar-film questions).
+2. Otherwise, if an embedding function is available, the question is matched
+   to the nearest of three MiniLM centroids built from short exemplars.
+3. Anything still ambiguous routes to "llm" and the remote tool-calling loop
+   runs as before.
+
+Every decision is timed and counted so the saved round trips can be measured;
+summary() feeds the sidebar, and each decision is logged at DEBUG on
+cinemind.router.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from catalog import get_catalog
+
+log = logging.getLogger("cinemind.router")
+
+ROUTE_NONE = "none"
+ROUTE_COUNT = "count"
+ROUTE_GENRE = "genre"
+ROUTE_LLM = "llm"
+
+# "How many" only counts when its object is the library or its films, so
+# "How many Oscars did The Godfather win?" is not a count question.
+_COUNT_RE = re.compile(
+    r"\bhow many (?:[\w-]+ ){0,2}(?:films|movies|titles)\b"
+    r"|\bhow many (?:do you|does (?:the|your) (?:library|catalog|collection)) have\b"
+    r"|\bnumber of (?:films|movies)\b|\bsize of (?:the|your) (?:library|catalog)\b"
+    r"|\bhow (?:big|large) is (?:the|your) (?:library|catalog|collection|film collection)\b"
+    r"|\bwhat(?:'s| is) (?:available|in (?:the|your) library)\b",
+    re.IGNORECASE,
+)
+_NO_TOOL_RE = re.compile(
+    r"\bcompare\b|\bvs\.?\b|\bversus\b|\bsimilar\b|\blike '|\bplot\b|\bending\b"
+    r"|\btell me about\b|\bdescribe\b|\bwhy should\b|\bwhich (?:one )?should\b|\brank\b",
+    re.IGNORECASE,
+)
+_LIST_RE = re.compile(
+    r"\b(?:recommend\w*|suggest\w*|list|examples?|show me|give me|best|top|picks?|"
+    r"what are|any good|some)\b",
+    re.IGNORECASE,
+)
+
+# Lower-case phrasing -> catalog genre tag; only tags present in the catalog are used.
+_GENRE_ALIASES = {
+    "scifi": "Sci-Fi",
+    "sci fi": "Sci-Fi",
+    "science fiction": "Sci-Fi",
+    "comedies": "Comedy",
+    "funny": "Comedy",
+    "funniest": "Comedy",
+    "thrillers": "Thriller",
+    "suspense": "Thriller",
+    "dramas": "Drama",
+    "westerns": "Western",
+    "musicals": "Musical",
+    "mysteries": "Mystery",
+    "animated": "Animation",
+    "cartoons": "Animation",
+    "romantic": "Romance",
+    "romcom": "Romance",
+    "scary": "Horror",
+    "family-friendly": "Family",
+    "kids": "Family",
+    "war films": "War",
+    "war movies": "War",
+}
+
+_EXEMPLARS: Dict[str, Sequence[str]] = {
+    ROUTE_COUNT: (
+        "How many movies are in the library?",
+        "How big is your film collection?",
+        "What kinds of films do you have available?",
+        "How many titles can I choose from?",
+    ),
+    ROUTE_GENRE: (
+        "Recommend some comedy movies",
+        "Give me a list of horror films",
+        "What sci-fi films do you have?",
+        "Show me examples of animated movies",
+    ),
+    ROUTE_NONE: (
+        "Compare Inception and Interstellar",
+        "What is the plot of The Matrix?",
+        "Which should I watch tonight, Alien or Aliens?",
+        "Tell me about Parasite and suggest similar films",
+        "Why is The Godfather considered a classic?",
+    ),
+}
+
+CENTROID_MIN_SCORE = 0.45
+CENTROID_MIN_MARGIN = 0.05
+
+
+def _norm(phrase: str) -> str:
+    """Fold case, hyphens and spacing: Sci-Fi / sci fi / SCI  FI -> "sci fi"."""
+    return re.sub(r"[\s-]+", " ", phrase.strip().lower())
+
+
+@dataclass
+class RouteDecision:
+    route: str
+    genre: Optional[str] = None
+    reason: str = ""
+    latency_ms: float = 0.0
+
+    @property
+    def needs_remote(self) -> bool:
+        return self.route == ROUTE_LLM
+
+
+class IntentRouter:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._genre_version: Optional[str] = None
+        self._genre_re: Optional[re.Pattern] = None
+        self._genre_lookup: Dict[str, str] = {}
+        self._centroid_owner: Optional[Callable] = None
+        self._centroids: Optional[np.ndarray] = None
+        self._centroid_routes: List[str] = []
+        self.stats: Counter = Counter()
+        self.total_ms = 0.0
+
+    def _genre_matcher(self) -> re.Pattern:
+        catalog = get_catalog()
+        if self._genre_version != catalog.version:
+            lookup = {_norm(t): t for t in catalog.genre_tags() if t}
+            for alias, tag in _GENRE_ALIASES.items():
+                if _norm(tag) in lookup:
+                    lookup.setdefault(_norm(alias), tag)
+            names = sorted(lookup, key=len, reverse=True)
+            pattern = "|".join(r"[\s-]+".join(map(re.escape, n.split(" "))) for n in names)
+            self._genre_re = re.compile(rf"(?<!\w)(?:{pattern})(?!\w)", re.IGNORECASE)
+            self._genre_lookup = lookup
+            self._genre_version = catalog.version
+        return self._genre_re
+
+    def find_genre(self, question: str) -> Optional[str]:
+        m = self._genre_matcher().search(question)
+        if not m:
+            return None
+        return self._genre_lookup.get(_norm(m.group(0)))
+
+    def _centroid_route(
+        self,
+        question: str,
+        embed: Callable[[str], List[float]],
+        vector: Optional[Sequence[float]] = None,
+    ) -> Optional[str]:
+        with self._lock:
+            # == not "is": each attribute access creates a new bound-method object.
+            if self._centroid_owner != embed or self._centroids is None:
+                routes, rows = [], []
+                for route, examples in _EXEMPLARS.items():
+                    vecs = np.asarray([embed(e) for e in examples], dtype=np.float32)
+                    centroid = vecs.mean(axis=0)
+                    rows.append(centroid / (np.linalg.norm(centroid) or 1.0))
+                    routes.append(route)
+                self._centroids = np.stack(rows)
+                self._centroid_routes = routes
+                self._centroid_owner = embed
+        q = np.array(embed(question) if vector is None else vector, dtype=np.float32)
+        q /= np.linalg.norm(q) or 1.0
+        sims = self._centroids @ q
+        order = np.argsort(-sims)
+        best, runner_up = float(sims[order[0]]), float(sims[order[1]])
+        if best < CENTROID_MIN_SCORE or best - runner_up < CENTROID_MIN_MARGIN:
+            return None
+        return self._centroid_routes[int(order[0])]
+
+    def _decide(
+        self,
+        question: str,
+        embed: Optional[Callable[[str], List[float]]],
+        vector: Optional[Sequence[float]] = None,
+    ) -> RouteDecision:
+        if _COUNT_RE.search(question):
+            return RouteDecision(ROUTE_COUNT, reason="count keywords")
+        if _NO_TOOL_RE.search(question):
+            return RouteDecision(ROUTE_NONE, reason="opinion/plot/similar keywords")
+        genre = self.find_genre(question)
+        if genre and _LIST_RE.search(question):
+            return RouteDecision(ROUTE_GENRE, genre=genre, reason="list request with genre")
+        if embed is not None:
+            try:
+                route = self._centroid_route(question, embed, vector)
+            except Exception:
+                route = None
+            if route == ROUTE_GENRE and genre:
+                return RouteDecision(ROUTE_GENRE, genre=genre, reason="centroid")
+            if route in (ROUTE_COUNT, ROUTE_NONE):
+                return RouteDecision(route, reason="centroid")
+        return RouteDecision(ROUTE_LLM, genre=genre, reason="ambiguous")
+
+    def route(
+        self,
+        question: str,
+        embed: Optional[Callable[[str], List[float]]] = None,
+        vector: Optional[Sequence[float]] = None,
+    ) -> RouteDecision:
+        """``vector``, if given, is ``question``'s embedding; ``embed`` then only builds centroids."""
+        t0 = time.perf_counter()
+        decision = self._decide(question, embed, vector)
+        decision.latency_ms = 1000 * (time.perf_counter() - t0)
+        with self._lock:
+            self.stats[decision.route] += 1
+            self.total_ms += decision.latency_ms
+        log.debug(
+            "route=%s genre=%s reason=%s latency_ms=%.2f",
+            decision.route,
+            decision.genre,
+            decision.reason,
+            decision.latency_ms,
+        )
+        return decision
+
+    def summary(self) -> Dict[str, float]:
+        """Routing counts, remote calls skipped and mean routing latency."""
+        total = sum(self.stats.values())
+        out: Dict[str, float] = dict(self.stats)
+        out["total"] = total
+        out["remote_skipped"] = total - self.stats[ROUTE_LLM]
+        out["mean_latency_ms"] = self.total_ms / total if total else 0.0
+        return out
+
+
+router = IntentRouter()
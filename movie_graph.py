@@ -0,0 +1,186 @@
+"""
+Movie-to-movie nearest-neighbour graph for the "similar films" flows.
+
+Each movie's vector is the normalized mean of its chunk vectors. Its k most
+similar movies (cosine) are stored as one int32 id row plus one float16
+score row, so k=10 costs 60 bytes per movie and a repeated lookup is two
+array reads. Rows are filled lazily: the first lookup of a movie scans the
+movie vectors once (O(n * dim)) and keeps the result, so building the graph
+costs only the per-movie mean and never an all-pairs scan. fill() computes
+every row (blockwise, O(n^2 * dim)) for offline builds that want it done up
+front. A catalog edit goes through update(), which keeps computed rows it
+can prove unaffected and leaves the rest to be filled on demand.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+_BUILD_BLOCK = 1_024
+
+
+def _top_k(sims: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Column indices and values of each row's k largest entries, best first."""
+    part = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+    part_scores = np.take_along_axis(sims, part, axis=1)
+    order = np.argsort(-part_scores, axis=1, kind="stable")
+    return np.take_along_axis(part, order, axis=1), np.take_along_axis(part_scores, order, axis=1)
+
+
+def _scan_rows(
+    movies: np.ndarray, rows: np.ndarray, k: int, ids: np.ndarray, scores: np.ndarray
+) -> None:
+    """Exact k nearest movies of each row in ``rows``, written into ids/scores."""
+    for start in range(0, len(rows), _BUILD_BLOCK):
+        block = rows[start : start + _BUILD_BLOCK]
+        sims = movies[block] @ movies.T
+        sims[np.arange(len(block)), block] = -np.inf  # a movie is not its own neighbour
+        ids[block], scores[block] = _top_k(sims, k)
+
+
+class MovieNeighbours:
+    def __init__(
+        self,
+        titles: List[str],
+        movies: np.ndarray,
+        k: int,
+        ids: Optional[np.ndarray] = None,
+        scores: Optional[np.ndarray] = None,
+        done: Optional[np.ndarray] = None,
+    ) -> None:
+        n = len(titles)
+        k = max(0, min(k, n - 1))
+        self.titles = titles
+        self.movies = movies  # (n, dim) unit movie vectors
+        # (n, k) int32 row ids into titles, best first, -1 pads; float16 cosines.
+        # Only rows flagged in ``done`` are filled. Copied, since rows are
+        # written on first lookup and the given arrays may be read-only maps.
+        self.ids = np.array(ids) if ids is not None else np.full((n, k), -1, dtype=np.int32)
+        self.scores = np.array(scores) if scores is not None else np.zeros((n, k), dtype=np.float16)
+        self.done = np.array(done, dtype=bool) if done is not None else np.zeros(n, dtype=bool)
+        self._row: Dict[str, int] = {t: i for i, t in enumerate(titles)}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.titles)
+
+    def __contains__(self, title: object) -> bool:
+        return title in self._row
+
+    @property
+    def k(self) -> int:
+        return self.ids.shape[1]
+
+    @property
+    def nbytes(self) -> int:
+        return self.movies.nbytes + self.ids.nbytes + self.scores.nbytes + self.done.nbytes
+
+    @staticmethod
+    def movie_vectors(
+        chunk_titles: Sequence[str], chunk_vectors: np.ndarray
+    ) -> Tuple[List[str], np.ndarray]:
+        """Distinct titles and, per title, the normalized mean of its chunk vectors."""
+        titles = list(dict.fromkeys(chunk_titles))
+        row = {t: i for i, t in enumerate(titles)}
+        dim = chunk_vectors.shape[1] if chunk_vectors.ndim == 2 else 0
+        movies = np.zeros((len(titles), dim), dtype=np.float32)
+        np.add.at(movies, np.fromiter((row[t] for t in chunk_titles), np.int64), chunk_vectors)
+        norms = np.linalg.norm(movies, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        movies /= norms
+        return titles, movies
+
+    @classmethod
+    def build(
+        cls, chunk_titles: Sequence[str], chunk_vectors: np.ndarray, k: int = 10
+    ) -> "MovieNeighbours":
+        """``chunk_vectors`` row i belongs to the movie ``chunk_titles[i]``. Rows fill on lookup."""
+        titles, movies = cls.movie_vectors(chunk_titles, chunk_vectors)
+        return cls(titles, movies, k)
+
+    def fill(self) -> "MovieNeighbours":
+        """Compute every row not computed yet (the full O(n^2 * dim) scan)."""
+        todo = np.flatnonzero(~self.done)
+        if self.k and len(todo):
+            with self._lock:
+                _scan_rows(self.movies, todo, self.k, self.ids, self.scores)
+                self.done[todo] = True
+        return self
+
+    def _ensure(self, i: int) -> None:
+        if self.done[i] or not self.k:
+            return
+        with self._lock:
+            if not self.done[i]:
+                _scan_rows(self.movies, np.array([i]), self.k, self.ids, self.scores)
+                self.done[i] = True
+
+    def update(
+        self, titles: List[str], movies: np.ndarray, changed: Set[str], k: int = 10
+    ) -> "MovieNeighbours":
+        """
+        The graph over ``titles`` (row i <-> unit vector ``movies[i]``), reusing
+        this one. ``changed`` names added or edited movies; old titles absent
+        from ``titles`` were removed. Computed rows of unchanged movies that
+        lost no neighbour are kept and merged with their similarity to the
+        changed movies: O(computed * changed). Every other row is left to be
+        computed on its next lookup.
+        """
+        graph = MovieNeighbours(titles, movies, k)
+        k = graph.k
+        if not k:
+            return graph
+        row = graph._row
+        # Old row -> new row; -1 for removed or changed movies, and for -1 pads
+        # (the extra last slot).
+        remap = np.full(len(self.titles) + 1, -1, dtype=np.int32)
+        for j, title in enumerate(self.titles):
+            if title in row and title not in changed:
+                remap[j] = row[title]
+        old = np.fromiter(
+            (-1 if t in changed else self._row.get(t, -1) for t in titles), np.int64, len(titles)
+        )
+        keep = old >= 0
+        if self.k < k:
+            keep[:] = False
+        keep[keep] = self.done[old[keep]]
+        kept = np.flatnonzero(keep)
+        mapped = remap[self.ids[old[kept], :k]]
+        # A full old row that lost an entry no longer proves its k best.
+        lost = (mapped < 0).any(axis=1)
+        kept, mapped = kept[~lost], mapped[~lost]
+        if not len(kept):
+            return graph
+        graph.ids[kept] = mapped
+        graph.scores[kept] = self.scores[old[kept], :k]
+        graph.done[kept] = True
+
+        # Changed movies may now belong in the lists that were kept.
+        targets = np.fromiter((row[t] for t in changed if t in row), np.int64)
+        if len(targets):
+            ids, scores = graph.ids, graph.scores
+            block = max(1, (1 << 22) // len(targets))
+            for start in range(0, len(kept), block):
+                rows = kept[start : start + block]
+                sims = movies[rows] @ movies[targets].T
+                cand_ids = np.hstack([ids[rows], np.broadcast_to(targets, sims.shape)])
+                cand = np.hstack([scores[rows].astype(np.float32), sims])
+                top_ids, top = _top_k(cand, k)
+                ids[rows] = np.take_along_axis(cand_ids, top_ids, axis=1)
+                scores[rows] = top
+        return graph
+
+    def similar(self, title: str, k: int = 5) -> List[Tuple[str, float]]:
+        """Up to k (title, cosine) pairs most similar to ``title``, best first."""
+        i = self._row.get(title)
+        if i is None:
+            return []
+        self._ensure(i)
+        return [
+            (self.titles[j], float(s))
+            for j, s in zip(self.ids[i, :k], self.scores[i, :k])
+            if j >= 0
+        ]
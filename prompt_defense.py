@@ -1,17 +1,36 @@
 """
 Input validation and light prompt-injection guards for user-facing chat.
+
+Blocked phrases and repetition limits live in prompt_rules.txt (or the file
+named by CINEMIND_PROMPT_RULES) and are recompiled when that file changes.
+Short rule lists are checked phrase by phrase with str.count, in C. Past
+DIRECT_SCAN_MAX_RULES phrases they are compiled into one Aho-Corasick
+automaton: a single scan finds every phrase at every position and counts hits
+per rule, in time linear in the message length regardless of the number of
+rules.
 """
 
 from __future__ import annotations
 
+import os
 import re
+import threading
 import unicodedata
-from typing import Tuple
+from array import array
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 
 # Keep prompts bounded (DoS / token stuffing)
 MAX_USER_MESSAGE_CHARS = 2_000
 
-# Common jailbreak / instruction-override patterns (case-insensitive)
+RULES_FILE = Path(
+    os.getenv("CINEMIND_PROMPT_RULES", Path(__file__).resolve().parent / "prompt_rules.txt")
+)
+
+# Common jailbreak / instruction-override patterns (case-insensitive).
+# Used when the rules file is missing or unreadable.
 _BLOCKED_SUBSTRINGS = (
     "ignore previous",
     "ignore all previous",
@@ -31,6 +50,13 @@ _BLOCKED_SUBSTRINGS = (
     "<script",
     "javascript:",
 )
+_DEFAULT_LIMITS = {"ignore": 2, "instruction": 4}
+
+# Rule lists up to this size are scanned with str.count per phrase; larger
+# ones with the automaton (the break-even in bench_prompt_rules is ~120).
+DIRECT_SCAN_MAX_RULES = 128
+
+_LIMIT_RE = re.compile(r"^max\s+(\d+)\s*:\s*(.+)$", re.IGNORECASE)
 
 _REFUSAL = (
     "I can only help with movie picks and questions about your film library. "
@@ -38,6 +64,193 @@ _REFUSAL = (
 )
 
 
+def _phrase(text: str) -> str:
+    text = text.strip()
+    if len(text) >= 2 and text[0] == text[-1] == '"':
+        text = text[1:-1]
+    return text.lower()
+
+
+@dataclass
+class PromptRules:
+    blocked: List[str] = field(default_factory=list)
+    # phrase -> most occurrences allowed
+    limits: Dict[str, int] = field(default_factory=dict)
+
+    @classmethod
+    def parse(cls, text: str) -> "PromptRules":
+        rules = cls()
+        for line in text.splitlines():
+            if not line.strip() or line.lstrip().startswith("#"):
+                continue
+            m = _LIMIT_RE.match(line.strip())
+            if m:
+                rules.limits[_phrase(m.group(2))] = int(m.group(1))
+            elif _phrase(line):
+                rules.blocked.append(_phrase(line))
+        return rules
+
+
+class CompiledRules:
+    """
+    Rule phrases compiled for scanning, by one of two strategies.
+
+    Up to ``direct_max`` phrases, each one is searched with ``str.count``,
+    which runs in C and wins while the list is short. Past that, an
+    Aho-Corasick automaton over the characters of every phrase walks the
+    message once. Each character costs one transition plus failure-link steps
+    (amortized constant), so a scan is linear in the message length however
+    many rules there are. bench_prompt_rules measures the break-even point.
+    (str.count does not count overlapping occurrences of a phrase that
+    overlaps itself, like "aa" in "aaa"; the automaton does.)
+    """
+
+    def __init__(
+        self, rules: PromptRules, version: str = "", direct_max: Optional[int] = None
+    ) -> None:
+        self.rules = rules
+        self.version = version
+        self.blocked = frozenset(rules.blocked)
+        phrases = sorted(p for p in self.blocked | set(rules.limits) if p)
+        self._phrases = phrases
+        if direct_max is None:
+            direct_max = DIRECT_SCAN_MAX_RULES
+        self.direct = len(phrases) <= direct_max
+        if not self.direct:
+            self._build(phrases)
+
+    def _build(self, phrases: List[str]) -> None:
+        self._alphabet: Dict[str, int] = {
+            ch: i for i, ch in enumerate(sorted(set("".join(phrases))))
+        }
+        width = self._width = max(1, len(self._alphabet))
+
+        # Trie: transitions live in one dict keyed by state * width + char id.
+        goto: Dict[int, int] = {}
+        children: List[List[int]] = [[]]
+        terminal: Dict[int, str] = {}
+        for phrase in phrases:
+            state = 0
+            for ch in phrase:
+                cid = self._alphabet[ch]
+                key = state * width + cid
+                nxt = goto.get(key)
+                if nxt is None:
+                    nxt = goto[key] = len(children)
+                    children.append([])
+                    children[state].append(cid)
+                state = nxt
+            terminal[state] = phrase
+
+        # Failure links (BFS); each state emits its own phrase plus those of
+        # its failure state, which BFS order has already resolved.
+        fail = array("i", [0]) * len(children)
+        emit: Dict[int, Tuple[str, ...]] = {s: (p,) for s, p in terminal.items()}
+        queue = deque(goto[cid] for cid in children[0])
+        while queue:
+            state = queue.popleft()
+            for cid in children[state]:
+                child = goto[state * width + cid]
+                f = fail[state]
+                while f and f * width + cid not in goto:
+                    f = fail[f]
+                fail[child] = goto.get(f * width + cid, 0)
+                inherited = emit.get(fail[child])
+                if inherited:
+                    emit[child] = emit.get(child, ()) + inherited
+                queue.append(child)
+
+        self._goto = goto
+        self._fail = fail
+        self._emit = emit
+        # Per-state transitions keyed by character, failure links already
+        # followed: filled in as scans take them, so a repeated step is one
+        # dict lookup.
+        self._next: List[Dict[str, int]] = [{} for _ in children]
+
+    def __len__(self) -> int:
+        return len(self._phrases)
+
+    def _step(self, state: int, ch: str) -> int:
+        """The state after ``ch``, following failure links; remembered in ``_next``."""
+        cid = self._alphabet.get(ch)
+        if cid is None:
+            # No phrase contains it. Not remembered, so the table stays
+            # bounded by states * alphabet whatever text is scanned.
+            return 0
+        goto, fail, width = self._goto, self._fail, self._width
+        s = state
+        while s and s * width + cid not in goto:
+            s = fail[s]
+        nxt = self._next[state][ch] = goto.get(s * width + cid, 0)
+        return nxt
+
+    def scan(self, lower: str) -> Counter:
+        """Occurrences of every rule phrase in ``lower``."""
+        hits: Counter = Counter()
+        if self.direct:
+            for phrase in self._phrases:
+                n = lower.count(phrase)
+                if n:
+                    hits[phrase] = n
+            return hits
+        table, emit = self._next, self._emit
+        state = 0
+        for ch in lower:
+            nxt = table[state].get(ch)
+            state = self._step(state, ch) if nxt is None else nxt
+            if state in emit:
+                hits.update(emit[state])
+        return hits
+
+    def violation(self, lower: str) -> Optional[str]:
+        """The first phrase that makes the message unacceptable, or None."""
+        if self.direct:
+            for phrase in self.rules.blocked:
+                if phrase and phrase in lower:
+                    return phrase
+            for phrase, limit in self.rules.limits.items():
+                if phrase and lower.count(phrase) > limit:
+                    return phrase
+            return None
+        for phrase, count in self.scan(lower).items():
+            if phrase in self.blocked or count > self.rules.limits.get(phrase, count):
+                return phrase
+        return None
+
+
+_DEFAULT_RULES = PromptRules(list(_BLOCKED_SUBSTRINGS), dict(_DEFAULT_LIMITS))
+
+_rules_lock = threading.Lock()
+_compiled: Optional[CompiledRules] = None
+
+
+def _rules_stamp(path: Path) -> str:
+    try:
+        st = path.stat()
+    except OSError:
+        return "default"
+    return f"{st.st_mtime_ns}-{st.st_size}"
+
+
+def get_rules(path: Optional[Path] = None) -> CompiledRules:
+    """Compiled rules for the file's current version, recompiled only after it changes."""
+    global _compiled
+    path = path or RULES_FILE
+    version = _rules_stamp(path)
+    compiled = _compiled
+    if compiled is not None and compiled.version == version:
+        return compiled
+    with _rules_lock:
+        if _compiled is None or _compiled.version != version:
+            try:
+                rules = PromptRules.parse(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):  # unreadable, not UTF-8, or a malformed limit
+                rules = _DEFAULT_RULES
+            _compiled = CompiledRules(rules, version)
+        return _compiled
+
+
 def normalize_user_text(text: str) -> str:
     text = unicodedata.normalize("NFKC", text)
     text = text.replace("\x00", "").strip()
@@ -59,13 +272,7 @@ def validate_chat_input(text: str) -> Tuple[str | None, str | None]:
     if len(raw) > MAX_USER_MESSAGE_CHARS:
         return None, f"Message too long (max {MAX_USER_MESSAGE_CHARS} characters). Shorten your question."
 
-    lower = raw.lower()
-    for bad in _BLOCKED_SUBSTRINGS:
-        if bad in lower:
-            return None, _REFUSAL
-
-    # Repeated override attempts (e.g. many "ignore")
-    if lower.count("ignore") > 2 or lower.count("instruction") > 4:
+    if get_rules().violation(raw.lower()):
         return None, _REFUSAL
 
     return raw, None
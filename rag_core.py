@@ -1,27 +1,36 @@
 """
-CineMindAI — RAG backend (loaded only after user clicks Launch).
+CineMindAI — RAG backend. The app imports it on a background thread at server
+start and builds the shared engine there (see start_warmup / build_progress).
 """
 
-import contextlib
+import hashlib
 import logging
 import os
-import re
-import sys
+import threading
+import time
+from dataclasses import dataclass, replace
 from pathlib import Path
-from typing import List
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence
 
 os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
 os.environ.setdefault("HF_HUB_DISABLE_PROGRESS_BARS", "1")
 os.environ.setdefault("TRANSFORMERS_NO_ADVISORY_WARNINGS", "1")
 
-from langchain_classic.chains import RetrievalQA
+import numpy as np
 from langchain_core.documents import Document
 from langchain_core.embeddings import Embeddings
 from langchain_core.prompts import PromptTemplate
-from langchain_core.vectorstores import InMemoryVectorStore
 from langchain_openai import ChatOpenAI
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
+from ann_index import IvfPqParams
+from bm25_index import Bm25Index, rrf_fuse
+from catalog import MOVIES_FILE, MovieCatalog, get_catalog, source_stamp
+from embedding_backends import make_backend
+from embedding_cache import EmbeddingCache
+from movie_graph import MovieNeighbours
+from vector_store import NumpyVectorStore
+
 try:
     from huggingface_hub.utils import disable_progress_bars
 
@@ -31,9 +40,36 @@ except Exception:
 
 logging.getLogger("sentence_transformers").setLevel(logging.ERROR)
 logging.getLogger("transformers").setLevel(logging.ERROR)
+log = logging.getLogger("cinemind.rag")
 
 BASE_DIR = Path(__file__).resolve().parent
-MOVIES_FILE = BASE_DIR / "movies.txt"
+CACHE_DIR = Path(os.getenv("CINEMIND_CACHE_DIR", BASE_DIR / ".cache"))
+EMBED_CACHE_DIR = CACHE_DIR / "embeddings"
+EMBED_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+# auto | torch | torch-int8 | onnx | onnx-int8 — see embedding_backends.
+EMBED_BACKEND = os.getenv("CINEMIND_EMBED_BACKEND", "auto")
+EMBED_MODEL_DIR = Path(os.getenv("CINEMIND_EMBED_MODEL_DIR", CACHE_DIR / "minilm-onnx"))
+# float32 | float16 | int8 | pca — see vector_codecs for the recall trade-off.
+VECTOR_STORAGE = os.getenv("CINEMIND_VECTOR_STORAGE", "float32")
+PCA_DIM = int(os.getenv("CINEMIND_PCA_DIM", "128"))
+# exact | ivfpq — IVF-PQ only engages once the index reaches min_vectors chunks.
+VECTOR_INDEX = os.getenv("CINEMIND_VECTOR_INDEX", "exact")
+ANN_PARAMS = IvfPqParams.parse(os.getenv("CINEMIND_ANN_PARAMS", ""))
+# mmr (dense only) | hybrid (BM25 + dense, reciprocal-rank fused)
+RETRIEVAL_MODE = os.getenv("CINEMIND_RETRIEVAL", "hybrid")
+# Weight of the dense ranking in the fusion; BM25 gets 1 - weight.
+HYBRID_DENSE_WEIGHT = float(os.getenv("CINEMIND_HYBRID_DENSE_WEIGHT", "0.5"))
+# Chunks sent to the LLM after fusion, and candidates taken from each ranker.
+HYBRID_K = int(os.getenv("CINEMIND_HYBRID_K", "6"))
+HYBRID_FETCH_K = int(os.getenv("CINEMIND_HYBRID_FETCH_K", "24"))
+# Neighbours kept per movie in the similar-films graph (rows fill on first lookup).
+SIMILAR_K = int(os.getenv("CINEMIND_SIMILAR_K", "10"))
+# Chunks embedded between progress updates while the engine builds.
+EMBED_PROGRESS_BATCH = int(os.getenv("CINEMIND_EMBED_PROGRESS_BATCH", "2048"))
+# Seconds between movies.txt checks by the catalog watcher ("0" disables it).
+WATCH_INTERVAL_S = float(os.getenv("CINEMIND_WATCH_INTERVAL_S", "2"))
+# Rebuild from scratch instead of patching once this share of rows is tombstoned.
+MAX_TOMBSTONE_RATIO = float(os.getenv("CINEMIND_MAX_TOMBSTONE_RATIO", "0.3"))
 
 QA_PROMPT = PromptTemplate(
     input_variables=["context", "question"],
@@ -66,87 +102,766 @@ Reply:""",
 )
 
 
-@contextlib.contextmanager
-def quiet_stdio():
-    with open(os.devnull, "w", encoding="utf-8") as devnull:
-        old_stdout, old_stderr = sys.stdout, sys.stderr
-        sys.stdout, sys.stderr = devnull, devnull
-        try:
-            yield
-        finally:
-            sys.stdout, sys.stderr = old_stdout, old_stderr
+_ENGINE_LOCK = threading.Lock()
+_ENGINE: Optional["RagEngine"] = None
+_WARMUP_LOCK = threading.Lock()
+_WARMUP: Optional[threading.Thread] = None
+_WATCHER: Optional[threading.Thread] = None
+# Called with the new engine after a catalog change swaps one in (see on_engine_swap).
+_ON_SWAP: Optional[Callable[["RagEngine"], None]] = None
+
+
+@dataclass
+class BuildProgress:
+    """Where the shared engine build is; written by the building thread only."""
+
+    # idle | parsing | embedding | indexing | ready | failed
+    stage: str = "idle"
+    documents: int = 0
+    chunks: int = 0
+    embedded: int = 0
+    started: float = 0.0
+    finished: float = 0.0
+    error: str = ""
+
+    @property
+    def fraction(self) -> float:
+        """Rough completion in [0, 1]; embedding dominates the build."""
+        if self.stage == "ready":
+            return 1.0
+        if self.stage == "indexing":
+            return 0.95
+        if self.stage == "embedding" and self.chunks:
+            return 0.05 + 0.9 * self.embedded / self.chunks
+        return 0.0 if self.stage == "idle" else 0.02
+
+    @property
+    def elapsed_s(self) -> float:
+        if not self.started:
+            return 0.0
+        return (self.finished or time.time()) - self.started
+
+
+_PROGRESS = BuildProgress()
+
+
+PROMPT_HASH = hashlib.sha256(QA_PROMPT.template.encode("utf-8")).hexdigest()[:16]
+
+
+def chunk_ids(chunks: List[Document]) -> List[str]:
+    """Content-derived chunk ids: stable across processes and restarts."""
+    ids: List[str] = []
+    seen: dict = {}
+    for chunk in chunks:
+        base = hashlib.sha256(chunk.page_content.encode("utf-8")).hexdigest()[:20]
+        n = seen.get(base, 0)
+        seen[base] = n + 1
+        ids.append(base if n == 0 else f"{base}-{n}")
+    return ids
 
 
 class HuggingFaceMiniLMEmbeddings(Embeddings):
-    def __init__(self) -> None:
-        with quiet_stdio():
-            from sentence_transformers import SentenceTransformer
+    """
+    MiniLM sentence embeddings on a pluggable CPU backend (PyTorch, int8, or
+    ONNX Runtime). Document vectors go through the on-disk EmbeddingCache,
+    and the backend loads its model on first encode, so a relaunch over an
+    unchanged catalog never imports an inference runtime until a query arrives.
+    """
 
-            self._model = SentenceTransformer(
-                "sentence-transformers/all-MiniLM-L6-v2",
-                device="cpu",
-            )
+    def __init__(self, cache_dir: Optional[Path] = None, backend: Optional[str] = None) -> None:
+        self.backend = make_backend(backend or EMBED_BACKEND, EMBED_MODEL_NAME, EMBED_MODEL_DIR)
+        self._cache: Optional[EmbeddingCache] = None
+        if cache_dir is None and os.getenv("CINEMIND_EMBED_CACHE", "1") != "0":
+            cache_dir = EMBED_CACHE_DIR
+        if cache_dir is not None:
+            # Quantized backends drift slightly, so they keep their own cache entries.
+            self._cache = EmbeddingCache(cache_dir, EMBED_MODEL_NAME + self.backend.cache_tag)
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        return self.backend.encode(texts)
+
+    def embed_documents_array(self, texts: List[str]) -> np.ndarray:
+        """Float32 matrix of document vectors; cached rows are memory-mapped views."""
+        if self._cache is None:
+            return self._encode(texts)
+        return self._cache.get_or_compute(texts, self._encode)
 
     def embed_documents(self, texts: List[str]) -> List[List[float]]:
-        with quiet_stdio():
-            vectors = self._model.encode(
-                texts, normalize_embeddings=True, show_progress_bar=False
-            )
-        return vectors.tolist()
+        return self.embed_documents_array(texts).tolist()
+
+    def embed_queries_array(self, texts: List[str]) -> np.ndarray:
+        """Float32 query vectors, bypassing the document cache."""
+        return self._encode(texts)
 
     def embed_query(self, text: str) -> List[float]:
-        with quiet_stdio():
-            vector = self._model.encode(
-                text, normalize_embeddings=True, show_progress_bar=False
-            )
-        return vector.tolist()
-
-
-def load_movie_documents() -> List[Document]:
-    raw_text = MOVIES_FILE.read_text(encoding="utf-8")
-    blocks = [b.strip() for b in raw_text.split("\n---\n") if b.strip()]
-    documents: List[Document] = []
-    for block in blocks:
-        title_match = re.search(r"^Title:\s*(.+)$", block, re.MULTILINE)
-        genre_match = re.search(r"^Genre:\s*(.+)$", block, re.MULTILINE)
-        title = title_match.group(1).strip() if title_match else "Unknown"
-        genre = genre_match.group(1).strip() if genre_match else "Unknown"
-        documents.append(
-            Document(page_content=block, metadata={"title": title, "genre": genre})
+        return self._encode([text])[0].tolist()
+
+
+def load_movie_documents(catalog: Optional[MovieCatalog] = None) -> List[Document]:
+    catalog = catalog or get_catalog()
+    return [
+        Document(
+            page_content=block,
+            metadata={"title": catalog.titles[i], "genre": catalog.genre(i)},
         )
-    return documents
+        for i, block in enumerate(catalog.iter_blocks())
+    ]
 
 
-def build_rag_chain(api_key: str):
-    movie_docs = load_movie_documents()
-    splitter = RecursiveCharacterTextSplitter(
+def _splitter() -> RecursiveCharacterTextSplitter:
+    return RecursiveCharacterTextSplitter(
         chunk_size=800, chunk_overlap=0, separators=["\n\n", "\n", " ", ""]
     )
-    chunks = splitter.split_documents(movie_docs)
-
-    with quiet_stdio():
-        embeddings = HuggingFaceMiniLMEmbeddings()
-        vectorstore = InMemoryVectorStore(embeddings)
-        vectorstore.add_documents(chunks)
-
-    n = max(len(chunks), 1)
-    k = min(10, n)
-    fetch_k = min(24, n)
-    retriever = vectorstore.as_retriever(
-        search_type="mmr",
-        search_kwargs={"k": k, "fetch_k": max(k, fetch_k)},
-    )
+
+
+def split_movie_documents(movie_docs: List[Document]) -> List[Document]:
+    """RAG chunks of the movie documents, each with its content-derived id."""
+    chunks = _splitter().split_documents(movie_docs)
+    for chunk, chunk_id in zip(chunks, chunk_ids(chunks)):
+        chunk.id = chunk_id
+    return chunks
+
+
+def block_key(doc: Document) -> str:
+    """Content hash of one movie block; unchanged blocks keep their chunks and vectors."""
+    return _text_key(doc.page_content)
+
+
+def _text_key(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:20]
+
+
+class FixedQueries(NamedTuple):
+    """
+    Precomputed fixed prompts: one float32 matrix of query vectors, the row of
+    each prompt, and retrieved chunk rows for the prompts retrieval ran for.
+    Immutable; an update builds a new one.
+    """
+
+    rows: Dict[str, int]
+    vectors: np.ndarray
+    hits: Dict[str, np.ndarray]
+
+
+_NO_FIXED = FixedQueries({}, np.zeros((0, 0), dtype=np.float32), {})
+
+
+def embed_queries(embeddings: Embeddings, texts: List[str]) -> np.ndarray:
+    """Query vectors straight from the model: never read or written in the document cache."""
+    embed_array = getattr(embeddings, "embed_queries_array", None)
+    if embed_array is not None:
+        return np.asarray(embed_array(texts), dtype=np.float32)
+    return np.asarray([embeddings.embed_query(t) for t in texts], dtype=np.float32)
+
+
+def embedding_model_tag(embeddings: Embeddings) -> str:
+    """Which vectors ``embeddings`` produces; snapshots are only reused by the same model."""
+    backend = getattr(embeddings, "backend", None)
+    if backend is not None:
+        return EMBED_MODEL_NAME + backend.cache_tag
+    return type(embeddings).__name__
+
+
+class _SnapshotChunks(Sequence[Document]):
+    """Chunk documents materialized on access from a snapshot's columns."""
+
+    def __init__(
+        self, texts: Sequence[str], ids: Sequence[str], blocks: np.ndarray, catalog: MovieCatalog
+    ) -> None:
+        self._texts = texts
+        self._ids = ids
+        self._blocks = blocks
+        self._catalog = catalog
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        b = int(self._blocks[i])
+        return Document(
+            id=self._ids[i],
+            page_content=self._texts[i],
+            metadata={"title": self._catalog.titles[b], "genre": self._catalog.genre(b)},
+        )
+
+
+class RagEngine:
+    """
+    Retrieval state shared by every session in the process: the embedding
+    model, the vector index, the BM25 index and the retriever. Read-only once
+    built, except that a newer engine patched from this one (``base``) appends
+    to and tombstones rows in the vector store they share.
+    """
+
+    def __init__(
+        self,
+        embeddings: Optional[Embeddings] = None,
+        progress: Optional[BuildProgress] = None,
+        base: Optional["RagEngine"] = None,
+        catalog: Optional[MovieCatalog] = None,
+    ) -> None:
+        progress = progress or BuildProgress()
+        progress.stage = "parsing"
+        catalog = catalog or get_catalog()
+        self.catalog_version = catalog.version
+        self.catalog_stamp = catalog.stamp
+        # Catalog block of each chunk row; only known after a full build.
+        self._chunk_block: Optional[np.ndarray] = None
+        movie_docs = load_movie_documents(catalog)
+        progress.documents = len(movie_docs)
+        # Added or edited titles; None after a full build.
+        self.changed: Optional[set] = None
+        if base is None:
+            self._build(movie_docs, embeddings, progress)
+        else:
+            self._patch(base, movie_docs, progress)
+
+        progress.stage = "indexing"
+        live = np.fromiter(
+            (i for i in range(len(self.chunks)) if self.vectorstore.is_live(i)), np.int64
+        )
+        chunk_titles = [self.chunks[i].metadata["title"] for i in live]
+        if base is None:
+            self.neighbours = MovieNeighbours.build(
+                chunk_titles, self.vectorstore.decode(live), k=SIMILAR_K
+            )
+        else:
+            titles, movies = MovieNeighbours.movie_vectors(
+                chunk_titles, self.vectorstore.decode(live)
+            )
+            self.neighbours = base.neighbours.update(titles, movies, self.changed, k=SIMILAR_K)
+        self._chunk_rows: Dict[str, List[int]] = {}
+        for i, title in zip(live.tolist(), chunk_titles):
+            self._chunk_rows.setdefault(title, []).append(i)
+        self._setup_retrieval(live)
+        self._init_fixed(base)
+
+    def _init_fixed(self, base: Optional["RagEngine"]) -> None:
+        # The app's fixed prompts. Replaced wholesale on update, so readers never
+        # lock. Query vectors survive a catalog edit; retrieval results do not.
+        self._fixed = _NO_FIXED
+        if base is not None:
+            self._fixed = FixedQueries(base._fixed.rows, base._fixed.vectors, {})
+        self._fixed_lock = threading.Lock()
+
+    def _setup_retrieval(self, live: np.ndarray, bm25: Optional[Bm25Index] = None) -> None:
+        """Retriever, BM25 index (``bm25`` if given) and answer size over the live rows."""
+        n = max(len(live), 1)
+        k = min(10, n)
+        fetch_k = min(24, n)
+        self.retriever = self.vectorstore.as_retriever(
+            search_type="mmr",
+            search_kwargs={"k": k, "fetch_k": max(k, fetch_k)},
+        )
+        self.bm25: Optional[Bm25Index] = None
+        # BM25 doc id -> chunk row (only live chunks are indexed).
+        self._bm25_rows = live
+        if RETRIEVAL_MODE == "hybrid":
+            self.bm25 = bm25 or Bm25Index([self.chunks[i].page_content for i in live])
+            k = min(HYBRID_K, n)
+        elif RETRIEVAL_MODE != "mmr":
+            raise ValueError(f"Unknown retrieval mode {RETRIEVAL_MODE!r}; expected 'mmr' or 'hybrid'.")
+        # Chunks handed to the LLM per answer.
+        self.k = k
+
+    def snapshot_meta(self) -> dict:
+        """Settings a snapshot of this engine is only valid under (see from_snapshot)."""
+        return {
+            "model": embedding_model_tag(self.embeddings),
+            "similar_k": SIMILAR_K,
+            "chunks": len(self.chunks),
+        }
+
+    def snapshot_sections(self) -> Dict[str, np.ndarray]:
+        """Chunks, unit vectors, similar-films graph and BM25 postings as flat arrays."""
+        from snapshot import StringTable
+
+        if self._chunk_block is None or self.vectorstore.live_count != len(self.chunks):
+            raise ValueError("Only a freshly built engine can be written to a snapshot.")
+        texts = [c.page_content for c in self.chunks]
+        rows = np.arange(len(self.chunks))
+        if self.vectorstore.storage == "float32":
+            vectors = self.vectorstore.decode(rows)
+        else:
+            # Compressed storage is lossy; the snapshot keeps full precision
+            # (the embedding cache makes this a lookup).
+            vectors = self._embed_texts(texts, BuildProgress())
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            vectors = vectors / norms
+        bm25 = self.bm25 or Bm25Index(texts)
+        sections = {
+            "chunks.ids": np.frombuffer("\n".join(c.id for c in self.chunks).encode("utf-8"), np.uint8),
+            "chunks.block": self._chunk_block.astype(np.int32),
+            "chunks.vectors": np.asarray(vectors, dtype=np.float32),
+            "graph.titles": np.frombuffer(
+                "\n".join(self.neighbours.titles).encode("utf-8"), np.uint8
+            ),
+            "graph.movies": self.neighbours.movies,
+            "graph.ids": self.neighbours.ids,
+            "graph.scores": self.neighbours.scores,
+            "graph.done": self.neighbours.done.astype(np.uint8),
+        }
+        for key, arr in StringTable.encode(texts).items():
+            sections[f"chunks.texts.{key}"] = arr
+        for key, arr in bm25.arrays().items():
+            sections[f"bm25.{key}"] = arr
+        return sections
+
+    @classmethod
+    def from_snapshot(
+        cls,
+        catalog: MovieCatalog,
+        embeddings: Optional[Embeddings] = None,
+        base: Optional["RagEngine"] = None,
+    ) -> Optional["RagEngine"]:
+        """
+        Engine over the arrays of ``catalog.snapshot``, with nothing split,
+        embedded or indexed except an IVF-PQ index when one is configured
+        (it is trained here, not stored). None when the snapshot was built
+        with another embedding model or similar-films size.
+        """
+        snap = catalog.snapshot
+        embeddings = embeddings or HuggingFaceMiniLMEmbeddings()
+        meta = snap.meta
+        if "chunks.vectors" not in snap or meta.get("model") != embedding_model_tag(embeddings):
+            log.info("snapshot %s was built for another embedding model; rebuilding", snap.path)
+            return None
+        if meta.get("similar_k") != SIMILAR_K:
+            log.info("snapshot %s has a different CINEMIND_SIMILAR_K; rebuilding", snap.path)
+            return None
+        self = cls.__new__(cls)
+        self.catalog_version = catalog.version
+        self.catalog_stamp = catalog.stamp
+        self.changed = None
+        self.embeddings = embeddings
+        self._chunk_block = snap.array("chunks.block")
+        self._block_rows = None
+        self.chunks = _SnapshotChunks(
+            snap.strings("chunks.texts"), snap.lines("chunks.ids"), self._chunk_block, catalog
+        )
+        self.vectorstore = NumpyVectorStore.from_arrays(
+            embeddings,
+            self.chunks,
+            snap.array("chunks.vectors"),
+            storage=VECTOR_STORAGE,
+            pca_dim=PCA_DIM,
+            index=VECTOR_INDEX,
+            ann_params=ANN_PARAMS,
+        )
+        self.neighbours = MovieNeighbours(
+            snap.lines("graph.titles"),
+            snap.array("graph.movies"),
+            SIMILAR_K,
+            snap.array("graph.ids"),
+            snap.array("graph.scores"),
+            snap.array("graph.done"),
+        )
+        self._chunk_rows = {}
+        for i, b in enumerate(self._chunk_block.tolist()):
+            self._chunk_rows.setdefault(catalog.titles[b], []).append(i)
+        bm25 = Bm25Index.from_arrays(
+            {key: snap.array(f"bm25.{key}") for key in ("docs", "weights", "offsets", "vocab", "params")}
+        )
+        self._setup_retrieval(np.arange(len(self.chunks)), bm25)
+        self._init_fixed(base)
+        self._catalog = catalog
+        return self
+
+    def _rows_by_block(self) -> Dict[str, List[List[int]]]:
+        """Block hash -> chunk row groups; derived on first patch for snapshot engines."""
+        if self._block_rows is None:
+            groups: Dict[int, List[int]] = {}
+            for row, b in enumerate(self._chunk_block.tolist()):
+                groups.setdefault(b, []).append(row)
+            self._block_rows = {}
+            for b, rows in groups.items():
+                self._block_rows.setdefault(_text_key(self._catalog.block(b)), []).append(rows)
+        return self._block_rows
+
+    def _build(
+        self, movie_docs: List[Document], embeddings: Optional[Embeddings], progress: BuildProgress
+    ) -> None:
+        """Split and embed every movie into a new vector store."""
+        splitter = _splitter()
+        per_block = [splitter.split_documents([doc]) for doc in movie_docs]
+        self.chunks = [chunk for chunks in per_block for chunk in chunks]
+        for chunk, chunk_id in zip(self.chunks, chunk_ids(self.chunks)):
+            chunk.id = chunk_id
+        self._chunk_block = np.repeat(
+            np.arange(len(per_block), dtype=np.int32), [len(c) for c in per_block]
+        )
+        progress.chunks = len(self.chunks)
+        # Block hash -> chunk row groups, one per copy of that block.
+        self._block_rows: Dict[str, List[List[int]]] = {}
+        row = 0
+        for doc, chunks in zip(movie_docs, per_block):
+            self._block_rows.setdefault(block_key(doc), []).append(
+                list(range(row, row + len(chunks)))
+            )
+            row += len(chunks)
+
+        self.embeddings = embeddings or HuggingFaceMiniLMEmbeddings()
+        self.vectorstore = NumpyVectorStore(
+            self.embeddings,
+            storage=VECTOR_STORAGE,
+            pca_dim=PCA_DIM,
+            index=VECTOR_INDEX,
+            ann_params=ANN_PARAMS,
+        )
+        progress.stage = "embedding"
+        self.vectorstore.add_vectors(
+            self.chunks, self._embed_texts([c.page_content for c in self.chunks], progress)
+        )
+
+    def _patch(self, base: "RagEngine", movie_docs: List[Document], progress: BuildProgress) -> None:
+        """
+        Reuse ``base``'s vector store: blocks whose content hash is unchanged
+        keep their rows, new or edited blocks are split, embedded and appended,
+        and rows of blocks that disappeared are tombstoned.
+        """
+        self.embeddings = base.embeddings
+        self.vectorstore = base.vectorstore
+        unclaimed = {key: list(groups) for key, groups in base._rows_by_block().items()}
+        self._block_rows = {}
+        added: List[Document] = []
+        for doc in movie_docs:
+            key = block_key(doc)
+            groups = unclaimed.get(key)
+            if groups:
+                self._block_rows.setdefault(key, []).append(groups.pop(0))
+            else:
+                added.append(doc)
+        removed = [row for groups in unclaimed.values() for rows in groups for row in rows]
+
+        splitter = _splitter()
+        per_block = [splitter.split_documents([doc]) for doc in added]
+        new_chunks = [chunk for chunks in per_block for chunk in chunks]
+        base_chunks = list(base.chunks)
+        taken = {c.id for c in base_chunks}
+        for chunk, chunk_id in zip(new_chunks, chunk_ids(new_chunks)):
+            fresh, n = chunk_id, 0
+            while fresh in taken:
+                n += 1
+                fresh = f"{chunk_id}-r{n}"
+            chunk.id = fresh
+            taken.add(fresh)
+        row = len(base.chunks)
+        for doc, chunks in zip(added, per_block):
+            self._block_rows.setdefault(block_key(doc), []).append(
+                list(range(row, row + len(chunks)))
+            )
+            row += len(chunks)
+        progress.chunks = len(new_chunks)
+
+        progress.stage = "embedding"
+        vectors = self._embed_texts([c.page_content for c in new_chunks], progress)
+        self.vectorstore.add_vectors(new_chunks, vectors)
+        self.vectorstore.tombstone(removed)
+        self.chunks = base_chunks + new_chunks
+        self.changed = {d.metadata["title"] for d in added}
+        removed_titles = {base_chunks[r].metadata["title"] for r in removed}
+        log.info(
+            "catalog %s: %d blocks added or edited (%d chunks embedded), %d chunks tombstoned",
+            self.catalog_version,
+            len(added),
+            len(new_chunks),
+            len(removed),
+        )
+        # An edited title is both removed and added; a removed title that is
+        # still present under another block changed too.
+        current = {d.metadata["title"] for d in movie_docs}
+        self.changed |= removed_titles & current
+
+    @property
+    def tombstone_ratio(self) -> float:
+        """Share of vector-store rows that are tombstoned."""
+        total = len(self.vectorstore)
+        return 1.0 - self.vectorstore.live_count / total if total else 0.0
+
+    def _embed_texts(self, texts: List[str], progress: BuildProgress) -> np.ndarray:
+        """
+        Vectors for ``texts`` in batches so ``progress.embedded`` advances. They
+        are added to the store in one call afterwards, so the PCA basis and the
+        IVF-PQ training sample are the same as for an unbatched add.
+        """
+        embed_array = getattr(self.embeddings, "embed_documents_array", None)
+        parts = []
+        for start in range(0, len(texts), max(EMBED_PROGRESS_BATCH, 1)):
+            batch = texts[start : start + EMBED_PROGRESS_BATCH]
+            if embed_array is not None:
+                parts.append(np.asarray(embed_array(batch), dtype=np.float32))
+            else:
+                parts.append(np.asarray(self.embeddings.embed_documents(batch), dtype=np.float32))
+            progress.embedded = start + len(batch)
+        if len(parts) == 1:
+            return parts[0]
+        return np.vstack(parts) if parts else np.zeros((0, 0), dtype=np.float32)
+
+    def precompute_queries(self, queries: Iterable[str], retrieve: bool = True) -> int:
+        """
+        Embed (and, with ``retrieve``, run retrieval for) fixed query strings once,
+        so embed_query() and retrieve() serve them by lookup. Returns how many
+        entries were added or completed.
+        """
+        with self._fixed_lock:
+            fixed = self._fixed
+            todo = [
+                q for q in dict.fromkeys(queries)
+                if q not in fixed.rows or (retrieve and q not in fixed.hits)
+            ]
+            if not todo:
+                return 0
+            rows, vectors = fixed.rows, fixed.vectors
+            missing = [q for q in todo if q not in rows]
+            if missing:
+                added = embed_queries(self.embeddings, missing)
+                rows = {**rows, **{q: len(rows) + i for i, q in enumerate(missing)}}
+                vectors = np.vstack([vectors, added]) if len(vectors) else added
+            hits = fixed.hits
+            if retrieve:
+                hits = {
+                    **hits,
+                    **{q: np.asarray(self._search_rows(q, vectors[rows[q]]), np.int32) for q in todo},
+                }
+            self._fixed = FixedQueries(rows, vectors, hits)
+        return len(todo)
+
+    def similar_documents(self, title: str, k: Optional[int] = None) -> List[Document]:
+        """Chunks of ``title`` then of its graph neighbours, up to the engine's k."""
+        k = k or self.k
+        docs = [self.chunks[i] for i in self._chunk_rows.get(title, ())]
+        for other, _ in self.neighbours.similar(title, k):
+            docs.extend(self.chunks[i] for i in self._chunk_rows[other])
+        return docs[:k]
+
+    def embed_query(self, text: str) -> List[float]:
+        fixed = self._fixed
+        row = fixed.rows.get(text)
+        return fixed.vectors[row].tolist() if row is not None else self.embeddings.embed_query(text)
+
+    def retrieve(self, query: str, vector: Optional[Sequence[float]] = None) -> List[Document]:
+        """Chunks for ``query``; ``vector`` is its embedding if the caller already has it."""
+        hit = self._fixed.hits.get(query)
+        if hit is not None:
+            return [self.chunks[i] for i in hit.tolist()]
+        return self._search(query, self.embed_query(query) if vector is None else vector)
+
+    def _search(self, query: str, vector: Sequence[float]) -> List[Document]:
+        return [self.chunks[i] for i in self._search_rows(query, vector)]
+
+    def _search_rows(self, query: str, vector: Sequence[float]) -> List[int]:
+        if self.bm25 is None:
+            return self.vectorstore.max_marginal_relevance_indices(
+                vector, **self.retriever.search_kwargs
+            )
+        fetch_k = max(self.k, HYBRID_FETCH_K)
+        dense, _ = self.vectorstore.search_indices(vector, fetch_k)
+        # Rows past this engine's chunks were appended by a newer catalog version.
+        dense = dense[dense < len(self.chunks)]
+        sparse, _ = self.bm25.top(query, fetch_k)
+        sparse = self._bm25_rows[sparse]
+        return rrf_fuse(
+            [dense, sparse], [HYBRID_DENSE_WEIGHT, 1.0 - HYBRID_DENSE_WEIGHT], self.k
+        )
+
+
+def get_rag_engine() -> RagEngine:
+    """
+    Build the shared engine on first use; later callers (any session) reuse it
+    until movies.txt changes version. A new version is patched onto the current
+    engine (only added or edited movies are embedded) and swapped in with one
+    assignment; sessions mid-query finish on the engine they started with.
+    A catalog opened from a snapshot brings its engine along (from_snapshot).
+    """
+    global _ENGINE, _PROGRESS
+    catalog = get_catalog()
+    version = catalog.version
+    if _ENGINE is not None and _ENGINE.catalog_version == version:
+        # Same content behind a new stamp (a touched file, a fresh snapshot).
+        _ENGINE.catalog_stamp = catalog.stamp
+    if _ENGINE is None or _ENGINE.catalog_version != version:
+        with _ENGINE_LOCK:
+            if _ENGINE is None or _ENGINE.catalog_version != version:
+                base = _ENGINE
+                embeddings = _ENGINE.embeddings if _ENGINE is not None else None
+                _PROGRESS = BuildProgress(started=time.time())
+                try:
+                    engine = None
+                    if getattr(catalog, "snapshot", None) is not None:
+                        engine = RagEngine.from_snapshot(catalog, embeddings, base)
+                    if engine is not None:
+                        _PROGRESS.documents = len(catalog)
+                        _PROGRESS.chunks = _PROGRESS.embedded = len(engine.chunks)
+                    else:
+                        if base is not None and base.tombstone_ratio > MAX_TOMBSTONE_RATIO:
+                            base = None
+                        engine = RagEngine(embeddings, progress=_PROGRESS, base=base, catalog=catalog)
+                    swapped = _ENGINE is not None
+                    _ENGINE = engine
+                except Exception as exc:
+                    _PROGRESS.stage, _PROGRESS.error = "failed", str(exc)
+                    raise
+                finally:
+                    _PROGRESS.finished = time.time()
+                _PROGRESS.stage = "ready"
+                callback = _ON_SWAP
+                if swapped and callback is not None:
+                    try:
+                        callback(engine)
+                    except Exception:
+                        log.exception("engine swap callback failed")
+    return _ENGINE
+
+
+def on_engine_swap(callback: Optional[Callable[[RagEngine], None]]) -> None:
+    """
+    Call ``callback(engine)`` each time a catalog change swaps in a new shared
+    engine (e.g. to precompute its fixed prompts). One slot: the last caller
+    wins, so re-registering on every app run is harmless. Keep it quick; it
+    runs on the thread that built the engine.
+    """
+    global _ON_SWAP
+    _ON_SWAP = callback
+
+
+def is_engine_ready() -> bool:
+    return _ENGINE is not None
+
+
+def build_progress() -> BuildProgress:
+    """Snapshot of the current (or last) engine build."""
+    return replace(_PROGRESS)
+
+
+def _warm() -> None:
+    try:
+        get_rag_engine()
+    except Exception:
+        log.exception("engine warm-up failed")
+
+
+def start_warmup() -> threading.Thread:
+    """
+    Build the shared engine on a daemon thread. Idempotent: while a build is
+    running every caller gets the same thread, and sessions that ask for the
+    engine meanwhile block on the same lock rather than building twice. A
+    finished thread is only replaced when there is still no engine (a failed
+    build), so a retry is one click away.
+    """
+    global _WARMUP
+    with _WARMUP_LOCK:
+        if _WARMUP is None or not (_WARMUP.is_alive() or is_engine_ready()):
+            _WARMUP = threading.Thread(target=_warm, name="cinemind-warmup", daemon=True)
+            _WARMUP.start()
+        return _WARMUP
+
+
+def _watch(interval: float) -> None:
+    pending = None
+    while True:
+        time.sleep(interval)
+        engine = _ENGINE
+        if engine is None:
+            continue
+        try:
+            stamp = source_stamp(MOVIES_FILE)
+        except OSError:
+            continue
+        if stamp == engine.catalog_stamp:
+            pending = None
+        elif stamp != pending:
+            # Wait one more interval: editors often save in several writes.
+            pending = stamp
+        else:
+            try:
+                get_rag_engine()
+            except Exception:
+                log.exception("re-indexing %s failed", MOVIES_FILE)
+            pending = None
+
+
+def start_catalog_watcher(interval: Optional[float] = None) -> Optional[threading.Thread]:
+    """
+    Poll movies.txt and the snapshot file, and re-index in the background
+    once a change has been stable for one interval, so sessions see edits
+    without relaunching. Idempotent; returns None when disabled.
+    """
+    global _WATCHER
+    interval = WATCH_INTERVAL_S if interval is None else interval
+    if interval <= 0:
+        return None
+    with _WARMUP_LOCK:
+        if _WATCHER is None:
+            _WATCHER = threading.Thread(
+                target=_watch, args=(interval,), name="cinemind-catalog-watch", daemon=True
+            )
+            _WATCHER.start()
+        return _WATCHER
+
+
+class CineMindChain:
+    """
+    Per-session answer chain: the shared engine's retriever plus this
+    session's LLM. Same "stuff" behaviour as RetrievalQA, split into
+    retrieve() and stream_answer() so the UI can show sources before the
+    answer finishes.
+    """
+
+    def __init__(self, engine: RagEngine, llm: ChatOpenAI) -> None:
+        self._engine = engine
+        self.llm = llm
+        self.prompt = QA_PROMPT
+        self.prompt_hash = PROMPT_HASH
+
+    @property
+    def engine(self) -> RagEngine:
+        """The current shared engine: a re-indexed catalog reaches live sessions."""
+        return _ENGINE or self._engine
+
+    @property
+    def retriever(self):
+        return self.engine.retriever
+
+    @property
+    def model_params(self) -> dict:
+        """LLM settings that change the answer; part of the answer cache key."""
+        return {
+            "model": self.llm.model_name,
+            "temperature": self.llm.temperature,
+            "max_tokens": self.llm.max_tokens,
+        }
+
+    def retrieve(self, query: str, vector: Optional[Sequence[float]] = None) -> List[Document]:
+        return self.engine.retrieve(query, vector)
+
+    def format_prompt(self, question: str, docs: List[Document]) -> str:
+        context = "\n\n".join(d.page_content for d in docs)
+        return self.prompt.format(context=context, question=question)
+
+    def answer(self, question: str, docs: List[Document]) -> str:
+        return self.llm.invoke(self.format_prompt(question, docs)).content
+
+    def stream_answer(self, question: str, docs: List[Document]) -> Iterator[str]:
+        for chunk in self.llm.stream(self.format_prompt(question, docs)):
+            if chunk.content:
+                yield chunk.content
+
+    def invoke(self, inputs: dict) -> dict:
+        """RetrievalQA-compatible: {"query"} -> {"query", "result", "source_documents"}."""
+        query = inputs["query"]
+        docs = self.retrieve(query)
+        return {"query": query, "result": self.answer(query, docs), "source_documents": docs}
+
+
+def build_rag_chain(api_key: str) -> CineMindChain:
+    """Bind a per-key LLM to the shared retriever. Cheap after the first call."""
     llm = ChatOpenAI(
         model="gpt-4o-mini",
         temperature=0.3,
         max_tokens=520,
         openai_api_key=api_key,
     )
-
-    return RetrievalQA.from_chain_type(
-        llm=llm,
-        chain_type="stuff",
-        retriever=retriever,
-        return_source_documents=True,
-        chain_type_kwargs={"prompt": QA_PROMPT},
-    )
+    return CineMindChain(get_rag_engine(), llm)
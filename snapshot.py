@@ -0,0 +1,241 @@
+"""
+Compiled, memory-mappable snapshot of the movie library and its indexes.
+
+    python -m snapshot build [--out PATH]
+    python -m snapshot info [PATH]
+
+One file holds the parsed catalog (titles, genres, block texts), the RAG
+chunks, their unit-norm float32 vectors, the similar-films graph and the BM25
+postings. Layout: an 8-byte magic, a little-endian u64 header length, a JSON
+header (metadata plus name -> dtype/shape/offset for every section), then
+the raw arrays, each 64-byte aligned. Opening it is one mmap plus
+np.frombuffer views. Nothing is parsed or copied, so every process
+serving the same snapshot shares its pages through the OS page cache, and a
+snapshot built on another machine works as long as the library content
+(and, for the engine sections, the embedding model) matches.
+
+get_catalog() picks the snapshot up from CINEMIND_SNAPSHOT (default
+<cache dir>/catalog.snapshot) when it matches the library, or when there is
+no library file at all. rag_core then opens the engine from it instead of
+re-splitting and re-embedding.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import mmap
+import os
+import struct
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from catalog import MOVIES_FILE, SNAPSHOT_FILE, MovieCatalog, file_stamp, library_digest
+
+log = logging.getLogger("cinemind.snapshot")
+
+MAGIC = b"CMSNAP01"
+FORMAT_VERSION = 2
+_ALIGN = 64
+
+
+class StringTable(Sequence[str]):
+    """UTF-8 strings stored as one byte blob plus n + 1 offsets; decoded per access."""
+
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray) -> None:
+        self._blob = blob
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        start, end = self._offsets[i], self._offsets[i + 1]
+        return self._blob[start:end].tobytes().decode("utf-8")
+
+    @staticmethod
+    def encode(strings: Sequence[str]) -> Dict[str, np.ndarray]:
+        raw = [s.encode("utf-8") for s in strings]
+        offsets = np.zeros(len(raw) + 1, dtype=np.int64)
+        np.cumsum([len(r) for r in raw], out=offsets[1:])
+        return {"blob": np.frombuffer(b"".join(raw), dtype=np.uint8), "offsets": offsets}
+
+
+def write_snapshot(path: Path, meta: dict, sections: Dict[str, np.ndarray]) -> Path:
+    """Write the snapshot to a temp file and rename it into place."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    layout = {}
+    offset = 0
+    for name, arr in sections.items():
+        arr = np.ascontiguousarray(arr)
+        sections[name] = arr
+        offset = -(-offset // _ALIGN) * _ALIGN
+        layout[name] = {"dtype": arr.dtype.str, "shape": list(arr.shape), "offset": offset}
+        offset += arr.nbytes
+    header = json.dumps(
+        {"format": FORMAT_VERSION, "meta": meta, "sections": layout}, sort_keys=True
+    ).encode("utf-8")
+    base = -(-(len(MAGIC) + 8 + len(header)) // _ALIGN) * _ALIGN
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(MAGIC + struct.pack("<Q", len(header)) + header)
+        for name, arr in sections.items():
+            f.seek(base + layout[name]["offset"])
+            f.write(arr.tobytes())
+        f.truncate(base + offset)
+    # Processes still mapping the old file keep its inode; new opens see this one.
+    os.replace(tmp, path)
+    return path
+
+
+class Snapshot:
+    """Read-only view of a snapshot file; every section is a view of one mmap."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[: len(MAGIC)] != MAGIC:
+            raise ValueError(f"{self.path} is not a CineMind snapshot.")
+        (size,) = struct.unpack("<Q", self._mm[len(MAGIC) : len(MAGIC) + 8])
+        header = json.loads(self._mm[len(MAGIC) + 8 : len(MAGIC) + 8 + size])
+        if header["format"] != FORMAT_VERSION:
+            raise ValueError(f"{self.path}: snapshot format {header['format']} is not supported.")
+        self.meta: dict = header["meta"]
+        self._layout: Dict[str, dict] = header["sections"]
+        self._base = -(-(len(MAGIC) + 8 + size) // _ALIGN) * _ALIGN
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._layout
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._mm)
+
+    def array(self, name: str) -> np.ndarray:
+        spec = self._layout[name]
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"])) if spec["shape"] else 1
+        arr = np.frombuffer(self._mm, dtype, count, self._base + spec["offset"])
+        return arr.reshape(spec["shape"])
+
+    def strings(self, name: str) -> StringTable:
+        return StringTable(self.array(f"{name}.blob"), self.array(f"{name}.offsets"))
+
+    def lines(self, name: str) -> List[str]:
+        """A newline-joined string section, decoded in one go."""
+        text = self.array(name).tobytes().decode("utf-8")
+        return text.split("\n") if text else []
+
+
+class SnapshotCatalog(MovieCatalog):
+    """MovieCatalog whose columns and block texts come from a snapshot."""
+
+    def __init__(self, snap: Snapshot, path: Path = MOVIES_FILE) -> None:
+        super().__init__(iter(()), snap.meta["catalog_version"], path)
+        self.snapshot = snap
+        self.titles = snap.lines("catalog.titles")
+        self.has_title = snap.array("catalog.has_title")
+        self.genre_ids = snap.array("catalog.genre_ids")
+        self.genres = snap.lines("catalog.genres")
+        self.desc_spans = snap.array("catalog.desc_spans").reshape(-1)
+        self._blocks = snap.strings("catalog.blocks")
+        self._by_title = {t: i for i, t in enumerate(self.titles) if self.has_title[i]}
+
+    def block(self, i: int) -> str:
+        return self._blocks[i]
+
+    def iter_blocks(self) -> Iterator[str]:
+        return iter(self._blocks)
+
+
+def catalog_sections(catalog: MovieCatalog) -> Dict[str, np.ndarray]:
+    sections = {
+        "catalog.titles": np.frombuffer("\n".join(catalog.titles).encode("utf-8"), np.uint8),
+        "catalog.has_title": np.asarray(catalog.has_title, dtype=np.int8),
+        "catalog.genre_ids": np.asarray(catalog.genre_ids, dtype=np.int32),
+        "catalog.genres": np.frombuffer("\n".join(catalog.genres).encode("utf-8"), np.uint8),
+        "catalog.desc_spans": np.asarray(catalog.desc_spans, dtype=np.int32).reshape(-1, 2),
+    }
+    for key, arr in StringTable.encode(list(catalog.iter_blocks())).items():
+        sections[f"catalog.blocks.{key}"] = arr
+    return sections
+
+
+def open_catalog(snapshot_path: Path, library: Path) -> Optional[SnapshotCatalog]:
+    """
+    The snapshot's catalog if it was built from the library's current content
+    (checked by stamp, then by digest) or there is no library; else None.
+    """
+    try:
+        snap = Snapshot(snapshot_path)
+    except (OSError, ValueError) as exc:
+        log.warning("ignoring snapshot %s: %s", snapshot_path, exc)
+        return None
+    if library.exists():
+        same = file_stamp(library) == snap.meta.get("source_stamp")
+        if not same and library_digest(library) != snap.meta.get("source_digest"):
+            log.warning("snapshot %s is older than %s; parsing the library", snapshot_path, library)
+            return None
+    return SnapshotCatalog(snap, library)
+
+
+def build(out: Path = SNAPSHOT_FILE, library: Path = MOVIES_FILE, full_graph: bool = False) -> Path:
+    """
+    Parse the library, build a fresh engine over it and write both to ``out``.
+    ``full_graph`` computes every similar-films row now (an all-pairs scan)
+    instead of leaving them to be filled on first lookup.
+    """
+    import rag_core
+
+    catalog = MovieCatalog.load(library)
+    engine = rag_core.RagEngine(catalog=catalog)
+    if full_graph:
+        engine.neighbours.fill()
+    meta = {
+        "catalog_version": f"sha-{library_digest(library)[:20]}",
+        "source_stamp": file_stamp(library),
+        "source_digest": library_digest(library),
+        "created": time.time(),
+        **engine.snapshot_meta(),
+    }
+    sections = {**catalog_sections(catalog), **engine.snapshot_sections()}
+    return write_snapshot(out, meta, sections)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build or inspect the library snapshot.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build_cmd = sub.add_parser("build", help="compile the library and indexes into one file")
+    build_cmd.add_argument("--out", type=Path, default=SNAPSHOT_FILE)
+    build_cmd.add_argument("--library", type=Path, default=MOVIES_FILE)
+    build_cmd.add_argument(
+        "--full-graph", action="store_true", help="precompute every similar-films row (O(n^2))"
+    )
+    info_cmd = sub.add_parser("info", help="print a snapshot's metadata and section sizes")
+    info_cmd.add_argument("path", type=Path, nargs="?", default=SNAPSHOT_FILE)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        t0 = time.perf_counter()
+        path = build(args.out, args.library, args.full_graph)
+        print(f"wrote {path} ({path.stat().st_size / 2**20:.1f} MB) in {time.perf_counter() - t0:.1f} s")
+    else:
+        snap = Snapshot(args.path)
+        print(json.dumps(snap.meta, indent=2, sort_keys=True))
+        for name, spec in sorted(snap._layout.items()):
+            size = np.dtype(spec["dtype"]).itemsize * int(np.prod(spec["shape"]) or 1)
+            print(f"  {name:<28} {spec['dtype']:>5} {str(tuple(spec['shape'])):>16} {size / 2**20:>9.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Find every catalog title mentioned in a question in one pass.
+
+Titles and questions are normalized to word tokens (case-folded ``\\w+``
+runs), and an Aho–Corasick automaton over token ids is built once per
+catalog version. Matching walks the question's tokens once, so the cost is
+linear in the question length plus the number of matches, independent of
+catalog size. Matching whole tokens gives word boundaries for free: "Her"
+does not match inside "other", and "Alien" does not match "Aliens".
+
+A few titles are everyday words ("It", "Up", "Her", "Soul"), listed in
+COMMON_WORD_TITLES. A match on one only counts with evidence that it names
+the film: quotes around it, title case, or "film"/"movie" next to it. Every
+other title, "Dune" or "1917" included, matches in any case.
+"""
+
+from __future__ import annotations
+
+import re
+from array import array
+from collections import deque
+from typing import Dict, Iterable, List, Set, Tuple
+
+_TOKEN_RE = re.compile(r"\w+")
+
+# Titles that are also common words (case-folded tokens joined by spaces).
+# They need quotes, title case or a cue word next to them to count as a mention.
+COMMON_WORD_TITLES = frozenset(
+    {
+        "big", "cars", "crash", "drive", "elf", "glass", "go", "her", "home",
+        "it", "moon", "nope", "ran", "room", "signs", "soul", "speed", "split",
+        "them", "up", "us",
+    }
+)
+_CUE_WORDS = frozenset({"film", "films", "movie", "movies"})
+_QUOTES = "\"'“”‘’«»`"
+
+
+def tokens(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.casefold())
+
+
+class TitleMatcher:
+    def __init__(self, titles: Iterable[str]) -> None:
+        self.titles: List[str] = []
+        vocab: Dict[str, int] = {}
+        encoded: List[List[int]] = []
+        # Title ids that read as everyday words; see _evident.
+        self._guarded: Set[int] = set()
+        for title in dict.fromkeys(titles):
+            words = tokens(title)
+            if not words:
+                continue
+            if " ".join(words) in COMMON_WORD_TITLES:
+                self._guarded.add(len(self.titles))
+            self.titles.append(title)
+            encoded.append([vocab.setdefault(w, len(vocab)) for w in words])
+        self._vocab = vocab
+        self._width = max(1, len(vocab))
+
+        # Trie: transitions live in one dict keyed by state * width + token id.
+        goto: Dict[int, int] = {}
+        children: List[List[int]] = [[]]
+        depth = array("i", [0])
+        terminal: Dict[int, List[int]] = {}
+        for title_id, ids in enumerate(encoded):
+            state = 0
+            for tid in ids:
+                key = state * self._width + tid
+                nxt = goto.get(key)
+                if nxt is None:
+                    nxt = goto[key] = len(children)
+                    children.append([])
+                    depth.append(depth[state] + 1)
+                    children[state].append(tid)
+                state = nxt
+            terminal.setdefault(state, []).append(title_id)
+
+        # Failure links (BFS) and output links to the nearest terminal suffix state.
+        n = len(children)
+        fail = array("i", [0]) * n
+        out_link = array("i", [-1]) * n
+        queue = deque()
+        for tid in children[0]:
+            queue.append(goto[tid])
+        while queue:
+            state = queue.popleft()
+            for tid in children[state]:
+                child = goto[state * self._width + tid]
+                f = fail[state]
+                while f and f * self._width + tid not in goto:
+                    f = fail[f]
+                fail[child] = goto.get(f * self._width + tid, 0)
+                out_link[child] = fail[child] if fail[child] in terminal else out_link[fail[child]]
+                queue.append(child)
+
+        self._goto = goto
+        self._fail = fail
+        self._out_link = out_link
+        self._depth = depth
+        self._terminal = terminal
+
+    def __len__(self) -> int:
+        return len(self.titles)
+
+    def _matches(self, words: List[str]) -> List[Tuple[int, int, int]]:
+        """(start token, end token, title id) for every occurrence, overlaps included."""
+        goto, fail, width = self._goto, self._fail, self._width
+        found: List[Tuple[int, int, int]] = []
+        state = 0
+        for pos, word in enumerate(words):
+            tid = self._vocab.get(word)
+            if tid is None:
+                state = 0  # no title contains this token
+                continue
+            while state and state * width + tid not in goto:
+                state = fail[state]
+            state = goto.get(state * width + tid, 0)
+            hit = state if state in self._terminal else self._out_link[state]
+            while hit > 0:
+                for title_id in self._terminal[hit]:
+                    found.append((pos + 1 - self._depth[hit], pos + 1, title_id))
+                hit = self._out_link[hit]
+        return found
+
+    def find(self, text: str) -> List[str]:
+        """
+        Titles mentioned in ``text``, in order of appearance. A title that is
+        only mentioned as part of a longer one ("The Matrix" inside "The Matrix
+        Reloaded") is dropped, and so is a common-word title without quotes,
+        title case or a film cue.
+
+        >>> m = TitleMatcher(["It", "Up", "Dune", "Jaws", "1917", "Dunkirk"])
+        >>> m.find("Is it worth it?")
+        []
+        >>> m.find("an up-beat movie for her")
+        []
+        >>> m.find("Is It scarier than the film up?")
+        ['It', 'Up']
+        >>> m.find("compare dune and jaws")
+        ['Dune', 'Jaws']
+        >>> m.find("Compare 1917 and Dunkirk")
+        ['1917', 'Dunkirk']
+        """
+        words = tokens(text)
+        matches = self._matches(words)
+        if any(m[2] in self._guarded for m in matches):
+            runs = list(_TOKEN_RE.finditer(text))
+            if len(runs) != len(words):  # casefolding split or merged a token
+                words = [r.group().casefold() for r in runs]
+                matches = self._matches(words)
+            matches = [
+                m
+                for m in matches
+                if m[2] not in self._guarded or _evident(text, runs, words, m[0], m[1])
+            ]
+        spans = sorted(matches, key=lambda m: (m[0], m[0] - m[1]))
+        out: List[str] = []
+        seen = set()
+        covered = 0
+        for start, end, title_id in spans:
+            if end <= covered:
+                continue
+            covered = max(covered, end)
+            if title_id not in seen:
+                seen.add(title_id)
+                out.append(self.titles[title_id])
+        return out
+
+
+def _evident(text: str, runs: List[re.Match], words: List[str], start: int, end: int) -> bool:
+    """Whether tokens [start, end) of ``text`` read as a film title rather than prose."""
+    begin, finish = runs[start].start(), runs[end - 1].end()
+    if begin and finish < len(text) and text[begin - 1] in _QUOTES and text[finish] in _QUOTES:
+        return True
+    if (start and words[start - 1] in _CUE_WORDS) or (end < len(words) and words[end] in _CUE_WORDS):
+        return True
+    # Title case, sentence-initial included; a word that starts with a digit passes.
+    return all(
+        text[runs[i].start()].isupper() or text[runs[i].start()].isdigit()
+        for i in range(start, end)
+    )
@@ -0,0 +1,236 @@
+"""
+Storage modes for the document vectors held by NumpyVectorStore.
+
+    float32  exact, 4 bytes/dim (the baseline)
+    float16  half precision, 2 bytes/dim
+    int8     symmetric int8 with one float32 scale per vector, ~1 byte/dim
+    pca      float32 projection onto the top ``pca_dim`` principal components
+
+Every codec scores a unit-norm query against all stored rows and can decode a
+handful of rows back to float32 for MMR. Compressed rows are scored in blocks,
+so a query never materializes a full float32 copy of the index.
+recall_report() measures what each mode costs in recall@k.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+STORAGE_MODES = ("float32", "float16", "int8", "pca")
+
+_SCORE_BLOCK = 16_384
+
+
+class _GrowableRows:
+    """Row-appendable 2-D array with geometric growth."""
+
+    def __init__(self, dtype) -> None:
+        self.dtype = dtype
+        self._buf: Optional[np.ndarray] = None
+        self._n = 0
+
+    def __len__(self) -> int:
+        return self._n
+
+    @property
+    def view(self) -> np.ndarray:
+        if self._buf is None:
+            return np.zeros((0, 0), dtype=self.dtype)
+        return self._buf[: self._n]
+
+    def extend(self, rows: np.ndarray) -> None:
+        need = self._n + rows.shape[0]
+        if self._buf is None or self._buf.shape[0] < need:
+            cap = max(need, 64 if self._buf is None else 2 * self._buf.shape[0])
+            grown = np.empty((cap,) + rows.shape[1:], dtype=self.dtype)
+            if self._n:
+                grown[: self._n] = self._buf[: self._n]
+            self._buf = grown
+        self._buf[self._n : need] = rows
+        self._n = need
+
+    def adopt(self, rows: np.ndarray) -> None:
+        """Use ``rows`` (possibly a read-only memory map) as the initial contents, uncopied."""
+        if self._n:
+            raise ValueError("adopt() needs an empty buffer.")
+        self._buf = rows
+        # Full to capacity, so the first extend() copies into a writable buffer.
+        self._n = rows.shape[0]
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first."""
+    n = scores.shape[0]
+    k = min(k, n)
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+    if k < n:
+        part = np.argpartition(-scores, k - 1)[:k]
+    else:
+        part = np.arange(n)
+    return part[np.argsort(-scores[part], kind="stable")]
+
+
+def _blockwise_scores(rows: np.ndarray, query: np.ndarray) -> np.ndarray:
+    out = np.empty(rows.shape[0], dtype=np.float32)
+    for start in range(0, rows.shape[0], _SCORE_BLOCK):
+        block = rows[start : start + _SCORE_BLOCK]
+        out[start : start + block.shape[0]] = block.astype(np.float32) @ query
+    return out
+
+
+class Float32Codec:
+    name = "float32"
+
+    def __init__(self) -> None:
+        self._rows = _GrowableRows(np.float32)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    @property
+    def nbytes(self) -> int:
+        return self._rows.view.nbytes
+
+    def add(self, unit_rows: np.ndarray) -> None:
+        self._rows.extend(unit_rows.astype(np.float32, copy=False))
+
+    def adopt(self, unit_rows: np.ndarray) -> None:
+        self._rows.adopt(unit_rows)
+
+    def scores(self, query: np.ndarray) -> np.ndarray:
+        return self._rows.view @ query
+
+    def decode(self, idx: np.ndarray) -> np.ndarray:
+        return self._rows.view[idx]
+
+
+class Float16Codec(Float32Codec):
+    name = "float16"
+
+    def __init__(self) -> None:
+        self._rows = _GrowableRows(np.float16)
+
+    def add(self, unit_rows: np.ndarray) -> None:
+        self._rows.extend(unit_rows.astype(np.float16))
+
+    def scores(self, query: np.ndarray) -> np.ndarray:
+        return _blockwise_scores(self._rows.view, query)
+
+    def decode(self, idx: np.ndarray) -> np.ndarray:
+        return self._rows.view[idx].astype(np.float32)
+
+
+class Int8Codec:
+    name = "int8"
+
+    def __init__(self) -> None:
+        self._codes = _GrowableRows(np.int8)
+        self._scales = _GrowableRows(np.float32)
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+    @property
+    def nbytes(self) -> int:
+        return self._codes.view.nbytes + self._scales.view.nbytes
+
+    def add(self, unit_rows: np.ndarray) -> None:
+        peak = np.abs(unit_rows).max(axis=1, keepdims=True)
+        scale = np.where(peak > 0, peak / 127.0, 1.0).astype(np.float32)
+        codes = np.clip(np.rint(unit_rows / scale), -127, 127).astype(np.int8)
+        self._codes.extend(codes)
+        self._scales.extend(scale)
+
+    def scores(self, query: np.ndarray) -> np.ndarray:
+        return _blockwise_scores(self._codes.view, query) * self._scales.view[:, 0]
+
+    def decode(self, idx: np.ndarray) -> np.ndarray:
+        return self._codes.view[idx].astype(np.float32) * self._scales.view[idx]
+
+
+class PcaCodec:
+    """
+    Principal components are fitted on the first batch added; later batches
+    are projected onto the same basis. Scores are exact for the reconstructed
+    vectors: x.q ~= mean.q + y.(W^T q).
+    """
+
+    name = "pca"
+
+    def __init__(self, dim: int = 128) -> None:
+        self.dim = dim
+        self.mean: Optional[np.ndarray] = None
+        self.components: Optional[np.ndarray] = None  # (full_dim, dim)
+        self._rows = _GrowableRows(np.float32)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    @property
+    def nbytes(self) -> int:
+        basis = 0 if self.components is None else self.components.nbytes + self.mean.nbytes
+        return self._rows.view.nbytes + basis
+
+    def fit(self, sample: np.ndarray) -> None:
+        self.mean = sample.mean(axis=0).astype(np.float32)
+        _, _, vt = np.linalg.svd(sample - self.mean, full_matrices=False)
+        self.components = np.ascontiguousarray(vt[: self.dim].T, dtype=np.float32)
+
+    def add(self, unit_rows: np.ndarray) -> None:
+        if self.components is None:
+            self.fit(unit_rows)
+        self._rows.extend((unit_rows - self.mean) @ self.components)
+
+    def scores(self, query: np.ndarray) -> np.ndarray:
+        return self._rows.view @ (self.components.T @ query) + float(self.mean @ query)
+
+    def decode(self, idx: np.ndarray) -> np.ndarray:
+        return self.mean + self._rows.view[idx] @ self.components.T
+
+
+def make_codec(storage: str = "float32", pca_dim: int = 128):
+    if storage == "float32":
+        return Float32Codec()
+    if storage == "float16":
+        return Float16Codec()
+    if storage == "int8":
+        return Int8Codec()
+    if storage == "pca":
+        return PcaCodec(pca_dim)
+    raise ValueError(f"Unknown vector storage {storage!r}; expected one of {STORAGE_MODES}.")
+
+
+def recall_report(
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    k: int = 10,
+    modes: Sequence[str] = STORAGE_MODES,
+    pca_dim: int = 128,
+) -> List[Dict[str, float]]:
+    """
+    recall@k of each storage mode against exact float32 search, plus its
+    memory footprint. ``vectors`` and ``queries`` are unit-norm float32 rows.
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    queries = np.asarray(queries, dtype=np.float32)
+    exact = [set(top_k_indices(vectors @ q, k).tolist()) for q in queries]
+    baseline_bytes = vectors.nbytes
+    report = []
+    for mode in modes:
+        codec = make_codec(mode, pca_dim)
+        codec.add(vectors)
+        hits = 0
+        for q, truth in zip(queries, exact):
+            hits += len(truth.intersection(top_k_indices(codec.scores(q), k).tolist()))
+        report.append(
+            {
+                "mode": mode,
+                f"recall@{k}": hits / max(1, k * len(queries)),
+                "bytes_per_vector": codec.nbytes / max(1, len(codec)),
+                "compression": baseline_bytes / max(1, codec.nbytes),
+            }
+        )
+    return report
@@ -0,0 +1,345 @@
+"""
+NumPy-backed vector store: a drop-in replacement for LangChain's
+InMemoryVectorStore that keeps every chunk vector in one contiguous float32
+matrix. A query is one matrix-vector product, ``argpartition`` picks the
+top fetch_k, and MMR re-ranks those candidates against a precomputed
+candidate-by-candidate similarity matrix instead of per-candidate Python loops.
+The matrix itself can be stored compressed (see vector_codecs), and large
+stores can answer from an IVF-PQ index instead of a full scan (see ann_index).
+
+Rows are append-only. Removing documents tombstones their rows: searches skip
+them, and the engine rebuilds from scratch once too many accumulate.
+"""
+
+from __future__ import annotations
+
+import threading
+import uuid
+from typing import Any, Callable, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+from ann_index import IvfPqIndex, IvfPqParams
+from vector_codecs import make_codec, top_k_indices
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def mmr_select(
+    query_scores: np.ndarray,
+    candidates: np.ndarray,
+    k: int,
+    lambda_mult: float = 0.5,
+) -> List[int]:
+    """
+    Maximal marginal relevance over unit-norm candidate rows. Same picks as
+    langchain_core's maximal_marginal_relevance (ties go to the earlier row).
+    """
+    n = candidates.shape[0]
+    k = min(k, n)
+    if k <= 0:
+        return []
+    pairwise = candidates @ candidates.T
+    redundancy = np.full(n, -np.inf, dtype=np.float32)
+    available = np.ones(n, dtype=bool)
+    chosen = [int(np.argmax(query_scores))]
+    available[chosen[0]] = False
+    while len(chosen) < k:
+        np.maximum(redundancy, pairwise[chosen[-1]], out=redundancy)
+        mmr = lambda_mult * query_scores - (1.0 - lambda_mult) * redundancy
+        mmr[~available] = -np.inf
+        pick = int(np.argmax(mmr))
+        chosen.append(pick)
+        available[pick] = False
+    return chosen
+
+
+class NumpyVectorStore(VectorStore):
+    def __init__(
+        self,
+        embedding: Embeddings,
+        storage: str = "float32",
+        pca_dim: int = 128,
+        index: str = "exact",
+        ann_params: Optional[IvfPqParams] = None,
+    ) -> None:
+        self.embedding = embedding
+        self.storage = storage
+        self._docs: List[Document] = []
+        self._codec = make_codec(storage, pca_dim)
+        if index not in ("exact", "ivfpq"):
+            raise ValueError(f"Unknown vector index {index!r}; expected 'exact' or 'ivfpq'.")
+        self._ann = IvfPqIndex(ann_params) if index == "ivfpq" else None
+        # Row -> tombstoned; None until the first removal.
+        self._dead: Optional[np.ndarray] = None
+        self._n_dead = 0
+        # Appends and tombstones may run while other threads search.
+        self._lock = threading.RLock()
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self.embedding
+
+    @property
+    def nbytes(self) -> int:
+        return self._codec.nbytes + (self._ann.nbytes if self.ann_active else 0)
+
+    def __len__(self) -> int:
+        return len(self._codec)
+
+    @property
+    def live_count(self) -> int:
+        return len(self._codec) - self._n_dead
+
+    def is_live(self, row: int) -> bool:
+        return self._dead is None or not self._dead[row]
+
+    def tombstone(self, rows: Sequence[int]) -> None:
+        """Exclude rows from every later search; their vectors stay in place."""
+        rows = np.asarray(rows, dtype=np.int64)
+        if not len(rows):
+            return
+        with self._lock:
+            dead = np.zeros(len(self._codec), dtype=bool)
+            if self._dead is not None:
+                dead[: len(self._dead)] = self._dead
+            dead[rows] = True
+            self._dead = dead
+            self._n_dead = int(dead.sum())
+
+    def decode(self, idx: np.ndarray) -> np.ndarray:
+        """Float32 rows for the given indices, decoded from the storage mode."""
+        return self._codec.decode(idx)
+
+    @property
+    def ann_active(self) -> bool:
+        return self._ann is not None and self._ann.is_trained
+
+    def _append_vectors(self, vectors: np.ndarray) -> None:
+        unit = _normalize_rows(np.asarray(vectors, dtype=np.float32))
+        with self._lock:
+            start = len(self._codec)
+            self._codec.add(unit)
+            if self._dead is not None:
+                self._dead = np.concatenate([self._dead, np.zeros(len(unit), dtype=bool)])
+            if self._ann is None:
+                return
+            if self._ann.is_trained:
+                self._ann.add(unit, np.arange(start, start + len(unit)))
+            elif len(self._codec) >= self._ann.params.min_vectors:
+                self._train_ann()
+
+    def _train_ann(self) -> None:
+        every = np.arange(len(self._codec))
+        stored = self._codec.decode(every)
+        self._ann.train(stored)
+        self._ann.add(stored, every)
+
+    def _embed_documents(self, texts: List[str]) -> np.ndarray:
+        embed_array = getattr(self.embedding, "embed_documents_array", None)
+        if embed_array is not None:
+            return embed_array(texts)
+        return np.asarray(self.embedding.embed_documents(texts), dtype=np.float32)
+
+    def add_vectors(
+        self,
+        documents: Sequence[Document],
+        vectors: np.ndarray,
+        ids: Optional[Sequence[str]] = None,
+    ) -> List[str]:
+        """Add documents whose embeddings were computed elsewhere."""
+        if ids is not None and len(ids) != len(documents):
+            raise ValueError(
+                f"ids must be the same length as documents. "
+                f"Got {len(ids)} ids and {len(documents)} documents."
+            )
+        if len(documents) != len(vectors):
+            raise ValueError("documents and vectors must have the same length.")
+        if not isinstance(self._docs, list):
+            # Opened from arrays with a lazy document sequence; appending needs a list.
+            self._docs = list(self._docs)
+        out: List[str] = []
+        for i, doc in enumerate(documents):
+            doc_id = (ids[i] if ids is not None else None) or doc.id or str(uuid.uuid4())
+            out.append(doc_id)
+            self._docs.append(
+                Document(id=doc_id, page_content=doc.page_content, metadata=doc.metadata)
+            )
+        if len(documents):
+            self._append_vectors(vectors)
+        return out
+
+    def add_documents(
+        self, documents: List[Document], ids: Optional[List[str]] = None, **kwargs: Any
+    ) -> List[str]:
+        vectors = self._embed_documents([d.page_content for d in documents])
+        return self.add_vectors(documents, vectors, ids)
+
+    def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: Optional[List[dict]] = None,
+        *,
+        ids: Optional[List[str]] = None,
+        **kwargs: Any,
+    ) -> List[str]:
+        texts = list(texts)
+        metadatas = metadatas or [{} for _ in texts]
+        docs = [Document(page_content=t, metadata=m) for t, m in zip(texts, metadatas)]
+        return self.add_documents(docs, ids=ids)
+
+    def get_by_ids(self, ids: Sequence[str], /) -> List[Document]:
+        wanted = set(ids)
+        return [d for d in self._docs if d.id in wanted]
+
+    def _query_vector(self, embedding: Sequence[float]) -> np.ndarray:
+        q = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(q)
+        return q / norm if norm else q
+
+    def _candidates(self, query: np.ndarray, n: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Indices and scores of the n best live rows, best first."""
+        dead = self._dead
+        if not self.ann_active:
+            scores = self._codec.scores(query)
+            if dead is not None:
+                scores[: len(dead)][dead] = -np.inf
+                n = min(n, len(scores) - self._n_dead)
+            idx = top_k_indices(scores, n)
+            return idx, scores[idx]
+        refine = self._ann.params.refine
+        # Over-fetch by the tombstone count so dropping dead hits still leaves n.
+        with self._lock:
+            dead = self._dead
+            ids, approx = self._ann.search(query, n * max(1, refine) + self._n_dead)
+        if dead is not None:
+            live = ~dead[ids]
+            ids, approx = ids[live], approx[live]
+        if not refine:
+            return ids[:n], approx[:n]
+        exact = self._codec.decode(ids) @ query
+        order = top_k_indices(exact, n)
+        return ids[order], exact[order]
+
+    def search_indices(self, embedding: Sequence[float], n: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Insertion-order row indices and cosine scores of the n nearest rows, best first."""
+        if not len(self._codec):
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        return self._candidates(self._query_vector(embedding), n)
+
+    def similarity_search_with_score_by_vector(
+        self, embedding: Sequence[float], k: int = 4, **kwargs: Any
+    ) -> List[Tuple[Document, float]]:
+        if not len(self._codec):
+            return []
+        idx, scores = self._candidates(self._query_vector(embedding), k)
+        return [(self._docs[i], float(score)) for i, score in zip(idx, scores)]
+
+    def similarity_search_by_vector(
+        self, embedding: List[float], k: int = 4, **kwargs: Any
+    ) -> List[Document]:
+        return [d for d, _ in self.similarity_search_with_score_by_vector(embedding, k)]
+
+    def similarity_search_with_score(
+        self, query: str, k: int = 4, **kwargs: Any
+    ) -> List[Tuple[Document, float]]:
+        return self.similarity_search_with_score_by_vector(
+            self.embedding.embed_query(query), k
+        )
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        return [d for d, _ in self.similarity_search_with_score(query, k)]
+
+    def max_marginal_relevance_search_by_vector(
+        self,
+        embedding: List[float],
+        k: int = 4,
+        fetch_k: int = 20,
+        lambda_mult: float = 0.5,
+        **kwargs: Any,
+    ) -> List[Document]:
+        return [
+            self._docs[i]
+            for i in self.max_marginal_relevance_indices(embedding, k, fetch_k, lambda_mult)
+        ]
+
+    def max_marginal_relevance_indices(
+        self,
+        embedding: Sequence[float],
+        k: int = 4,
+        fetch_k: int = 20,
+        lambda_mult: float = 0.5,
+        **kwargs: Any,
+    ) -> List[int]:
+        """Rows the MMR search picks, in order."""
+        if not len(self._codec):
+            return []
+        candidates, scores = self._candidates(self._query_vector(embedding), fetch_k)
+        rows = _normalize_rows(self._codec.decode(candidates))
+        picks = mmr_select(scores, rows, k, lambda_mult)
+        return [int(candidates[p]) for p in picks]
+
+    def max_marginal_relevance_search(
+        self,
+        query: str,
+        k: int = 4,
+        fetch_k: int = 20,
+        lambda_mult: float = 0.5,
+        **kwargs: Any,
+    ) -> List[Document]:
+        return self.max_marginal_relevance_search_by_vector(
+            self.embedding.embed_query(query), k, fetch_k, lambda_mult
+        )
+
+    def _select_relevance_score_fn(self) -> Callable[[float], float]:
+        return self._cosine_relevance_score_fn
+
+    @classmethod
+    def from_arrays(
+        cls,
+        embedding: Embeddings,
+        documents: Sequence[Document],
+        unit_vectors: np.ndarray,
+        **kwargs: Any,
+    ) -> "NumpyVectorStore":
+        """
+        Store over documents (any sequence, e.g. a lazy one) and their unit-norm
+        vectors. float32 storage uses the array in place, so a memory-mapped
+        matrix is shared rather than copied; other modes encode it once.
+        """
+        if len(documents) != len(unit_vectors):
+            raise ValueError("documents and vectors must have the same length.")
+        store = cls(embedding, **kwargs)
+        store._docs = documents
+        if store._codec.name == "float32":
+            store._codec.adopt(unit_vectors)
+            if store._ann is not None and len(store._codec) >= store._ann.params.min_vectors:
+                store._train_ann()
+        elif len(unit_vectors):
+            store._append_vectors(unit_vectors)
+        return store
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: List[str],
+        embedding: Embeddings,
+        metadatas: Optional[List[dict]] = None,
+        **kwargs: Any,
+    ) -> "NumpyVectorStore":
+        store = cls(
+            embedding,
+            storage=kwargs.get("storage", "float32"),
+            pca_dim=kwargs.get("pca_dim", 128),
+            index=kwargs.get("index", "exact"),
+            ann_params=kwargs.get("ann_params"),
+        )
+        store.add_texts(texts, metadatas, ids=kwargs.get("ids"))
+        return store